@@ -0,0 +1,105 @@
+"""In-process request throughput benchmark for todo_api.
+
+Seeds a database with ``todo_core.seed`` data, points todo_api.main at
+it and sends sequential requests through an ASGI transport, so the
+numbers cover routing, queries and template rendering but no sockets.
+
+Usage:
+    python benchmarks/bench_api.py [--rows N] [--requests N]
+
+Results are printed as JSON: requests per second per endpoint.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from todo_core.db import DATABASE_PATH_ENV, ensure_schema, make_engine
+from todo_core.models import Task
+from todo_core.operations import encode_cursor
+from todo_core.seed import seed_tasks
+
+def seed_database(path: Path, rows: int) -> str:
+    """Create and seed the database; return a cursor into its middle."""
+    engine = make_engine("bulk-load", str(path))
+    with engine.begin() as conn:
+        ensure_schema(conn)
+    with Session(engine) as db:
+        seed_tasks(db, rows)
+        cursor = encode_cursor(db.scalar(
+            select(Task).order_by(Task.created_at, Task.id).offset(rows // 2).limit(1)
+        ))
+    engine.dispose()
+    return cursor
+
+async def requests_per_sec(client: httpx.AsyncClient, count: int,
+                           method: str, url: str, **kwargs) -> float:
+    """Send the same request count times and return the achieved rate."""
+    start = time.perf_counter()
+    for _ in range(count):
+        response = await client.request(method, url, **kwargs)
+        assert response.status_code < 400, (url, response.status_code)
+    return count / (time.perf_counter() - start)
+
+async def run_requests(cursor: str, count: int) -> dict:
+    """Measure every endpoint against the already configured app."""
+    from todo_api.main import app, engine
+
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport,
+                                     base_url="http://bench") as client:
+            etag = (await client.get("/")).headers["ETag"]
+            endpoints = {
+                "index": ("GET", "/", {}),
+                "index_not_modified": ("GET", "/", {
+                    "headers": {"If-None-Match": etag}
+                }),
+                "tasks_page": ("GET", "/tasks", {"params": {"cursor": cursor}}),
+                "search": ("GET", "/tasks/search", {"params": {"q": "review pull"}}),
+                "stats": ("GET", "/stats", {}),
+                "create_task": ("POST", "/tasks", {
+                    "data": {"title": "Benchmark"}, "headers": {"HX-Request": "true"}
+                }),
+            }
+            return {
+                f"{name}_per_sec": round(
+                    await requests_per_sec(client, count, method, url, **kwargs), 1
+                )
+                for name, (method, url, kwargs) in endpoints.items()
+            }
+    finally:
+        await engine.dispose()
+
+def measure(rows: int = 10_000, requests: int = 500) -> dict:
+    """Seed a database and measure request throughput of every endpoint."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "api.db"
+        cursor = seed_database(path, rows)
+        # todo_api.main creates its engine at import time
+        os.environ[DATABASE_PATH_ENV] = str(path)
+        return asyncio.run(run_requests(cursor, requests))
+
+def main() -> int:
+    """Run the benchmark and print JSON results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000,
+                        help="Tasks to seed before measuring")
+    parser.add_argument("--requests", type=int, default=500,
+                        help="Sequential requests per endpoint")
+    args = parser.parse_args()
+
+    print(json.dumps(measure(args.rows, args.requests), indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
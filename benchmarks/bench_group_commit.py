@@ -0,0 +1,110 @@
+"""Write-burst benchmark: one commit per request vs group commit.
+
+Simulates concurrent API requests that each create a task, either with
+their own session and commit (todo_core.aio.create_task) or through a
+todo_core.group_commit.GroupCommitWriter, on a database opened with the
+"server" profile.
+
+Usage:
+    python benchmarks/bench_group_commit.py [--concurrency N] [--writes N]
+                                            [--synchronous NORMAL|FULL]
+
+Results are printed as JSON: writes per second, latency percentiles and
+the number of commits (each one a WAL sync point with synchronous=FULL).
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from todo_core import aio
+from todo_core.db import ensure_schema, make_async_engine
+from todo_core.group_commit import GroupCommitWriter
+
+async def run(path: Path, grouped: bool, concurrency: int, writes: int,
+              synchronous: str) -> dict:
+    """Let concurrency clients create writes tasks each and time them."""
+    engine = make_async_engine("server", str(path))
+    commits = 0
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_synchronous(dbapi_connection, connection_record):
+        dbapi_connection.execute(f"PRAGMA synchronous = {synchronous}")
+
+    @event.listens_for(engine.sync_engine, "commit")
+    def count_commit(conn):
+        nonlocal commits
+        commits += 1
+
+    async with engine.begin() as conn:
+        await conn.run_sync(ensure_schema)
+    commits = 0
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    writer = GroupCommitWriter(sessions) if grouped else None
+    if writer is not None:
+        writer.start()
+
+    latencies = []
+
+    async def client(n: int) -> None:
+        for i in range(writes):
+            start = time.perf_counter()
+            if writer is not None:
+                await writer.create_task(f"Burst {n}.{i}")
+            else:
+                async with sessions() as db:
+                    await aio.create_task(db, f"Burst {n}.{i}")
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(n) for n in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    if writer is not None:
+        await writer.close()
+    await engine.dispose()
+
+    latencies.sort()
+    return {
+        "writes_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1], 3),
+        "commits": commits,
+    }
+
+def measure(concurrency: int = 64, writes: int = 50,
+            synchronous: str = "NORMAL") -> dict:
+    """Run the burst with and without group commit on fresh databases."""
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name, grouped in (("per_request_commit", False), ("group_commit", True)):
+            results[name] = asyncio.run(run(
+                Path(directory) / f"{name}.db", grouped, concurrency, writes,
+                synchronous
+            ))
+    return results
+
+def main() -> int:
+    """Run the benchmark and print JSON results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=64,
+                        help="Concurrent writing clients")
+    parser.add_argument("--writes", type=int, default=50,
+                        help="Tasks created by each client")
+    parser.add_argument("--synchronous", choices=["NORMAL", "FULL"],
+                        default="NORMAL", help="SQLite synchronous pragma")
+    args = parser.parse_args()
+
+    print(json.dumps(measure(args.concurrency, args.writes, args.synchronous),
+                     indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""Insert-throughput benchmark for task id generators.
+
+For each generator (random uuid4, time-ordered uuid7) a fresh database is
+preloaded with N tasks, then M more are inserted in committed batches the
+way imports do. Random ids scatter those inserts over the whole primary
+key B-tree; time-ordered ones append to its right edge.
+
+Usage:
+    python benchmarks/bench_ids.py [--rows N] [--measure M] [--storage MODE]
+
+Results are printed as JSON.
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from uuid import uuid4
+
+from sqlalchemy import insert
+
+from todo_core.db import ensure_schema, make_engine
+from todo_core.models import Task, TaskStatus, uuid7
+from todo_core.storage import STORAGE_MODES
+
+GENERATORS = {"uuid4": uuid4, "uuid7": uuid7}
+
+def insert_rows(conn, new_id, count: int) -> None:
+    """Insert count tasks with ids from new_id in one executemany."""
+    now = datetime.now(timezone.utc)
+    conn.execute(insert(Task.__table__), [
+        {"id": new_id(), "title": "Benchmark task", "status": TaskStatus.PENDING,
+         "created_at": now, "updated_at": now, "version": 1}
+        for _ in range(count)
+    ])
+
+def bench_generator(path: Path, new_id, storage: str, rows: int, measure: int,
+                    batch_size: int) -> dict:
+    """Preload a database and time further batched inserts."""
+    engine = make_engine("bulk-load", str(path), storage=storage)
+    with engine.begin() as conn:
+        ensure_schema(conn)
+
+    start = time.perf_counter()
+    for offset in range(0, rows, 50_000):
+        with engine.begin() as conn:
+            insert_rows(conn, new_id, min(50_000, rows - offset))
+    preload_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for offset in range(0, measure, batch_size):
+        with engine.begin() as conn:
+            insert_rows(conn, new_id, min(batch_size, measure - offset))
+    measure_seconds = time.perf_counter() - start
+
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+    engine.dispose()
+
+    return {
+        "preload_rows_per_sec": round(rows / preload_seconds, 1),
+        "insert_rows_per_sec": round(measure / measure_seconds, 1),
+        "file_bytes": path.stat().st_size,
+    }
+
+def main() -> int:
+    """Run the benchmark and print JSON results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000,
+                        help="Tasks to preload per generator")
+    parser.add_argument("--measure", type=int, default=100_000,
+                        help="Tasks to insert and time after the preload")
+    parser.add_argument("--batch-size", type=int, default=1000,
+                        help="Rows per committed insert batch")
+    parser.add_argument("--storage", choices=STORAGE_MODES, default="text",
+                        help="Storage mode of the benchmark databases")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = {
+            name: bench_generator(
+                Path(directory) / f"{name}.db", new_id, args.storage,
+                args.rows, args.measure, args.batch_size
+            )
+            for name, new_id in GENERATORS.items()
+        }
+    results["uuid7_vs_uuid4"] = round(
+        results["uuid7"]["insert_rows_per_sec"]
+        / results["uuid4"]["insert_rows_per_sec"], 3
+    )
+    print(json.dumps(results, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""Latency benchmark for every operation in todo_core.operations.
+
+For each table size a database is filled with ``todo_core.seed`` data
+and every operation is timed on it. Writes that would change the table
+size create their own rows first, so each size is measured as seeded.
+
+Usage:
+    python benchmarks/bench_operations.py [--sizes 1000 10000 ...] [--runs N]
+
+Results are printed as JSON: median milliseconds per operation and size.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from todo_core.db import ensure_schema, make_engine
+from todo_core.models import Task, TaskStatus
+from todo_core.operations import (
+    check_task_counts, count_tasks, create_task, create_tasks, decode_cursor,
+    delete_numbered_tasks, delete_task, encode_cursor, get_task, iter_tasks,
+    list_tasks, search_tasks, toggle_task_status, update_numbered_tasks,
+    update_task
+)
+from todo_core.seed import seed_tasks
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+
+def operations(db: Session, size: int) -> Dict[str, Callable[[], object]]:
+    """Build the timed operations against a seeded database.
+
+    rebuild_search_index is left out: it rewrites the whole index and
+    belongs to maintenance, not to request paths.
+    """
+    first = list_tasks(db, limit=1)[0]
+    middle = encode_cursor(db.scalar(
+        select(Task).order_by(Task.created_at, Task.id).offset(size // 2).limit(1)
+    ))
+    number = first.number
+
+    def create_and_delete():
+        delete_task(db, create_task(db, "Benchmark").id)
+
+    def create_and_delete_numbered():
+        created = create_task(db, "Benchmark")
+        delete_numbered_tasks(db, [(created.number, created.number)])
+
+    def create_batch_and_delete():
+        highest = db.scalar(select(func.max(Task.number)))
+        create_tasks(db, ["Benchmark"] * 100)
+        delete_numbered_tasks(db, [(highest + 1, highest + 100)])
+
+    return {
+        "create_task+delete_task": create_and_delete,
+        "create_tasks_100+delete_numbered_tasks": create_batch_and_delete,
+        "get_task": lambda: get_task(db, first.id),
+        "list_tasks_first_page": lambda: list_tasks(db, limit=50),
+        "list_tasks_deep_page": lambda: list_tasks(db, cursor=middle, limit=50),
+        "list_tasks_status_page": lambda: list_tasks(
+            db, status=TaskStatus.COMPLETED, cursor=middle, limit=50
+        ),
+        "iter_tasks_1000": lambda: sum(1 for _ in iter_tasks(db, limit=1000)),
+        "encode_decode_cursor": lambda: decode_cursor(encode_cursor(first)),
+        "update_task": lambda: update_task(db, first.id, title="Benchmark title"),
+        "toggle_task_status": lambda: toggle_task_status(db, first.id),
+        "update_numbered_tasks_100": lambda: update_numbered_tasks(
+            db, [(number, number + 99)], TaskStatus.PENDING
+        ),
+        "create_task+delete_numbered_tasks": create_and_delete_numbered,
+        "search_tasks": lambda: search_tasks(db, "review pull"),
+        "search_tasks_prefix": lambda: search_tasks(db, "inv"),
+        "count_tasks": lambda: count_tasks(db, TaskStatus.PENDING),
+        "check_task_counts": lambda: check_task_counts(db, repair=False),
+    }
+
+def median_ms(operation: Callable[[], object], runs: int) -> float:
+    """Return the median wall time of an operation after one warm-up run."""
+    operation()
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        operation()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+def measure(sizes=SIZES, runs: int = 5) -> dict:
+    """Time every operation at every table size."""
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            engine = make_engine("cli", str(Path(directory) / f"{size}.db"))
+            with engine.begin() as conn:
+                ensure_schema(conn)
+            with Session(engine, expire_on_commit=False) as db:
+                seed_tasks(db, size)
+                results[str(size)] = {
+                    f"{name}_ms": round(median_ms(operation, runs), 3)
+                    for name, operation in operations(db, size).items()
+                }
+            engine.dispose()
+    return results
+
+def main() -> int:
+    """Run the benchmark and print JSON results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES,
+                        help="Table sizes to seed and measure")
+    parser.add_argument("--runs", type=int, default=5,
+                        help="Timed repetitions of each operation")
+    args = parser.parse_args()
+
+    print(json.dumps(measure(args.sizes, args.runs), indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
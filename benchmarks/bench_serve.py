@@ -0,0 +1,148 @@
+"""Load test of `todo-api serve` at several worker counts.
+
+Seeds a database with ``todo_core.seed`` data, then for each worker
+count starts a real server process on it and keeps a fixed number of
+concurrent keep-alive connections busy for a while, reading pages and
+occasionally adding a task.
+
+Usage:
+    python benchmarks/bench_serve.py [--workers 1 2 4 ...] [--rows N]
+                                     [--concurrency N] [--seconds S]
+                                     [--loop auto|asyncio|uvloop]
+                                     [--http auto|h11|httptools]
+
+Results are printed as JSON: requests per second per worker count. The
+load generator runs on the same machine, so scaling flattens out once
+server and client together use every core.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from sqlalchemy.orm import Session
+
+from todo_core.db import ensure_schema, make_engine
+from todo_core.seed import seed_tasks
+
+# One write per this many requests
+WRITE_EVERY = 20
+
+def free_port() -> int:
+    """Pick an unused local TCP port."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_server(path: Path, port: int, workers: int, loop: str,
+                 http: str) -> subprocess.Popen:
+    """Start `todo-api serve` and wait until it answers."""
+    server = subprocess.Popen(
+        [sys.executable, "-c", "from todo_api.cli import main; main()",
+         "serve", "--db", str(path), "--port", str(port),
+         "--workers", str(workers), "--loop", loop, "--http", http],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/stats").status_code == 200:
+                # Give the remaining workers time to come up as well
+                time.sleep(0.5 * workers)
+                return server
+        except httpx.TransportError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("Server did not start")
+
+async def drive(port: int, concurrency: int, seconds: float) -> dict:
+    """Keep concurrency connections busy and count completed requests."""
+    limits = httpx.Limits(max_connections=concurrency,
+                          max_keepalive_connections=concurrency)
+    done = errors = 0
+    stop = time.monotonic() + seconds
+
+    async def connection(client: httpx.AsyncClient, offset: int) -> None:
+        nonlocal done, errors
+        i = offset
+        while time.monotonic() < stop:
+            i += 1
+            try:
+                if i % WRITE_EVERY == 0:
+                    response = await client.post(
+                        "/tasks", data={"title": "Load test"},
+                        headers={"HX-Request": "true"}
+                    )
+                else:
+                    response = await client.get("/" if i % 2 else "/stats")
+            except httpx.TransportError:
+                errors += 1
+                continue
+            if response.status_code < 400:
+                done += 1
+            else:
+                errors += 1
+
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}",
+                                 limits=limits, timeout=30) as client:
+        start = time.monotonic()
+        await asyncio.gather(*(connection(client, n) for n in range(concurrency)))
+        elapsed = time.monotonic() - start
+    return {"requests_per_sec": round(done / elapsed, 1), "errors": errors}
+
+def measure(workers=(1, 2, 4), rows: int = 10_000, concurrency: int = 64,
+            seconds: float = 10.0, loop: str = "auto", http: str = "auto") -> dict:
+    """Seed a database and load test the server at each worker count."""
+    results = {"cpus": os.cpu_count()}
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "serve.db"
+        engine = make_engine("bulk-load", str(path))
+        with engine.begin() as conn:
+            ensure_schema(conn)
+        with Session(engine) as db:
+            seed_tasks(db, rows)
+        engine.dispose()
+
+        for count in workers:
+            port = free_port()
+            server = start_server(path, port, count, loop, http)
+            try:
+                results[f"workers_{count}"] = asyncio.run(
+                    drive(port, concurrency, seconds)
+                )
+            finally:
+                server.terminate()
+                server.wait()
+    return results
+
+def main() -> int:
+    """Run the load test and print JSON results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=(1, 2, 4),
+                        help="Worker counts to measure")
+    parser.add_argument("--rows", type=int, default=10_000,
+                        help="Tasks to seed before measuring")
+    parser.add_argument("--concurrency", type=int, default=64,
+                        help="Concurrent client connections")
+    parser.add_argument("--seconds", type=float, default=10.0,
+                        help="Duration of each measurement")
+    parser.add_argument("--loop", choices=["auto", "asyncio", "uvloop"],
+                        default="auto", help="Server event loop")
+    parser.add_argument("--http", choices=["auto", "h11", "httptools"],
+                        default="auto", help="Server HTTP parser")
+    args = parser.parse_args()
+
+    print(json.dumps(measure(args.workers, args.rows, args.concurrency,
+                             args.seconds, args.loop, args.http), indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
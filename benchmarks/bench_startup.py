@@ -0,0 +1,82 @@
+"""Startup-time benchmark for the todo and todo-core CLIs.
+
+Measures, for each CLI entry module:
+- cumulative import time of the module, from ``python -X importtime``
+- wall time of cold ``--help`` and ``--version`` invocations
+
+Usage:
+    python benchmarks/bench_startup.py [--runs N] [--max-import-ms MS]
+
+Results are printed as JSON. With --max-import-ms the script exits with
+status 1 when any CLI module takes longer than that to import.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+CLIS = {
+    "todo": "todo_cli.cli",
+    "todo-core": "todo_core.cli",
+}
+
+def import_time_ms(module: str) -> float:
+    """Return the cumulative import time of a module in milliseconds."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True
+    )
+    for line in result.stderr.splitlines():
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1000
+    raise RuntimeError(f"{module} not found in -X importtime output")
+
+def invocation_ms(module: str, args: list[str], runs: int) -> float:
+    """Return the median wall time of running the CLI in a fresh process."""
+    command = [
+        sys.executable, "-c", f"from {module} import main; main()", *args
+    ]
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, capture_output=True, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+def measure(runs: int = 10) -> dict:
+    """Measure import and cold invocation times of every CLI."""
+    return {
+        name: {
+            "import_ms": round(import_time_ms(module), 2),
+            "help_ms": round(invocation_ms(module, ["--help"], runs), 2),
+            "version_ms": round(invocation_ms(module, ["--version"], runs), 2),
+        }
+        for name, module in CLIS.items()
+    }
+
+def main() -> int:
+    """Run the benchmark and print JSON results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10,
+                        help="Invocations per measurement")
+    parser.add_argument("--max-import-ms", type=float,
+                        help="Fail when a CLI module imports slower than this")
+    args = parser.parse_args()
+
+    results = measure(args.runs)
+    print(json.dumps(results, indent=2))
+
+    if args.max_import_ms is not None:
+        slow = [n for n, r in results.items() if r["import_ms"] > args.max_import_ms]
+        if slow:
+            print(f"Import time over {args.max_import_ms} ms: {', '.join(slow)}",
+                  file=sys.stderr)
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""Storage-mode benchmark for the tasks table.
+
+Builds one database per storage mode (text, compact) and measures:
+- bulk insert rate of N tasks through create_tasks
+- database file size, indexes included
+- full listing scan and a deep keyset page
+
+Usage:
+    python benchmarks/bench_storage.py [--rows N] [--runs N]
+
+Results are printed as JSON.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy.orm import Session
+
+from todo_core.db import ensure_schema, make_engine
+from todo_core.operations import create_tasks, encode_cursor, iter_tasks, list_tasks
+from todo_core.storage import STORAGE_MODES
+
+def median_ms(operation, runs: int) -> float:
+    """Return the median wall time of an operation in milliseconds."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        operation()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+def bench_mode(directory: Path, storage: str, rows: int, runs: int) -> dict:
+    """Benchmark one storage mode on a fresh database."""
+    path = directory / f"{storage}.db"
+    engine = make_engine("bulk-load", str(path), storage=storage)
+    with engine.begin() as conn:
+        ensure_schema(conn)
+
+    with Session(engine) as db:
+        start = time.perf_counter()
+        create_tasks(db, (f"Task {i}" for i in range(rows)), batch_size=5000)
+        insert_seconds = time.perf_counter() - start
+
+        middle = encode_cursor(list_tasks(db, limit=rows // 2)[-1])
+        scan_ms = median_ms(lambda: sum(1 for _ in iter_tasks(db)), runs)
+        page_ms = median_ms(lambda: list_tasks(db, cursor=middle, limit=50), runs)
+
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+    engine.dispose()
+
+    return {
+        "file_bytes": path.stat().st_size,
+        "insert_rows_per_sec": round(rows / insert_seconds, 1),
+        "scan_ms": round(scan_ms, 2),
+        "page_ms": round(page_ms, 3),
+    }
+
+def main() -> int:
+    """Run the benchmark and print JSON results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000,
+                        help="Tasks to insert per storage mode")
+    parser.add_argument("--runs", type=int, default=5,
+                        help="Repetitions of each read measurement")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = {
+            storage: bench_mode(Path(directory), storage, args.rows, args.runs)
+            for storage in STORAGE_MODES
+        }
+    text, compact = results["text"], results["compact"]
+    results["compact_vs_text"] = {
+        "file_size": round(compact["file_bytes"] / text["file_bytes"], 3),
+        "scan_time": round(compact["scan_ms"] / text["scan_ms"], 3),
+    }
+    print(json.dumps(results, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
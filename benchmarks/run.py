@@ -0,0 +1,95 @@
+"""Run the benchmark suite and compare it against a stored baseline.
+
+Runs bench_operations (todo_core.operations at several table sizes),
+bench_startup (cold todo and todo-core invocations) and bench_api
+(in-process request throughput), then flattens the results into one
+JSON object of ``"suite.path.metric": value`` pairs.
+
+Metrics ending in ``_per_sec`` are better when higher, all others
+(milliseconds) when lower. With --baseline, a metric that is worse than
+the baseline by more than --threshold (a fraction) is a regression and
+the script exits with status 1.
+
+Usage:
+    python benchmarks/run.py [--quick] [--output FILE] [--baseline FILE]
+                             [--threshold 0.25]
+
+Save a baseline on a known good commit with --output, then compare later
+runs on the same machine with --baseline.
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, List
+
+import bench_api
+import bench_operations
+import bench_startup
+
+def flatten(results: dict, prefix: str = "") -> Dict[str, float]:
+    """Flatten nested result dicts into dotted metric names."""
+    metrics = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            metrics.update(flatten(value, name))
+        else:
+            metrics[name] = value
+    return metrics
+
+def regressions(metrics: Dict[str, float], baseline: Dict[str, float],
+                threshold: float) -> List[str]:
+    """List the metrics that got worse than the baseline by over threshold."""
+    found = []
+    for name, before in sorted(baseline.items()):
+        after = metrics.get(name)
+        if after is None or not before:
+            continue
+        if name.endswith("_per_sec"):
+            change = (before - after) / before
+        else:
+            change = (after - before) / before
+        if change > threshold:
+            found.append(f"{name}: {before} -> {after} ({change:+.0%} worse)")
+    return found
+
+def main() -> int:
+    """Run the suite, write its results and check them against a baseline."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true",
+                        help="Smaller tables and fewer runs, for smoke tests")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against this results file")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown before failing, as a fraction")
+    args = parser.parse_args()
+
+    if args.quick:
+        sizes, runs, rows, requests = (1_000, 10_000), 3, 1_000, 100
+    else:
+        sizes, runs, rows, requests = bench_operations.SIZES, 5, 10_000, 500
+
+    metrics = flatten({
+        "operations": bench_operations.measure(sizes, runs),
+        "startup": bench_startup.measure(runs),
+        "api": bench_api.measure(rows, requests),
+    })
+    output = json.dumps(metrics, indent=2, sort_keys=True)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        found = regressions(metrics, baseline, args.threshold)
+        for line in found:
+            print(f"Regression: {line}", file=sys.stderr)
+        if found:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
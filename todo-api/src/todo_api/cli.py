@@ -4,10 +4,18 @@ Following Constitutional requirement:
 Every library must expose CLI interface
 """
 
+import os
+import sys
+from importlib.util import find_spec
+from typing import Optional
+
 import click
 import uvicorn
+from todo_core.db import DATABASE_PATH_ENV, ensure_schema, make_engine
+from todo_core.metrics import METRICS_ENV
 
 from . import __version__
+from .timing import DEFAULT_SLOW_REQUEST_MS, SLOW_REQUEST_ENV
 
 @click.group()
 @click.version_option(version=__version__, prog_name="todo-api")
@@ -18,17 +26,76 @@ def cli():
     """
     pass
 
+# Enables the group-commit writer for mutations
+GROUP_COMMIT_ENV = "TODO_GROUP_COMMIT"
+
 @cli.command()
 @click.option("--host", default="127.0.0.1", help="Host to bind to")
 @click.option("--port", default=8000, help="Port to bind to")
 @click.option("--reload", is_flag=True, help="Enable auto-reload")
-def serve(host: str, port: int, reload: bool):
-    """Start the API server."""
+@click.option("--db", "db_path", type=click.Path(dir_okay=False),
+              help="Database file (default: $TODO_DB or todo.db)")
+@click.option("--metrics", is_flag=True,
+              help="Collect query metrics and serve them on /metrics")
+@click.option("--slow-ms", type=click.FloatRange(min=0), default=None,
+              help="Log requests slower than this many milliseconds "
+                   f"(default: ${SLOW_REQUEST_ENV} or {DEFAULT_SLOW_REQUEST_MS:g})")
+@click.option("--group-commit", is_flag=True,
+              help="Commit concurrent mutations together in batches")
+@click.option("--workers", type=click.IntRange(min=1), default=1,
+              help="Number of worker processes")
+@click.option("--loop", type=click.Choice(["auto", "asyncio", "uvloop"]),
+              default="auto", help="Event loop (auto uses uvloop if installed)")
+@click.option("--http", type=click.Choice(["auto", "h11", "httptools"]),
+              default="auto",
+              help="HTTP parser (auto uses httptools if installed)")
+@click.option("--backlog", type=click.IntRange(min=1), default=2048,
+              help="Maximum number of pending connections")
+@click.option("--keep-alive", type=click.IntRange(min=0), default=5,
+              help="Seconds to keep idle connections open")
+def serve(host: str, port: int, reload: bool, db_path: str, metrics: bool,
+          slow_ms: Optional[float], group_commit: bool, workers: int, loop: str,
+          http: str, backlog: int, keep_alive: int):
+    """Start the API server.
+
+    Workers are spawned, not forked, so each one opens its own database
+    connections. The schema is created before they start, which also
+    switches the database to WAL once instead of in every worker.
+    """
+    if reload and workers > 1:
+        click.echo("Error: --reload cannot be combined with --workers", err=True)
+        sys.exit(1)
+    for option, module in (("--loop", loop), ("--http", http)):
+        if module in ("uvloop", "httptools") and find_spec(module) is None:
+            click.echo(f"Error: {option} {module} needs {module}; "
+                       "install it with todo-api[fast]", err=True)
+            sys.exit(1)
+
+    # Passed through the environment so reloaded and worker processes see them
+    if db_path:
+        os.environ[DATABASE_PATH_ENV] = db_path
+    if metrics:
+        os.environ[METRICS_ENV] = "1"
+    if slow_ms is not None:
+        os.environ[SLOW_REQUEST_ENV] = str(slow_ms)
+    if group_commit:
+        os.environ[GROUP_COMMIT_ENV] = "1"
+
+    engine = make_engine("server")
+    with engine.begin() as conn:
+        ensure_schema(conn)
+    engine.dispose()
+
     uvicorn.run(
         "todo_api.main:app",
         host=host,
         port=port,
-        reload=reload
+        reload=reload,
+        workers=workers,
+        loop=loop,
+        http=http,
+        backlog=backlog,
+        timeout_keep_alive=keep_alive,
     )
 
 def main():
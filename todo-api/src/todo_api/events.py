@@ -0,0 +1,248 @@
+"""Server-Sent Events fan-out for live task updates.
+
+Each worker process has one EventHub. While pages are subscribed, a
+poller (follow_changes) watches the database file for commits and reads
+the change log after each one, so tasks written by any worker, the CLIs
+or the journal merge are published alike. Each message is encoded once
+and the same bytes are queued for every subscriber. An idle subscriber
+is a small bounded queue and a response generator waiting on it, and a
+single hub-wide task sends keep-alive comments, so idle connections need
+no timer of their own.
+
+A subscriber that falls ``max_queue`` messages behind is disconnected;
+the browser's EventSource reconnects by itself. A source that fails is
+logged and restarted, and pages get a ``reset`` event to reload, since
+they may have missed changes meanwhile.
+"""
+
+import asyncio
+import logging
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Set
+from uuid import UUID
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from todo_core.aio import list_changes
+from todo_core.cache import DataVersion
+from todo_core.models import Task
+from todo_core.operations import (
+    CHANGE_BOUNDS, ChangeSet, change_set, select_changes
+)
+
+logger = logging.getLogger("todo_api.events")
+
+# Seconds between checks for commits; a check is one pragma read
+POLL_INTERVAL = 0.1
+# Event telling pages to reload, having missed changes
+RESET_EVENT = "reset"
+
+class Subscriber:
+    """One connected event stream.
+
+    Attributes:
+        queue: Encoded messages waiting to be sent; None ends the stream
+    """
+
+    def __init__(self, max_queue: int) -> None:
+        self.queue: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue(max_queue)
+
+def encode_event(event: str, data: str) -> bytes:
+    """Encode one SSE message; every line of data gets its own field."""
+    lines = "".join(f"data: {line}\n" for line in data.splitlines() or [""])
+    return f"event: {event}\n{lines}\n".encode()
+
+class EventHub:
+    """Fans published events out to every subscriber of this process.
+
+    Attributes:
+        max_queue: Messages a subscriber may fall behind before it is dropped
+        heartbeat: Seconds between keep-alive comments
+        source: Coroutine function run with the hub while anyone is
+            subscribed, publishing its events
+        restart_delay: Seconds before a failed source is started again
+    """
+
+    KEEP_ALIVE = b": keep-alive\n\n"
+
+    def __init__(self, max_queue: int = 64, heartbeat: float = 15.0,
+                 source: Optional[Callable[["EventHub"], Awaitable[None]]] = None,
+                 restart_delay: float = 1.0) -> None:
+        self.max_queue = max_queue
+        self.heartbeat = heartbeat
+        self.source = source
+        self.restart_delay = restart_delay
+        self._subscribers: Set[Subscriber] = set()
+        self._tasks: List[asyncio.Task] = []
+        self._source_task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> Subscriber:
+        """Register a new subscriber; the first one starts the hub's tasks."""
+        subscriber = Subscriber(self.max_queue)
+        self._subscribers.add(subscriber)
+        if not self._tasks:
+            loop = asyncio.get_running_loop()
+            self._tasks.append(loop.create_task(self._send_heartbeats()))
+            if self.source is not None:
+                self._start_source()
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        """Forget a subscriber; stops the hub's tasks once none are left."""
+        self._subscribers.discard(subscriber)
+        if not self._subscribers:
+            for task in self._tasks:
+                task.cancel()
+            self._tasks = []
+            self._source_task = None
+
+    def _start_source(self) -> None:
+        task = asyncio.get_running_loop().create_task(self.source(self))
+        task.add_done_callback(self._source_done)
+        self._tasks.append(task)
+        self._source_task = task
+
+    def _source_done(self, task: asyncio.Task) -> None:
+        if task.cancelled() or task is not self._source_task:
+            return
+        self._tasks.remove(task)
+        self._source_task = None
+        error = task.exception()
+        logger.error("Event source stopped, restarting it", exc_info=error)
+        self.publish(RESET_EVENT, "")
+        restart = asyncio.get_running_loop().create_task(self._restart_source())
+        self._tasks.append(restart)
+
+    async def _restart_source(self) -> None:
+        await asyncio.sleep(self.restart_delay)
+        self._tasks.remove(asyncio.current_task())
+        self._start_source()
+
+    def publish(self, event: str, data: str) -> None:
+        """Queue an event for every subscriber.
+
+        Args:
+            event: SSE event name
+            data: Event payload, e.g. rendered HTML
+        """
+        self._broadcast(encode_event(event, data))
+
+    def _broadcast(self, message: bytes) -> None:
+        for subscriber in list(self._subscribers):
+            try:
+                subscriber.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self._disconnect(subscriber)
+
+    def _disconnect(self, subscriber: Subscriber) -> None:
+        self.unsubscribe(subscriber)
+        # Make room for the end-of-stream marker
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(None)
+
+    async def _send_heartbeats(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat)
+            self._broadcast(self.KEEP_ALIVE)
+
+    async def stream(self) -> AsyncIterator[bytes]:
+        """Yield encoded messages for one connection until it goes away."""
+        subscriber = self.subscribe()
+        try:
+            # Flushes the response headers right away
+            yield self.KEEP_ALIVE
+            while (message := await subscriber.queue.get()) is not None:
+                yield message
+        finally:
+            self.unsubscribe(subscriber)
+
+    def close(self) -> None:
+        """End every stream, e.g. on shutdown."""
+        for subscriber in list(self._subscribers):
+            self._disconnect(subscriber)
+
+async def follow_changes(
+    hub: EventHub,
+    session_factory: Callable[[], AsyncSession],
+    path: str,
+    render: Callable[[UUID, Optional[Task], bool], str],
+    interval: float = POLL_INTERVAL,
+    limit: int = 500,
+) -> None:
+    """Publish every task change committed to a database, by any process.
+
+    Meant as the hub's source. The change log is only read after
+    DataVersion saw a commit, or again after the database was busy.
+    Changes come as ``task`` events; if the log was compacted past the
+    ones not yet published, pages get a ``reset`` event to reload instead.
+
+    Args:
+        hub: Hub to publish to
+        session_factory: Async session factory of the database
+        path: Database file
+        render: Renders the payload of a (task id, task, created) change;
+            the task is None once deleted
+        interval: Seconds between checks for commits
+        limit: Changes read per query
+    """
+    version = DataVersion(path)
+    seq: Optional[int] = None
+    retry = False
+    try:
+        while True:
+            if seq is None or retry or version.changed():
+                try:
+                    async with session_factory() as db:
+                        if seq is None:
+                            seq = await change_head(db)
+                        else:
+                            seq = await publish_changes(hub, db, seq, render, limit)
+                    retry = False
+                except OperationalError:
+                    # E.g. the database was busy; read the same changes again
+                    retry = True
+            await asyncio.sleep(interval)
+    finally:
+        version.close()
+
+async def change_head(db: AsyncSession) -> int:
+    """Return the newest change log sequence number."""
+    head, _ = (await db.execute(CHANGE_BOUNDS)).one()
+    return head
+
+async def changes_from_start(db: AsyncSession, limit: int) -> ChangeSet:
+    """Read the log from its first entry, for a log that started out empty.
+
+    list_changes takes 0 as asking for a snapshot instead.
+    """
+    rows = (await db.execute(select_changes(0, limit))).all()
+    head, horizon = (await db.execute(CHANGE_BOUNDS)).one()
+    if (head if horizon is None else horizon) > 0:
+        # Compacted since
+        return ChangeSet([], head, reset=True)
+    return change_set(0, limit, rows)
+
+async def publish_changes(
+    hub: EventHub,
+    db: AsyncSession,
+    since: int,
+    render: Callable[[UUID, Optional[Task], bool], str],
+    limit: int,
+) -> int:
+    """Publish the changes after since; returns the seq to continue from."""
+    more = True
+    while more:
+        if since > 0:
+            changes = await list_changes(db, since, limit)
+        else:
+            changes = await changes_from_start(db, limit)
+        if changes.reset:
+            hub.publish(RESET_EVENT, "")
+            return await change_head(db)
+        for task_id, task in changes.changes:
+            hub.publish("task", render(task_id, task, task_id in changes.created))
+        since, more = changes.seq, changes.more
+    return since
@@ -6,24 +6,96 @@ Following Constitutional requirements:
 - Simple HTMX-based interface
 """
 
-from uuid import UUID
-from fastapi import FastAPI, Request, Form, HTTPException, Depends
-from fastapi.responses import HTMLResponse, RedirectResponse
+import os
+import time
+from contextlib import asynccontextmanager
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional
+from uuid import UUID, uuid4
+from functools import partial
+from fastapi import FastAPI, Request, Form, HTTPException, Depends, Query
+from fastapi.responses import (
+    HTMLResponse, JSONResponse, PlainTextResponse, RedirectResponse, Response,
+    StreamingResponse
+)
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from sqlalchemy import create_engine
-from sqlalchemy.orm import Session, sessionmaker
-from todo_core.models import Base, TaskStatus
-from todo_core.operations import (
-    create_task, get_task, list_tasks, update_task, delete_task
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from todo_core.aio import (
+    acknowledge_changes, count_tasks, create_task, list_changes, list_tasks,
+    search_tasks, toggle_task_status, delete_task
 )
+from todo_core.cache import TaskListCache, generation, last_modified, watch
+from todo_core.db import database_path, ensure_schema, make_async_engine
+from todo_core.group_commit import GroupCommitWriter
+from todo_core.metrics import enable_from_env, enabled, render_prometheus
+from todo_core.models import Task, TaskStatus
+from todo_core.operations import encode_cursor
 import uvicorn
 
+from . import timing
+from .events import EventHub, follow_changes
+from .cli import GROUP_COMMIT_ENV
+
+# Database setup (shared core factory with the server profile, via the
+# aiosqlite driver so queries never block the event loop)
+engine = make_async_engine("server")
+SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+
+# Commits by the CLIs and other workers invalidate the caches below too
+watch(database_path())
+
+# Query metrics are off unless $TODO_METRICS asks for them
+enable_from_env()
+
+# Optional group-commit writer: POST/PUT/DELETE mutations from concurrent
+# requests share one transaction and commit instead of one each
+writer = (
+    GroupCommitWriter(SessionLocal)
+    if os.environ.get(GROUP_COMMIT_ENV, "").lower() in ("1", "true", "yes", "on")
+    else None
+)
+
+def render_task_event(task_id: UUID, task: Optional[Task], created: bool) -> str:
+    """Render a changed task as out-of-band swaps for the open pages.
+
+    Tasks inserted since the last poll are appended; other changes
+    replace the task's row where shown.
+    """
+    if task is None:
+        action = "deleted"
+    elif created:
+        action = "created"
+    else:
+        action = "toggled"
+    return templates.get_template("_task_event.html").render(
+        action=action, task=task, task_id=task_id
+    )
+
+# Live task updates for the open pages of this worker, fed by a poller of
+# the change log while any page is connected, see events.py
+hub = EventHub(source=partial(
+    follow_changes, session_factory=SessionLocal, path=database_path(),
+    render=render_task_event
+))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the schema on startup and release connections on shutdown."""
+    async with engine.begin() as conn:
+        await conn.run_sync(ensure_schema)
+    if writer is not None:
+        writer.start()
+    yield
+    hub.close()
+    if writer is not None:
+        await writer.close()
+    await engine.dispose()
+
 # Create FastAPI app
-app = FastAPI(title="Todo API")
+app = FastAPI(title="Todo API", lifespan=lifespan)
 
 # Get the directory where this file is located
-import os
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 # Mount static files
@@ -32,36 +104,236 @@ app.mount("/static", StaticFiles(directory=os.path.join(BASE_DIR, "static")), na
 # Setup templates
 templates = Jinja2Templates(directory=os.path.join(BASE_DIR, "templates"))
 
-# Database setup (same as core for MVP)
-engine = create_engine("sqlite:///todo.db")
-Base.metadata.create_all(engine)
-SessionLocal = sessionmaker(bind=engine)
+timing.install(templates.env)
+# Time the db, hydration, commit and template phases of every request
+app.add_middleware(timing.ServerTimingMiddleware)
 
-def get_db():
+async def get_db():
     """Get database session."""
-    db = SessionLocal()
-    try:
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+# Tasks rendered per page in the index and "load more" fragments
+PAGE_SIZE = 50
+
+# Pages of tasks, invalidated by every write to the database
+task_cache = TaskListCache()
+
+async def task_page(db: AsyncSession, cursor: Optional[str], limit: int) -> dict:
+    """Fetch one page of tasks plus the cursor of the next page."""
+    async def load():
+        # The load is shared with concurrent requests and may outlive this
+        # one, so it must not use this request's session
+        async with AsyncSession(db.bind, expire_on_commit=False) as session:
+            return await list_tasks(session, cursor=cursor, limit=limit + 1)
+
+    try:
+        tasks = await task_cache.get_or_load((None, cursor, limit + 1), load)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    next_cursor = encode_cursor(tasks[limit - 1]) if len(tasks) > limit else None
+    return {"tasks": tasks[:limit], "next_cursor": next_cursor, "limit": limit}
+
+# Tells this process's write generations apart from other runs' ones
+INSTANCE_ID = uuid4().hex[:12]
+
+def last_modified_settled() -> Optional[float]:
+    """Time of the last write, once no write can share its second.
+
+    HTTP dates have one-second resolution, so a Last-Modified sent in the
+    same second as a write would also match a later write in that second.
+    """
+    modified = last_modified()
+    return modified if time.time() - modified >= 1 else None
+
+def validators() -> dict:
+    """Cache validator headers for pages built from the task list.
+
+    Computed from the write generation, without any query. Each worker
+    has its own, so a validator only matches on the worker that sent it.
+    Last-Modified is left out within a second of a write, see
+    last_modified_settled.
+    """
+    headers = {
+        "ETag": f'W/"{INSTANCE_ID}-{generation()}"',
+        "Cache-Control": "no-cache",
+    }
+    modified = last_modified_settled()
+    if modified is not None:
+        headers["Last-Modified"] = formatdate(modified, usegmt=True)
+    return headers
+
+def not_modified(request: Request, headers: dict) -> bool:
+    """Check the request's conditional headers against our validators."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        etag = headers["ETag"].removeprefix("W/")
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    modified = last_modified_settled()
+    if if_modified_since is not None and modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(modified) <= since
+    return False
 
 @app.get("/", response_class=HTMLResponse)
-async def index(request: Request, db: Session = Depends(get_db)):
+async def index(
+    request: Request,
+    limit: int = Query(PAGE_SIZE, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+):
     """Render main task list."""
-    tasks = list_tasks(db)
-    return templates.TemplateResponse(
+    headers = validators()
+    if not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
+    response = templates.TemplateResponse(
         "index.html",
-        {"request": request, "tasks": tasks}
+        {"request": request, **await task_page(db, None, limit)}
+    )
+    response.headers.update(headers)
+    return response
+
+@app.get("/tasks", response_class=HTMLResponse)
+async def tasks_page(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(PAGE_SIZE, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+):
+    """Render the next page of tasks as an HTMX fragment."""
+    headers = validators()
+    if not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
+    response = templates.TemplateResponse(
+        "_task_page.html",
+        {"request": request, "oob_more": True,
+         **await task_page(db, cursor, limit)}
+    )
+    response.headers.update(headers)
+    return response
+
+# Id prefix of tasks rendered in the search results, see _task.html
+SEARCH_PREFIX = "search-"
+
+@app.get("/tasks/search", response_class=HTMLResponse)
+async def search(
+    request: Request,
+    q: str = Query("", max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+):
+    """Render tasks matching the search box as an HTMX fragment."""
+    headers = validators()
+    if not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
+    response = templates.TemplateResponse(
+        "_search_results.html",
+        {"request": request, "query": q, "prefix": SEARCH_PREFIX,
+         "tasks": await search_tasks(db, q, limit)}
+    )
+    response.headers.update(headers)
+    return response
+
+def task_json(task: Task) -> dict:
+    """Convert a task to the JSON shape of the change feed."""
+    return {
+        "id": str(task.id),
+        "number": task.number,
+        "title": task.title,
+        "status": task.status.value,
+        "created_at": task.created_at.isoformat(),
+        "updated_at": task.updated_at.isoformat(),
+        "version": task.version,
+    }
+
+@app.get("/tasks/changes")
+async def changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(1000, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    consumer: Optional[str] = Query(None, min_length=1, max_length=100),
+    db: AsyncSession = Depends(get_db),
+):
+    """Return the tasks changed after a change log sequence number as JSON.
+
+    Deleted tasks come back as tombstones. Pass the returned ``seq`` as
+    ``since`` next time; ``reset`` means the changes are a page of a
+    snapshot of every task, to replace the mirror with, and the returned
+    ``cursor`` asks for its next page. Clients that name themselves with
+    ``consumer`` acknowledge ``since`` and have the entries after it kept
+    for them by compaction.
+    """
+    try:
+        change_set = await list_changes(db, since, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    body = {
+        "seq": change_set.seq,
+        "more": change_set.more,
+        "reset": change_set.reset,
+        "cursor": change_set.cursor,
+        "changes": [
+            {"id": str(task_id), "deleted": task is None,
+             "created": task_id in change_set.created,
+             "task": None if task is None else task_json(task)}
+            for task_id, task in change_set.changes
+        ],
+    }
+    # Serialized first: acknowledging may roll back, expiring the tasks
+    if consumer is not None:
+        # A snapshot covers everything up to the seq of its last page
+        await acknowledge_changes(
+            db, consumer, change_set.seq if change_set.reset else since
+        )
+    return body
+
+@app.get("/stats")
+async def stats(request: Request, db: AsyncSession = Depends(get_db)):
+    """Return task counts per status as JSON."""
+    headers = validators()
+    if not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
+    pending = await count_tasks(db, TaskStatus.PENDING)
+    completed = await count_tasks(db, TaskStatus.COMPLETED)
+    return JSONResponse(
+        {"pending": pending, "completed": completed, "total": pending + completed},
+        headers=headers
+    )
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Expose per-operation query metrics in the Prometheus text format."""
+    if not enabled():
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(
+        render_prometheus(), media_type="text/plain; version=0.0.4"
+    )
+
+@app.get("/events")
+async def events():
+    """Stream live task changes as Server-Sent Events."""
+    return StreamingResponse(
+        hub.stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 @app.post("/tasks")
 async def add_task(
     request: Request,
     title: str = Form(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Add a new task."""
-    task = create_task(db, title)
+    if writer is not None:
+        task = await writer.create_task(title)
+    else:
+        task = await create_task(db, title)
     if request.headers.get("HX-Request"):
         return templates.TemplateResponse(
             "_task.html",
@@ -73,24 +345,26 @@ async def add_task(
 async def toggle_task(
     request: Request,
     task_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Toggle task completion status."""
-    task = get_task(db, task_id)
-    if not task:
+    try:
+        if writer is not None:
+            task = await writer.toggle_task_status(task_id)
+        else:
+            task = await toggle_task_status(db, task_id)
+    except ValueError:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    new_status = (
-        TaskStatus.COMPLETED
-        if task.status == TaskStatus.PENDING
-        else TaskStatus.PENDING
-    )
-    task = update_task(db, task_id, status=new_status)
-
     if request.headers.get("HX-Request"):
+        # A search result copy is replaced by one keeping its own id; the
+        # list row follows through the task event
+        prefix = SEARCH_PREFIX if request.headers.get(
+            "HX-Target", ""
+        ).startswith(SEARCH_PREFIX) else ""
         return templates.TemplateResponse(
             "_task.html",
-            {"request": request, "task": task}
+            {"request": request, "task": task, "prefix": prefix}
         )
     return RedirectResponse(url="/", status_code=303)
 
@@ -98,14 +372,17 @@ async def toggle_task(
 async def remove_task(
     request: Request,
     task_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Delete a task."""
-    task = get_task(db, task_id)
-    if not task:
+    try:
+        if writer is not None:
+            await writer.delete_task(task_id)
+        else:
+            await delete_task(db, task_id)
+    except ValueError:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    delete_task(db, task_id)
     if request.headers.get("HX-Request"):
         return ""
     return RedirectResponse(url="/", status_code=303)
\ No newline at end of file
@@ -0,0 +1,197 @@
+"""Per-request phase timing for the web interface.
+
+ServerTimingMiddleware starts a RequestTiming for every request and
+keeps it in a context variable, which SQLAlchemy's async greenlets and
+Jinja rendering inherit. Listeners installed by install() add to it:
+
+- db: time executing SQL statements, and how many were run
+- hydrate: ORM time around those statements, mostly building Task objects
+- commit: time committing, flushes excluded
+- template: time rendering Jinja templates
+
+Outside a request the listeners return immediately.
+
+Phases are reported when the response starts, so long-lived streams
+such as /events are timed up to their headers, not for their lifetime.
+"""
+
+import json
+import logging
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from jinja2 import Environment, Template
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+SLOW_REQUEST_ENV = "TODO_SLOW_REQUEST_MS"
+DEFAULT_SLOW_REQUEST_MS = 500.0
+
+logger = logging.getLogger("todo_api.slow_requests")
+
+class RequestTiming:
+    """Time spent per phase of one request, in seconds.
+
+    Attributes:
+        start: perf_counter value when the request started
+        db: SQL statement execution time
+        statements: Number of SQL statements executed
+        hydrate: ORM execution time not spent in SQL
+        commit: Commit time, flushes excluded
+        template: Template rendering time
+    """
+
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.db = 0.0
+        self.statements = 0
+        self.hydrate = 0.0
+        self.commit = 0.0
+        self.template = 0.0
+
+    def elapsed(self) -> float:
+        """Seconds since the request started."""
+        return time.perf_counter() - self.start
+
+    def server_timing(self) -> str:
+        """Format the phases as a Server-Timing header value."""
+        return ", ".join((
+            f'db;dur={self.db * 1000:.2f};desc="{self.statements} statements"',
+            f"hydrate;dur={self.hydrate * 1000:.2f}",
+            f"commit;dur={self.commit * 1000:.2f}",
+            f"template;dur={self.template * 1000:.2f}",
+            f"total;dur={self.elapsed() * 1000:.2f}",
+        ))
+
+    def log_record(self, method: str, path: str, status: int) -> dict:
+        """Build the structured slow request log record."""
+        return {
+            "method": method,
+            "path": path,
+            "status": status,
+            "total_ms": round(self.elapsed() * 1000, 2),
+            "db_ms": round(self.db * 1000, 2),
+            "statements": self.statements,
+            "hydrate_ms": round(self.hydrate * 1000, 2),
+            "commit_ms": round(self.commit * 1000, 2),
+            "template_ms": round(self.template * 1000, 2),
+        }
+
+current: ContextVar[Optional[RequestTiming]] = ContextVar(
+    "request_timing", default=None
+)
+
+def slow_request_threshold() -> float:
+    """Seconds after which a request is logged, from $TODO_SLOW_REQUEST_MS."""
+    return float(
+        os.environ.get(SLOW_REQUEST_ENV) or DEFAULT_SLOW_REQUEST_MS
+    ) / 1000
+
+def log_slow_request(timing: RequestTiming, method: str, path: str,
+                     status: int) -> None:
+    """Write one JSON log line for a request over the threshold."""
+    logger.warning(json.dumps(timing.log_record(method, path, status)))
+
+class ServerTimingMiddleware:
+    """ASGI middleware adding Server-Timing and logging slow requests.
+
+    Plain ASGI rather than BaseHTTPMiddleware, so streamed responses are
+    passed through without an extra task and queue per connection.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_timing = RequestTiming()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(
+                    "Server-Timing", request_timing.server_timing()
+                )
+                if request_timing.elapsed() >= slow_request_threshold():
+                    log_slow_request(request_timing, scope["method"],
+                                     scope["path"], message["status"])
+            await send(message)
+
+        token = current.set(request_timing)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current.reset(token)
+
+class TimedTemplate(Template):
+    """Jinja template that adds its rendering time to the request."""
+
+    def render(self, *args, **kwargs) -> str:
+        timing = current.get()
+        if timing is None:
+            return super().render(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return super().render(*args, **kwargs)
+        finally:
+            timing.template += time.perf_counter() - start
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context,
+                           executemany):
+    timing = current.get()
+    if timing is not None:
+        timing.statements += 1
+        context._request_timing_start = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context,
+                          executemany):
+    timing = current.get()
+    start = getattr(context, "_request_timing_start", None)
+    if timing is not None and start is not None:
+        timing.db += time.perf_counter() - start
+
+def _do_orm_execute(orm_execute_state):
+    timing = current.get()
+    if timing is None:
+        return None
+    # Async sessions prebuffer, so Task objects are built before this returns
+    start, db = time.perf_counter(), timing.db
+    try:
+        return orm_execute_state.invoke_statement()
+    finally:
+        timing.hydrate += time.perf_counter() - start - (timing.db - db)
+
+def _before_commit(session):
+    if current.get() is not None:
+        session.info["request_timing_commit"] = time.perf_counter()
+
+def _after_flush_postexec(session, flush_context):
+    if "request_timing_commit" in session.info:
+        session.info["request_timing_commit"] = time.perf_counter()
+
+def _after_commit(session):
+    start = session.info.pop("request_timing_commit", None)
+    timing = current.get()
+    if timing is not None and start is not None:
+        timing.commit += time.perf_counter() - start
+
+def install(env: Environment) -> None:
+    """Attach the timing listeners and time templates of env."""
+    env.template_class = TimedTemplate
+    for target, name, listener in (
+        (Engine, "before_cursor_execute", _before_cursor_execute),
+        (Engine, "after_cursor_execute", _after_cursor_execute),
+        (Session, "do_orm_execute", _do_orm_execute),
+        (Session, "before_commit", _before_commit),
+        (Session, "after_flush_postexec", _after_flush_postexec),
+        (Session, "after_commit", _after_commit),
+    ):
+        if not event.contains(target, name, listener):
+            event.listen(target, name, listener)
@@ -34,4 +34,50 @@ def test_serve_command_help(runner):
     assert "Start the API server" in result.output
     assert "--host" in result.output
     assert "--port" in result.output
-    assert "--reload" in result.output
\ No newline at end of file
+    assert "--reload" in result.output
+
+def test_serve_options(runner, monkeypatch, tmp_path):
+    """Test serve creates the schema once and passes tuning options on."""
+    import sqlite3
+
+    from todo_api import cli as cli_module
+
+    calls = []
+    monkeypatch.setattr(cli_module.uvicorn, "run",
+                        lambda app, **kwargs: calls.append(kwargs))
+    path = tmp_path / "serve.db"
+    # serve exports its settings; restore them after the test
+    monkeypatch.setenv("TODO_DB", str(path))
+
+    result = runner.invoke(cli, [
+        "serve", "--db", str(path), "--workers", "4", "--loop", "asyncio",
+        "--http", "h11", "--backlog", "512", "--keep-alive", "15",
+    ])
+    assert result.exit_code == 0
+    assert calls == [{
+        "host": "127.0.0.1", "port": 8000, "reload": False, "workers": 4,
+        "loop": "asyncio", "http": "h11", "backlog": 512,
+        "timeout_keep_alive": 15,
+    }]
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA user_version").fetchone()[0] > 0
+
+def test_serve_reload_with_workers(runner):
+    """Test --reload cannot be combined with several workers."""
+    result = runner.invoke(cli, ["serve", "--reload", "--workers", "2"])
+    assert result.exit_code == 1
+    assert "--reload cannot be combined with --workers" in result.output
+
+def test_serve_without_fast_extra(runner, monkeypatch):
+    """Test that a missing uvloop or httptools is reported clearly."""
+    from todo_api import cli as cli_module
+
+    monkeypatch.setattr(cli_module, "find_spec", lambda name: None)
+    monkeypatch.setattr(cli_module.uvicorn, "run",
+                        lambda app, **kwargs: pytest.fail("server started"))
+    for option, module in (("--loop", "uvloop"), ("--http", "httptools")):
+        result = runner.invoke(cli, ["serve", option, module])
+        assert result.exit_code == 1
+        assert f"{option} {module} needs {module}" in result.output
+        assert "todo-api[fast]" in result.output
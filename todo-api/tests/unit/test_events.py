@@ -0,0 +1,187 @@
+"""Unit tests for the Server-Sent Events hub."""
+
+import asyncio
+from functools import partial
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from todo_api.events import EventHub, encode_event, follow_changes
+from todo_core.models import Base
+from todo_core.operations import (
+    acknowledge_changes, create_task, delete_task, list_changes,
+    toggle_task_status
+)
+
+def test_encode_event():
+    """Test every data line gets its own field."""
+    assert encode_event("task", "<div>\n</div>") == (
+        b"event: task\ndata: <div>\ndata: </div>\n\n"
+    )
+
+def test_publish_fans_out():
+    """Test one publish reaches every subscriber with the same bytes."""
+    async def main():
+        hub = EventHub()
+        first, second = hub.subscribe(), hub.subscribe()
+        hub.publish("task", "hello")
+        assert first.queue.get_nowait() == second.queue.get_nowait()
+        for subscriber in (first, second):
+            hub.unsubscribe(subscriber)
+        assert len(hub) == 0
+    asyncio.run(main())
+
+def test_slow_subscriber_is_dropped():
+    """Test a subscriber that falls too far behind is disconnected."""
+    async def main():
+        hub = EventHub(max_queue=2)
+        slow = hub.subscribe()
+        for i in range(3):
+            hub.publish("task", str(i))
+        assert len(hub) == 0
+        assert slow.queue.get_nowait() is None
+    asyncio.run(main())
+
+def test_stream_and_heartbeat():
+    """Test a stream yields keep-alives and published events, then ends."""
+    async def main():
+        hub = EventHub(heartbeat=0.01)
+        stream = hub.stream()
+        assert await anext(stream) == EventHub.KEEP_ALIVE
+        # The heartbeat task keeps idle streams alive
+        assert await anext(stream) == EventHub.KEEP_ALIVE
+        hub.publish("task", "news")
+        message = await anext(stream)
+        while message == EventHub.KEEP_ALIVE:
+            message = await anext(stream)
+        assert message == b"event: task\ndata: news\n\n"
+        hub.close()
+        assert [m async for m in stream if m != EventHub.KEEP_ALIVE] == []
+        assert len(hub) == 0
+    asyncio.run(main())
+
+def test_task_events_render_out_of_band_swaps():
+    """Test created/toggled/deleted tasks are rendered as OOB fragments."""
+    from uuid import uuid4
+
+    from todo_api import main
+    from todo_core.models import Task
+
+    task = Task("Shared")
+    task.id = uuid4()
+    # Edited since it was created, within one poll
+    task.version = 2
+    created = main.render_task_event(task.id, task, True)
+    toggled = main.render_task_event(task.id, task, False)
+    deleted = main.render_task_event(task.id, None, False)
+    assert 'hx-swap-oob="beforeend:#task-list"' in created and "Shared" in created
+    assert 'hx-swap-oob="true"' in toggled
+    assert 'hx-swap-oob="delete"' in deleted
+
+def render_change(task_id, task, created):
+    """Render a change as its title and version, or as a tombstone."""
+    if task is None:
+        return "deleted"
+    return f"{task.title} {task.version}{' created' if created else ''}"
+
+def follow(path, interval=0.01):
+    """Return a hub publishing the changes committed to a database file."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    return EventHub(source=partial(
+        follow_changes, session_factory=async_sessionmaker(engine),
+        path=str(path), render=render_change, interval=interval
+    ))
+
+def test_follow_changes_publishes_every_commit(tmp_path):
+    """Test that writes by another connection reach subscribers, in order."""
+    path = tmp_path / "events.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+
+    def write(operation, *args):
+        with Session(engine, expire_on_commit=False) as db:
+            return operation(db, *args)
+
+    def create_and_edit(db, title):
+        # Both before the poller looks again
+        return toggle_task_status(db, create_task(db, title).id)
+
+    async def next_event(subscriber):
+        return (await asyncio.wait_for(subscriber.queue.get(), 5)).decode()
+
+    async def main():
+        hub = follow(path)
+        subscriber = hub.subscribe()
+        # Let the poller read where the log is before anything is written
+        await asyncio.sleep(0.05)
+        events = []
+        # Written off the loop, the way another process would
+        task_id = (await asyncio.to_thread(write, create_task, "Shared")).id
+        events.append(await next_event(subscriber))
+        await asyncio.to_thread(write, toggle_task_status, task_id)
+        events.append(await next_event(subscriber))
+        await asyncio.to_thread(write, delete_task, task_id)
+        events.append(await next_event(subscriber))
+        await asyncio.to_thread(write, create_and_edit, "Edited")
+        events.append(await next_event(subscriber))
+        poller = hub._tasks[-1]
+        hub.unsubscribe(subscriber)
+        await asyncio.wait([poller], timeout=5)
+        assert poller.cancelled()
+        return events
+
+    assert asyncio.run(main()) == [
+        encode_event("task", "Shared 1 created").decode(),
+        encode_event("task", "Shared 2").decode(),
+        encode_event("task", "deleted").decode(),
+        encode_event("task", "Edited 2 created").decode(),
+    ]
+    engine.dispose()
+
+def test_follow_changes_resets_after_compaction(tmp_path):
+    """Test that pages are told to reload when unread changes were compacted."""
+    path = tmp_path / "events.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        create_task(db, "Before")
+
+    async def main():
+        hub = follow(path)
+        subscriber = hub.subscribe()
+        await asyncio.sleep(0.05)
+        # Blocks the loop, so the poller only looks after the compaction
+        with Session(engine) as db:
+            create_task(db, "Compacted")
+            acknowledge_changes(db, "mirror", list_changes(db).seq)
+        message = await asyncio.wait_for(subscriber.queue.get(), 5)
+        hub.close()
+        return message
+
+    assert asyncio.run(main()) == encode_event("reset", "")
+    engine.dispose()
+
+def test_failed_source_is_restarted(caplog):
+    """Test that a source that fails is logged, restarted and pages reset."""
+    starts = []
+
+    async def source(hub):
+        starts.append(1)
+        if len(starts) == 1:
+            raise RuntimeError("boom")
+        hub.publish("task", "recovered")
+        await asyncio.Event().wait()
+
+    async def main():
+        hub = EventHub(source=source, restart_delay=0.01)
+        subscriber = hub.subscribe()
+        messages = [await asyncio.wait_for(subscriber.queue.get(), 5)
+                    for _ in range(2)]
+        hub.close()
+        return messages
+
+    assert asyncio.run(main()) == [
+        encode_event("reset", ""), encode_event("task", "recovered")
+    ]
+    assert "Event source stopped" in caplog.text and "boom" in caplog.text
@@ -4,31 +4,33 @@ Following Constitutional requirement: Test-First Development
 These tests MUST fail initially (RED phase)
 """
 
+import asyncio
+import os
+import tempfile
+import time
+from email.utils import formatdate
+from types import SimpleNamespace
+
 from fastapi.testclient import TestClient
 import pytest
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
+from todo_api import main
 from todo_api.main import app, get_db
+from todo_core.cache import invalidate
 from todo_core.models import Base
 
-# Setup in-memory database for testing
-engine = create_engine(
-    "sqlite:///:memory:",
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
-)
-TestingSessionLocal = sessionmaker(bind=engine)
-Base.metadata.create_all(engine)
+# Setup a throwaway database file for testing
+db_path = os.path.join(tempfile.mkdtemp(), "test.db")
+Base.metadata.create_all(create_engine(f"sqlite:///{db_path}"))
+engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+TestingSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
 
-def override_get_db():
+async def override_get_db():
     """Override database dependency for testing."""
-    db = TestingSessionLocal()
-    try:
+    async with TestingSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 app.dependency_overrides[get_db] = override_get_db
 
@@ -118,4 +120,252 @@ def test_delete_nonexistent_task(client):
         "/tasks/00000000-0000-0000-0000-000000000000",
         headers={"HX-Request": "true"}
     )
-    assert response.status_code == 404
\ No newline at end of file
+    assert response.status_code == 404
+
+def test_tasks_pagination(client):
+    """Test that the index renders a page and a load-more fragment."""
+    for i in range(3):
+        client.post("/tasks", data={"title": f"Paged {i}"},
+                    headers={"HX-Request": "true"})
+
+    response = client.get("/?limit=2")
+    assert response.status_code == 200
+    assert 'hx-get="/tasks?cursor=' in response.text
+    # New tasks are appended to the list, so the sentinel comes after it
+    task_list = response.text.split('id="task-list"')[1]
+    assert 'hx-get="/tasks?cursor=' not in task_list.split('id="task-more"')[0]
+
+    next_url = response.text.split('hx-get="/tasks?')[1].split('"')[0]
+    response = client.get("/tasks?" + next_url.replace("&amp;", "&"))
+    assert response.status_code == 200
+    assert 'hx-put="/tasks/' in response.text
+    assert '<div id="task-more" hx-swap-oob="true">' in response.text
+
+def test_tasks_page_invalid_cursor(client):
+    """Test that a malformed cursor is rejected."""
+    response = client.get("/tasks?cursor=bogus")
+    assert response.status_code == 400
+
+def test_index_cache_invalidated_by_writes(client):
+    """Test that a cached index page reflects new tasks."""
+    client.get("/")
+    client.post("/tasks", data={"title": "Fresh after cache"},
+                headers={"HX-Request": "true"})
+
+    response = client.get("/?limit=500")
+    assert "Fresh after cache" in response.text
+
+def test_index_conditional_get(client, monkeypatch):
+    """Test ETag and Last-Modified revalidation of the index."""
+    # Last-Modified is only sent a second after the last write
+    later = time.time() + 2
+    monkeypatch.setattr(main, "time", SimpleNamespace(time=lambda: later))
+    response = client.get("/")
+    etag = response.headers["ETag"]
+    modified = response.headers["Last-Modified"]
+
+    response = client.get("/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+    response = client.get("/", headers={"If-Modified-Since": modified})
+    assert response.status_code == 304
+
+    client.post("/tasks", data={"title": "Changes the ETag"},
+                headers={"HX-Request": "true"})
+    response = client.get("/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+def test_last_modified_waits_out_its_second(client, monkeypatch):
+    """Test that a write in the same second as a response isn't missed."""
+    clock = SimpleNamespace(time=time.time)
+    monkeypatch.setattr(main, "time", clock)
+    client.post("/tasks", data={"title": "First write"},
+                headers={"HX-Request": "true"})
+    response = client.get("/")
+    assert "Last-Modified" not in response.headers
+
+    since = formatdate(time.time(), usegmt=True)
+    client.post("/tasks", data={"title": "Same second"},
+                headers={"HX-Request": "true"})
+    response = client.get("/?limit=500", headers={"If-Modified-Since": since})
+    assert response.status_code == 200
+    assert "Same second" in response.text
+
+    later = time.time() + 2
+    clock.time = lambda: later
+    modified = client.get("/").headers["Last-Modified"]
+    response = client.get("/", headers={"If-Modified-Since": modified})
+    assert response.status_code == 304
+
+def test_tasks_page_conditional_get(client):
+    """Test that task list fragments revalidate too."""
+    response = client.get("/tasks")
+    response = client.get("/tasks", headers={"If-None-Match": response.headers["ETag"]})
+    assert response.status_code == 304
+
+def test_search_tasks(client):
+    """Test the search-as-you-type fragment."""
+    client.post("/tasks", data={"title": "Renew passport"},
+                headers={"HX-Request": "true"})
+
+    response = client.get("/tasks/search", params={"q": "renew pass"})
+    assert response.status_code == 200
+    assert "Renew passport" in response.text
+    # Copies of list rows, so none may take a list row's id
+    assert 'id="task-' not in response.text
+    assert 'hx-target="#task-' not in response.text
+    task_id = response.text.split('id="search-task-')[1].split('"')[0]
+
+    toggled = client.put(f"/tasks/{task_id}", headers={
+        "HX-Request": "true", "HX-Target": f"search-task-{task_id}"
+    })
+    assert f'id="search-task-{task_id}"' in toggled.text
+    toggled = client.put(f"/tasks/{task_id}", headers={"HX-Request": "true"})
+    assert f'id="task-{task_id}"' in toggled.text
+
+    response = client.get("/tasks/search", params={"q": "zzz"})
+    assert "No matching tasks" in response.text
+
+def test_stats(client):
+    """Test that /stats follows task writes."""
+    before = client.get("/stats").json()
+    client.post("/tasks", data={"title": "Counted"}, headers={"HX-Request": "true"})
+
+    after = client.get("/stats").json()
+    assert after["pending"] == before["pending"] + 1
+    assert after["total"] == after["pending"] + after["completed"]
+
+def test_task_changes(client):
+    """Test the delta feed: snapshot first, then changes and tombstones."""
+    client.post("/tasks", data={"title": "Snapshotted"})
+    client.post("/tasks", data={"title": "Snapshotted"})
+    params = {"consumer": "mirror", "limit": 1}
+    pages = [client.get("/tasks/changes", params=params).json()]
+    while pages[-1]["more"]:
+        params["cursor"] = pages[-1]["cursor"]
+        pages.append(client.get("/tasks/changes", params=params).json())
+    snapshot = pages[-1]
+    assert len(pages) > 1 and all(page["reset"] for page in pages)
+    assert all(page["seq"] == 0 for page in pages[:-1]) and snapshot["seq"] > 0
+    total = client.get("/stats").json()["total"]
+    assert sum(len(page["changes"]) for page in pages) == total
+    created = client.post("/tasks", data={"title": "Mirrored"})
+    task = next(
+        change["task"] for change in reversed(
+            client.get("/tasks/changes", params={"since": snapshot["seq"]})
+            .json()["changes"]
+        )
+        if change["task"]["title"] == "Mirrored"
+    )
+    client.delete(f"/tasks/{task['id']}")
+
+    delta = client.get(
+        "/tasks/changes", params={"since": snapshot["seq"], "consumer": "mirror"}
+    ).json()
+    assert created.status_code == 200
+    assert not delta["reset"] and not delta["more"]
+    assert delta["changes"] == [
+        {"id": task["id"], "deleted": True, "created": True, "task": None}
+    ]
+    assert client.get("/tasks/changes", params={"since": -1}).status_code == 422
+    assert client.get("/tasks/changes", params={"cursor": "7.bad"}).status_code == 400
+
+def test_metrics_disabled(client):
+    """Test /metrics is not served unless metrics are enabled."""
+    assert client.get("/metrics").status_code == 404
+
+def test_metrics(client):
+    """Test /metrics exposes per-operation query metrics."""
+    from todo_core import metrics
+
+    metrics.enable()
+    try:
+        client.post("/tasks", data={"title": "Measured"},
+                    headers={"HX-Request": "true"})
+        response = client.get("/metrics")
+    finally:
+        metrics.disable()
+        metrics.reset()
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'todo_db_commit_seconds_count{operation="create_task"} 1' in response.text
+
+def test_server_timing(client):
+    """Test every response reports its phases in Server-Timing."""
+    client.post("/tasks", data={"title": "Timed"}, headers={"HX-Request": "true"})
+    response = client.get("/")
+    assert response.status_code == 200
+    phases = {
+        entry.split(";")[0].strip(): entry
+        for entry in response.headers["Server-Timing"].split(",")
+    }
+    assert set(phases) == {"db", "hydrate", "commit", "template", "total"}
+    assert 'statements"' in phases["db"]
+
+def test_slow_request_log(client, monkeypatch, caplog):
+    """Test requests over the threshold are logged with their statements."""
+    import json
+    import logging
+
+    monkeypatch.setenv("TODO_SLOW_REQUEST_MS", "0")
+    with caplog.at_level(logging.WARNING, logger="todo_api.slow_requests"):
+        client.get("/stats")
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record["path"] == "/stats"
+    assert record["status"] == 200
+    assert record["statements"] >= 1
+
+def test_group_commit_writer(monkeypatch):
+    """Test mutations go through the group-commit writer when enabled."""
+    from todo_api import main
+    from todo_core.group_commit import GroupCommitWriter
+
+    writer = GroupCommitWriter(TestingSessionLocal)
+    monkeypatch.setattr(main, "writer", writer)
+    monkeypatch.setattr(main, "engine", engine)
+    with TestClient(app) as client:
+        response = client.post("/tasks", data={"title": "Grouped"},
+                               headers={"HX-Request": "true"})
+        assert response.status_code == 200
+        assert "Grouped" in response.text
+        task_id = response.text.split('id="task-')[1].split('"')[0]
+
+        response = client.put(f"/tasks/{task_id}", headers={"HX-Request": "true"})
+        assert response.status_code == 200
+        assert client.delete(f"/tasks/{task_id}").status_code in (200, 303)
+        assert client.delete(f"/tasks/{task_id}").status_code == 404
+    assert writer.mutations == 3
+
+def test_cancelled_page_load_leaves_shared_load(client):
+    """Test that cancelling the request that started a page load spares it."""
+    client.post("/tasks", data={"title": "Shared page"})
+
+    async def page():
+        async with TestingSessionLocal() as db:
+            return await main.task_page(db, None, 7)
+
+    async def run():
+        invalidate()
+        # Makes the shared load open a new connection, awaiting the driver
+        await engine.dispose()
+        leader = asyncio.create_task(page())
+        follower = asyncio.create_task(page())
+        loop = asyncio.get_running_loop()
+
+        def cancel_leader(*args):
+            # The shared load is connecting right now
+            loop.call_soon(leader.cancel)
+
+        event.listen(engine.sync_engine, "do_connect", cancel_leader)
+        try:
+            result = await follower
+        finally:
+            event.remove(engine.sync_engine, "do_connect", cancel_leader)
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return result
+
+    result = asyncio.run(run())
+    assert 0 < len(result["tasks"]) <= 7
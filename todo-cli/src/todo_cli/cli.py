@@ -7,37 +7,60 @@ Following Constitutional requirements:
 - Rich text output for better UX
 """
 
+import json
 import sys
-from typing import Optional
+import time
+from typing import List, Optional, Tuple
 
 import click
-from rich.console import Console
-from rich.table import Table
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from todo_core.models import Base, TaskStatus
-from todo_core.operations import (
-    create_task, get_task, list_tasks, update_task, delete_task
-)
 
 from . import __version__
 
-# Create console for rich output
-console = Console()
+# rich, SQLAlchemy and the database are loaded by the commands that need
+# them, so --help and --version stay fast for scripts.
 
-# Database setup (same as core for MVP)
-engine = create_engine("sqlite:///todo.db")
-Base.metadata.create_all(engine)
-SessionLocal = sessionmaker(bind=engine)
+_console = None
 
-def get_db():
-    """Get database session."""
-    db = SessionLocal()
+def get_console():
+    """Get the console for rich output."""
+    global _console
+    if _console is None:
+        from rich.console import Console
+
+        _console = Console()
+    return _console
+
+def set_console(console) -> None:
+    """Print to another console, e.g. a daemon client's; None resets it."""
+    global _console
+    _console = console
+
+def get_db(merge: bool = True):
+    """Get database session for the database chosen with --db.
+
+    Tasks captured with ``todo add --quick`` are merged first, so every
+    command that opens the database sees them.
+    """
+    from todo_core.db import database_path, get_session
+    from todo_core.journal import journal_path
+    from todo_core.operations import merge_journal
+
+    ctx = click.get_current_context(silent=True)
+    path = ctx.obj if ctx else None
+    db = get_session(path)
     try:
+        if merge:
+            merge_journal(db, journal_path(database_path(path)))
         yield db
     finally:
         db.close()
 
+def print_stats() -> None:
+    """Print the --stats query statistics as JSON to stderr."""
+    from todo_core.metrics import summary
+
+    click.echo(json.dumps(summary(), indent=2), err=True)
+
 def display_tasks(tasks, show_status: bool = True):
     """Display tasks in a rich table.
 
@@ -45,44 +68,113 @@ def display_tasks(tasks, show_status: bool = True):
         tasks: List of tasks to display
         show_status: Whether to show status column
     """
+    from rich.table import Table
+    from todo_core.models import TaskStatus
+
     table = Table(show_header=True)
     table.add_column("#", style="cyan")
     table.add_column("Title", style="white")
     if show_status:
         table.add_column("Status", style="green")
 
-    for i, task in enumerate(tasks, 1):
-        row = [str(i), task.title]
+    for task in tasks:
+        row = [str(task.number), task.title]
         if show_status:
             status_style = "green" if task.status == TaskStatus.COMPLETED else "yellow"
             row.append(f"[{status_style}]{task.status.value}[/{status_style}]")
         table.add_row(*row)
 
-    console.print(table)
+    get_console().print(table)
 
 @click.group()
 @click.version_option(version=__version__, prog_name="todo")
-def cli():
+@click.option("--db", "db_path", type=click.Path(dir_okay=False),
+              help="Database file (default: $TODO_DB or todo.db)")
+@click.option("--stats", is_flag=True,
+              help="Print per-operation query statistics to stderr")
+@click.pass_context
+def cli(ctx: click.Context, db_path: Optional[str], stats: bool):
     """Todo application CLI.
 
     A user-friendly command-line interface for managing tasks.
     """
-    pass
+    ctx.obj = db_path
+    if stats:
+        from todo_core.metrics import enable
+
+        enable()
+        ctx.call_on_close(print_stats)
 
 @cli.command()
 @click.argument("title")
-def add(title: str):
+@click.option("--quick", is_flag=True,
+              help="Append to the capture journal without opening the "
+                   "database; the next command reading it merges the task")
+@click.pass_context
+def add(ctx: click.Context, title: str, quick: bool):
     """Add a new task."""
+    if quick:
+        from todo_core.journal import capture, journal_path
+
+        from .client import database_path
+
+        try:
+            capture(journal_path(database_path(ctx.obj)), title)
+        except ValueError as e:
+            click.echo(f"Error: {str(e)}", err=True)
+            sys.exit(1)
+        click.echo(f"Captured task: {title}")
+        return
+
+    from todo_core.operations import create_task
+
     db = next(get_db())
     task = create_task(db, title)
-    console.print(f"Added task: [cyan]{task.title}[/cyan]")
+    get_console().print(f"Added task: [cyan]{task.title}[/cyan] (#{task.number})")
+
+def show_task_list(db, status, after: Optional[str], limit: Optional[int]):
+    """Query and display one page of tasks for ``todo list``."""
+    from todo_core.models import TaskStatus
+    from todo_core.operations import encode_cursor, list_tasks
+
+    try:
+        tasks = list_tasks(db, status=status, cursor=after,
+                           limit=limit + 1 if limit else None)
+    except ValueError as e:
+        click.echo(f"Error: {str(e)}", err=True)
+        sys.exit(1)
+    if not tasks:
+        get_console().print("[yellow]No tasks found[/yellow]")
+        return
+
+    has_more = limit is not None and len(tasks) > limit
+    tasks = tasks[:limit]
+    display_tasks(tasks)
+    if has_more:
+        # Repeat the filter and page size so the hint continues this listing
+        flag = {TaskStatus.COMPLETED: "--done ", TaskStatus.PENDING: "--pending "}
+        click.echo(f"More tasks: todo list {flag.get(status, '')}--limit {limit} "
+                   f"--after {encode_cursor(tasks[-1])}")
+
+# Seconds between checks for changes in watch mode; a check is one pragma
+# read, so the list is only queried again after a commit
+WATCH_INTERVAL = 0.2
 
 @cli.command()
 @click.option("--all", is_flag=True, help="Show all tasks")
 @click.option("--done", is_flag=True, help="Show completed tasks")
 @click.option("--pending", is_flag=True, help="Show pending tasks")
-def list(all: bool, done: bool, pending: bool):
+@click.option("--limit", type=click.IntRange(min=1),
+              help="Maximum number of tasks to show")
+@click.option("--after", help="Continue from a previous page's cursor")
+@click.option("--watch", is_flag=True,
+              help="Redraw whenever the tasks change, until Ctrl-C")
+@click.pass_context
+def list(ctx: click.Context, all: bool, done: bool, pending: bool,
+         limit: Optional[int], after: Optional[str], watch: bool):
     """List tasks."""
+    from todo_core.models import TaskStatus
+
     db = next(get_db())
     status = None
     if done:
@@ -90,40 +182,150 @@ def list(all: bool, done: bool, pending: bool):
     elif pending:
         status = TaskStatus.PENDING
 
-    tasks = list_tasks(db, status=status)
-    if not tasks:
-        console.print("[yellow]No tasks found[/yellow]")
+    if not watch:
+        show_task_list(db, status, after, limit)
         return
 
+    from todo_core.cache import DataVersion
+    from todo_core.db import database_path
+
+    # Any process committing to the file, including this one, changes it
+    detector = DataVersion(database_path(ctx.obj))
+    try:
+        while True:
+            get_console().clear()
+            show_task_list(db, status, after, limit)
+            while not detector.changed():
+                time.sleep(WATCH_INTERVAL)
+            # Read changed rows again instead of from the identity map
+            db.expire_all()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        detector.close()
+
+@cli.command()
+@click.argument("query", nargs=-1, required=True)
+@click.option("--limit", type=click.IntRange(min=1), default=20,
+              help="Maximum number of tasks to show")
+def search(query: Tuple[str, ...], limit: int):
+    """Search tasks by title words, e.g. ``todo search buy mil``."""
+    from todo_core.operations import search_tasks
+
+    db = next(get_db())
+    tasks = search_tasks(db, " ".join(query), limit)
+    if not tasks:
+        get_console().print("[yellow]No tasks found[/yellow]")
+        return
     display_tasks(tasks)
 
 @cli.command()
-@click.argument("task_number", type=int)
-def done(task_number: int):
-    """Mark a task as completed."""
+def stats():
+    """Show how many tasks are pending and done."""
+    from todo_core.models import TaskStatus
+    from todo_core.operations import count_tasks
+
     db = next(get_db())
-    tasks = list_tasks(db)
-    if not 1 <= task_number <= len(tasks):
-        console.print("[red]Error: Task not found[/red]", err=True)
-        sys.exit(1)
+    pending = count_tasks(db, TaskStatus.PENDING)
+    completed = count_tasks(db, TaskStatus.COMPLETED)
+    get_console().print(
+        f"[yellow]{pending}[/yellow] pending / [green]{completed}[/green] done "
+        f"({pending + completed} total)"
+    )
 
-    task = tasks[task_number - 1]
-    updated = update_task(db, task.id, status=TaskStatus.COMPLETED)
-    console.print(f"Completed task: [green]{updated.title}[/green]")
+def parse_targets(targets: Tuple[str, ...]) -> List[Tuple[int, int]]:
+    """Parse task numbers and ranges like ``3 7 10-25``.
+
+    Args:
+        targets: Command line arguments
+
+    Returns:
+        Inclusive (first, last) number ranges
+
+    Raises:
+        click.BadParameter: If a target is not a number or range
+    """
+    ranges = []
+    for target in targets:
+        first, dash, last = target.partition("-")
+        try:
+            # An open range like "3-" has an empty end and is refused
+            first, last = int(first), int(last if dash else first)
+        except ValueError:
+            raise click.BadParameter(
+                f"{target!r} is not a task number or range", param_hint="TARGETS"
+            ) from None
+        if not 1 <= first <= last:
+            raise click.BadParameter(f"{target!r} is an empty range",
+                                     param_hint="TARGETS")
+        ranges.append((first, last))
+    return ranges
 
 @cli.command()
-@click.argument("task_number", type=int)
-def rm(task_number: int):
-    """Remove a task."""
+@click.argument("targets", nargs=-1, required=True)
+def done(targets: Tuple[str, ...]):
+    """Mark tasks as completed, e.g. ``todo done 3 7 10-25``."""
+    from todo_core.models import TaskStatus
+    from todo_core.operations import update_numbered_tasks
+
+    ranges = parse_targets(targets)
     db = next(get_db())
-    tasks = list_tasks(db)
-    if not 1 <= task_number <= len(tasks):
-        console.print("[red]Error: Task not found[/red]", err=True)
+    try:
+        tasks = update_numbered_tasks(db, ranges, TaskStatus.COMPLETED)
+    except ValueError as e:
+        get_console().print(f"[red]Error: {e}[/red]")
         sys.exit(1)
+    for task in tasks:
+        get_console().print(f"Completed task: [green]{task.title}[/green]")
 
-    task = tasks[task_number - 1]
-    delete_task(db, task.id)
-    console.print(f"Removed task: [red]{task.title}[/red]")
+@cli.command()
+@click.argument("targets", nargs=-1, required=True)
+def rm(targets: Tuple[str, ...]):
+    """Remove tasks, e.g. ``todo rm 3 7 10-25``."""
+    from todo_core.operations import delete_numbered_tasks
+
+    ranges = parse_targets(targets)
+    db = next(get_db())
+    try:
+        tasks = delete_numbered_tasks(db, ranges)
+    except ValueError as e:
+        get_console().print(f"[red]Error: {e}[/red]")
+        sys.exit(1)
+    for task in tasks:
+        get_console().print(f"Removed task: [red]{task.title}[/red]")
+
+@cli.command()
+@click.pass_context
+def merge(ctx: click.Context):
+    """Merge tasks captured with ``todo add --quick`` into the database."""
+    from todo_core.db import database_path
+    from todo_core.journal import journal_path
+    from todo_core.operations import merge_journal
+
+    db = next(get_db(merge=False))
+    merged = merge_journal(db, journal_path(database_path(ctx.obj)))
+    get_console().print(f"Merged [cyan]{merged}[/cyan] captured tasks")
+
+@cli.command()
+@click.option("--socket", "socket_path", type=click.Path(dir_okay=False),
+              help="Socket to listen on (default: $TODO_DAEMON_SOCKET or "
+                   "todo-<uid>.sock in $XDG_RUNTIME_DIR)")
+@click.pass_context
+def daemon(ctx: click.Context, socket_path: Optional[str]):
+    """Serve todo commands from a warm process over a Unix socket.
+
+    While it runs, todo forwards add, list, search, stats, done, rm and
+    merge to it instead of starting up in-process, whichever database
+    they use.
+    """
+    from .client import default_socket_path
+    from .daemon import serve
+
+    try:
+        serve(socket_path or default_socket_path(), ctx.obj)
+    except ValueError as e:
+        click.echo(f"Error: {str(e)}", err=True)
+        sys.exit(1)
 
 def main():
     """Entry point for the CLI."""
@@ -0,0 +1,130 @@
+"""Entry point of the todo command, forwarding to a running daemon.
+
+Starting Python and importing click, rich and SQLAlchemy costs far more
+than the command itself. When `todo daemon` is running, this module sends
+the command line to it over a Unix socket and prints the reply, importing
+nothing beyond the standard library. Without a daemon, or for commands a
+daemon shouldn't run (--stats, list --watch, the daemon itself), the
+command runs in-process as before.
+
+Following Constitutional requirements:
+- CLI interface must be user-friendly
+- Use standard Unix exit codes
+"""
+
+import json
+import os
+import socket
+import stat
+import sys
+from typing import List, Optional
+
+DAEMON_SOCKET_ENV = "TODO_DAEMON_SOCKET"
+# Mirrors todo_core.db, which imports SQLAlchemy
+DATABASE_PATH_ENV = "TODO_DB"
+DEFAULT_DATABASE_PATH = "todo.db"
+
+# Short commands worth forwarding; anything else runs in-process
+FORWARDED_COMMANDS = {"add", "list", "search", "stats", "done", "rm", "merge"}
+# Terminal settings the daemon needs to render output like we would
+TERMINAL_ENV = ("TERM", "COLORTERM", "NO_COLOR", "FORCE_COLOR", "COLUMNS")
+
+def default_socket_path() -> str:
+    """Per-user socket of the daemon, overridable with $TODO_DAEMON_SOCKET."""
+    path = os.environ.get(DAEMON_SOCKET_ENV)
+    if path:
+        return path
+    directory = (os.environ.get("XDG_RUNTIME_DIR") or os.environ.get("TMPDIR")
+                 or "/tmp")
+    return os.path.join(directory, f"todo-{os.getuid()}.sock")
+
+def database_path(path: Optional[str] = None) -> str:
+    """Resolve the database file location like todo_core.db.database_path."""
+    return path or os.environ.get(DATABASE_PATH_ENV) or DEFAULT_DATABASE_PATH
+
+def is_own_socket(path: str) -> bool:
+    """Whether path is a socket of the current user, not a link to one.
+
+    The default socket may sit in a shared directory like /tmp, where
+    another user could create it first to receive our commands.
+    """
+    try:
+        info = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(info.st_mode) and info.st_uid == os.getuid()
+
+def forwarded_args(args: List[str]) -> Optional[List[str]]:
+    """Arguments to send to the daemon, or None to run the command here.
+
+    The database is always passed as an absolute --db path, so the
+    daemon's own working directory and environment don't matter.
+    """
+    db_path = None
+    while args and args[0].startswith("--db"):
+        if args[0] == "--db" and len(args) > 1:
+            db_path, args = args[1], args[2:]
+        elif args[0].startswith("--db="):
+            db_path, args = args[0][len("--db="):], args[1:]
+        else:
+            return None
+    if not args or args[0] not in FORWARDED_COMMANDS or "--watch" in args:
+        return None
+    return ["--db", os.path.abspath(database_path(db_path)), *args]
+
+def terminal_width() -> Optional[int]:
+    """Columns of the terminal on stdout, if it is one."""
+    try:
+        return os.get_terminal_size(sys.stdout.fileno()).columns
+    except (OSError, ValueError):
+        return None
+
+def forward(args: List[str], path: Optional[str] = None) -> Optional[int]:
+    """Run a command on the daemon and print its output.
+
+    Args:
+        args: Command line, as returned by forwarded_args
+        path: Daemon socket (default: default_socket_path())
+
+    Returns:
+        Exit code of the command, or None if no daemon of ours accepted it
+    """
+    path = path or default_socket_path()
+    if not hasattr(socket, "AF_UNIX") or not is_own_socket(path):
+        return None
+    request = json.dumps({
+        "argv": args,
+        "tty": sys.stdout.isatty(),
+        "width": terminal_width(),
+        "env": {name: os.environ[name] for name in TERMINAL_ENV
+                if name in os.environ},
+    }).encode()
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(path)
+        except OSError:
+            return None
+        # From here on the command may have run, so it is never retried
+        try:
+            client.sendall(request + b"\n")
+            client.shutdown(socket.SHUT_WR)
+            reply = b"".join(iter(lambda: client.recv(65536), b""))
+            response = json.loads(reply)
+        except (OSError, ValueError) as e:
+            print(f"Error: Lost the todo daemon: {e}", file=sys.stderr)
+            return 1
+    sys.stdout.write(response["stdout"])
+    sys.stderr.write(response["stderr"])
+    return response["exit_code"]
+
+def main():
+    """Entry point for the todo command."""
+    args = forwarded_args(sys.argv[1:])
+    if args is not None:
+        exit_code = forward(args)
+        if exit_code is not None:
+            sys.exit(exit_code)
+
+    from .cli import main as run_in_process
+
+    run_in_process()
@@ -0,0 +1,168 @@
+"""Warm process serving todo commands over a Unix socket.
+
+`todo daemon` imports rich, SQLAlchemy and todo_core once and keeps the
+engine and session factory of every database it was asked about, so a
+forwarded command (see client.py) only costs the query itself.
+
+Each connection carries one command: a JSON line with the arguments and
+the caller's terminal settings, answered with a JSON object holding the
+command's stdout, stderr and exit code. Commands run one at a time, as
+they would from separate processes writing the same SQLite file.
+"""
+
+import io
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from typing import Dict, List, Optional
+
+def color_system(env: Dict[str, str]) -> Optional[str]:
+    """Colors of the caller's terminal, from its TERM and COLORTERM."""
+    term = env.get("TERM", "").lower()
+    if term == "dumb":
+        return None
+    if env.get("COLORTERM", "").lower() in ("truecolor", "24bit"):
+        return "truecolor"
+    if "256color" in term:
+        return "256"
+    return "standard"
+
+def run_command(argv: List[str], tty: bool = False, width: Optional[int] = None,
+                env: Optional[Dict[str, str]] = None) -> dict:
+    """Run one todo command line and capture what it prints.
+
+    Args:
+        argv: Arguments after the program name
+        tty: Whether the caller's stdout is a terminal
+        width: Columns of the caller's terminal
+        env: Caller's terminal settings, see client.TERMINAL_ENV
+
+    Returns:
+        Dict with the command's stdout, stderr and exit_code
+    """
+    from rich.console import Console
+    from sqlalchemy.orm import close_all_sessions
+
+    from .cli import cli, set_console
+
+    env = env or {}
+    stdout, stderr = io.StringIO(), io.StringIO()
+    force_terminal = tty or "FORCE_COLOR" in env
+    if width is None and env.get("COLUMNS", "").isdigit():
+        width = int(env["COLUMNS"])
+    set_console(Console(
+        file=stdout,
+        force_terminal=force_terminal,
+        color_system=color_system(env) if force_terminal else None,
+        no_color="NO_COLOR" in env,
+        width=width or 80,
+    ))
+    try:
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            try:
+                cli.main(args=argv, prog_name="todo")
+                exit_code = 0
+            except SystemExit as e:
+                if e.code is None or isinstance(e.code, int):
+                    exit_code = e.code or 0
+                else:
+                    print(e.code, file=sys.stderr)
+                    exit_code = 1
+            except Exception:
+                traceback.print_exc()
+                exit_code = 1
+    finally:
+        set_console(None)
+        # Commands leave their session to the garbage collector, which
+        # would hold pooled connections long after they're done here
+        close_all_sessions()
+    return {
+        "stdout": stdout.getvalue(),
+        "stderr": stderr.getvalue(),
+        "exit_code": exit_code,
+    }
+
+class CommandHandler(socketserver.StreamRequestHandler):
+    """Runs the command sent on one connection and replies with its output."""
+
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        if not line:
+            # A liveness probe, see make_server
+            return
+        try:
+            request = json.loads(line)
+            response = run_command(request["argv"], request.get("tty", False),
+                                   request.get("width"), request.get("env"))
+        except (ValueError, KeyError, TypeError) as e:
+            response = {"stdout": "", "stderr": f"Error: Bad request: {e}\n",
+                        "exit_code": 2}
+        try:
+            self.wfile.write(json.dumps(response).encode())
+        except OSError:
+            # The client went away; the command has run regardless
+            pass
+
+def make_server(path: str) -> socketserver.UnixStreamServer:
+    """Bind the daemon socket, replacing a stale one.
+
+    Raises:
+        ValueError: If another daemon is listening on the socket
+    """
+    if os.path.exists(path):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(path)
+            except OSError:
+                os.unlink(path)
+            else:
+                raise ValueError(f"A todo daemon is already running on {path}")
+    # Only the owner may run commands through the socket
+    umask = os.umask(0o077)
+    try:
+        return socketserver.UnixStreamServer(path, CommandHandler)
+    finally:
+        os.umask(umask)
+
+def warm_up(db_path: Optional[str]) -> None:
+    """Import what commands need and open the chosen database, if any.
+
+    Forwarded commands name their database by absolute path, so it is
+    opened under that path. Without --db or $TODO_DB nothing is opened,
+    rather than creating todo.db in the daemon's working directory.
+    """
+    import rich.table  # noqa: F401
+    import todo_core.operations  # noqa: F401
+    from todo_core.db import DATABASE_PATH_ENV, get_engine
+
+    db_path = db_path or os.environ.get(DATABASE_PATH_ENV)
+    if db_path:
+        get_engine(os.path.abspath(db_path))
+
+def serve(path: str, db_path: Optional[str] = None) -> None:
+    """Serve commands on the socket until interrupted or terminated.
+
+    Args:
+        path: Unix socket to listen on
+        db_path: Database to open up front; others open on first use
+
+    Raises:
+        ValueError: If another daemon is listening on the socket
+    """
+    server = make_server(path)
+    try:
+        warm_up(db_path)
+        # Stop on SIGTERM like on Ctrl-C, so the socket is removed
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+        print(f"Listening on {path}", file=sys.stderr)
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.unlink(path)
@@ -5,6 +5,8 @@ These tests MUST fail initially (RED phase)
 """
 
 from click.testing import CliRunner
+import subprocess
+import sys
 import pytest
 from rich.console import Console
 
@@ -109,4 +111,149 @@ def test_output_style(runner):
     # Rich styling should be present (table borders, colors)
     assert "─" in result.output  # Table border
     assert "pending" in result.output.lower()
-    assert "completed" in result.output.lower()
\ No newline at end of file
+    assert "completed" in result.output.lower()
+
+def test_cli_import_is_lightweight():
+    """Test that importing the CLI defers SQLAlchemy and rich."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import todo_cli.cli"],
+        capture_output=True, text=True, check=True
+    )
+    imported = {line.split("|")[-1].strip() for line in result.stderr.splitlines()}
+    assert "todo_cli.cli" in imported
+    assert not any(m.startswith(("sqlalchemy", "rich")) for m in imported)
+
+def test_db_option(runner, tmp_path):
+    """Test that --db points the CLI at another database file."""
+    db_file = tmp_path / "other.db"
+    result = runner.invoke(cli, ["--db", str(db_file), "add", "Elsewhere"])
+    assert result.exit_code == 0
+    assert db_file.exists()
+
+    result = runner.invoke(cli, ["--db", str(db_file), "list"])
+    assert "Elsewhere" in result.output
+
+def test_done_and_rm_accept_ranges(runner, tmp_path):
+    """Test batch targets and that numbers stay stable after removals."""
+    db = ["--db", str(tmp_path / "batch.db")]
+    for i in range(1, 7):
+        runner.invoke(cli, [*db, "add", f"Task {i}"])
+
+    result = runner.invoke(cli, [*db, "rm", "1", "3-4"])
+    assert result.exit_code == 0
+    assert result.output.count("Removed task:") == 3
+
+    result = runner.invoke(cli, [*db, "done", "2", "5-6"])
+    assert result.exit_code == 0
+    assert result.output.count("Completed task:") == 3
+
+    result = runner.invoke(cli, [*db, "done", "2", "3"])
+    assert result.exit_code == 1
+    assert "Task not found: 3" in result.output
+
+    result = runner.invoke(cli, [*db, "rm", "4-2"])
+    assert result.exit_code == 2
+
+    result = runner.invoke(cli, [*db, "rm", "5-"])
+    assert result.exit_code == 2
+    assert "'5-' is not a task number or range" in result.output
+
+def test_list_next_page_keeps_filter(runner, tmp_path):
+    """Test that the next-page hint repeats the status filter and limit."""
+    db = ["--db", str(tmp_path / "pages.db")]
+    for i in range(1, 5):
+        runner.invoke(cli, [*db, "add", f"Task {i}"])
+    runner.invoke(cli, [*db, "done", "1-3"])
+
+    result = runner.invoke(cli, [*db, "list", "--done", "--limit", "2"])
+    assert result.exit_code == 0
+    hint = result.output.split("More tasks: todo ")[1].split()
+    assert hint[:4] == ["list", "--done", "--limit", "2"]
+
+    result = runner.invoke(cli, [*db, *hint])
+    assert result.exit_code == 0
+    assert "Task 3" in result.output
+    assert "Task 4" not in result.output
+    assert "More tasks" not in result.output
+
+def test_search(runner, tmp_path):
+    """Test searching tasks by title words."""
+    db = ["--db", str(tmp_path / "search.db")]
+    runner.invoke(cli, [*db, "add", "Water the plants"])
+    runner.invoke(cli, [*db, "add", "Walk the dog"])
+
+    result = runner.invoke(cli, [*db, "search", "wat"])
+    assert result.exit_code == 0
+    assert "Water the plants" in result.output
+    assert "Walk the dog" not in result.output
+
+def test_stats(runner, tmp_path):
+    """Test the pending/done summary."""
+    db = ["--db", str(tmp_path / "stats.db")]
+    runner.invoke(cli, [*db, "add", "One"])
+    runner.invoke(cli, [*db, "add", "Two"])
+    runner.invoke(cli, [*db, "done", "1"])
+
+    result = runner.invoke(cli, [*db, "stats"])
+    assert result.exit_code == 0
+    assert "1 pending / 1 done (2 total)" in result.output
+
+def test_quick_add(runner, tmp_path):
+    """Test that quick captures skip the database until the next command."""
+    db_file = tmp_path / "quick.db"
+    db = ["--db", str(db_file)]
+    result = runner.invoke(cli, [*db, "add", "--quick", "Jotted down"])
+    assert result.exit_code == 0
+    assert "Captured task: Jotted down" in result.output
+    assert not db_file.exists()
+
+    result = runner.invoke(cli, [*db, "add", "--quick", ""])
+    assert result.exit_code == 1
+    assert "Task title is required" in result.output
+
+    result = runner.invoke(cli, [*db, "list"])
+    assert "Jotted down" in result.output
+
+    runner.invoke(cli, [*db, "add", "--quick", "Later"])
+    result = runner.invoke(cli, [*db, "merge"])
+    assert "Merged 1 captured tasks" in result.output
+    result = runner.invoke(cli, [*db, "stats"])
+    assert "2 pending / 0 done (2 total)" in result.output
+
+def test_stats_option(runner, tmp_path):
+    """Test --stats prints query statistics per operation to stderr."""
+    from todo_core import metrics
+
+    db = ["--db", str(tmp_path / "metrics.db")]
+    try:
+        result = runner.invoke(cli, [*db, "--stats", "add", "Measured"])
+    finally:
+        metrics.disable()
+        metrics.reset()
+    assert result.exit_code == 0
+    assert '"create_task"' in result.stderr
+    assert '"create_task"' not in result.stdout
+
+def test_list_watch_redraws_on_change(runner, tmp_path, monkeypatch):
+    """Test that --watch redraws after a commit and not on idle checks."""
+    from todo_cli import cli as cli_module
+    from todo_core.db import get_session
+    from todo_core.operations import create_task
+
+    path = tmp_path / "watch.db"
+    runner.invoke(cli, ["--db", str(path), "add", "First"])
+    checks = []
+
+    def sleep(seconds):
+        checks.append(seconds)
+        if len(checks) == 1:
+            with get_session(str(path)) as db:
+                create_task(db, "Second")
+        elif len(checks) == 3:
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(cli_module.time, "sleep", sleep)
+    result = runner.invoke(cli, ["--db", str(path), "list", "--watch"])
+    assert result.exit_code == 0
+    assert result.output.count("First") == 2
+    assert result.output.count("Second") == 1
@@ -0,0 +1,113 @@
+"""Unit tests for the todo daemon and its thin client."""
+
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from todo_cli.client import forward, forwarded_args
+from todo_cli.daemon import make_server, run_command, warm_up
+
+def test_client_import_is_minimal():
+    """Test that the entry point imports nothing beyond the standard library."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import todo_cli.client"],
+        capture_output=True, text=True, check=True
+    )
+    imported = {line.split("|")[-1].strip() for line in result.stderr.splitlines()}
+    assert "todo_cli.client" in imported
+    assert not any(m.startswith(("click", "sqlalchemy", "rich")) for m in imported)
+
+def test_forwarded_args(tmp_path, monkeypatch):
+    """Test which command lines are forwarded, always with an absolute --db."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("TODO_DB", raising=False)
+    assert forwarded_args(["add", "Milk"]) == [
+        "--db", str(tmp_path / "todo.db"), "add", "Milk"
+    ]
+    assert forwarded_args(["--db=x.db", "done", "3"]) == [
+        "--db", str(tmp_path / "x.db"), "done", "3"
+    ]
+    monkeypatch.setenv("TODO_DB", "env.db")
+    assert forwarded_args(["list"])[:2] == ["--db", str(tmp_path / "env.db")]
+
+    for args in ([], ["--stats", "list"], ["list", "--watch"], ["daemon"],
+                 ["--version"], ["--db"]):
+        assert forwarded_args(args) is None
+
+def test_run_command_captures_output(tmp_path):
+    """Test output, exit codes and terminal colors of daemon commands."""
+    db = ["--db", str(tmp_path / "daemon.db")]
+    result = run_command([*db, "add", "Warm"])
+    assert result == {"stdout": "Added task: Warm (#1)\n", "stderr": "",
+                      "exit_code": 0}
+
+    result = run_command([*db, "done", "9"])
+    assert result["exit_code"] == 1
+    assert "Task not found: 9" in result["stdout"]
+
+    result = run_command([*db, "list"], tty=True, width=60,
+                         env={"TERM": "xterm-256color"})
+    assert "\x1b[" in result["stdout"]
+    assert max(len(line) for line in result["stdout"].splitlines()) < 200
+
+    assert run_command([*db, "nope"])["exit_code"] == 2
+
+@pytest.fixture
+def daemon(tmp_path):
+    """Serve commands on a socket in a background thread."""
+    path = str(tmp_path / "todo.sock")
+    server = make_server(path)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    try:
+        yield path
+    finally:
+        server.shutdown()
+        thread.join()
+        server.server_close()
+        os.unlink(path)
+
+def test_forward_to_daemon(daemon, tmp_path, capsys):
+    """Test that commands run on the daemon and their output is printed."""
+    db = ["--db", str(tmp_path / "forwarded.db")]
+    assert forward([*db, "add", "Over the socket"], daemon) == 0
+    assert forward([*db, "rm", "5"], daemon) == 1
+    assert forward([*db, "list"], daemon) == 0
+    output = capsys.readouterr().out
+    assert "Added task: Over the socket (#1)" in output
+    assert "Task not found: 5" in output
+    assert output.count("Over the socket") == 2
+
+    with pytest.raises(ValueError, match="already running"):
+        make_server(daemon)
+
+def test_forward_without_daemon(tmp_path):
+    """Test that the client falls back when nothing listens on the socket."""
+    assert forward(["list"], str(tmp_path / "missing.sock")) is None
+
+def test_forward_only_to_own_socket(daemon, tmp_path, monkeypatch):
+    """Test that sockets of other users, links and plain files are ignored."""
+    db = ["--db", str(tmp_path / "owned.db")]
+    link = tmp_path / "link.sock"
+    link.symlink_to(daemon)
+    assert forward([*db, "list"], str(link)) is None
+    plain = tmp_path / "plain.sock"
+    plain.touch()
+    assert forward([*db, "list"], str(plain)) is None
+
+    uid = os.getuid()
+    monkeypatch.setattr(os, "getuid", lambda: uid + 1)
+    assert forward([*db, "list"], daemon) is None
+
+def test_warm_up_creates_no_default_database(tmp_path, monkeypatch):
+    """Test that the daemon only opens a database it was pointed at."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("TODO_DB", raising=False)
+    warm_up(None)
+    assert not (tmp_path / "todo.db").exists()
+
+    warm_up("chosen.db")
+    assert (tmp_path / "chosen.db").exists()
@@ -0,0 +1,295 @@
+"""Async task operations module.
+
+Mirrors operations.py on an AsyncSession (aiosqlite driver) so async
+frameworks can query the database without blocking their event loop.
+
+Following Constitutional requirements:
+- No Repository pattern (use SQLAlchemy directly)
+- No service layer abstractions
+- Real database operations (no mocking)
+"""
+
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Callable, Iterable, List, Optional
+from uuid import UUID
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .cache import invalidate
+from .models import Task, TaskStatus, validate_title
+from .operations import (
+    CHANGE_BOUNDS, TOGGLED_STATUS, BulkCreateError, ChangeSet,
+    acknowledge_statement, change_set, compact_statements,
+    decode_snapshot_cursor, delete_statement, is_stale, missing_task_error,
+    search_expression, select_changes, select_count, select_search,
+    select_tasks, snapshot_page, update_statement, update_values
+)
+
+async def create_task(db: AsyncSession, title: str) -> Task:
+    """Create a new task.
+
+    Args:
+        db: Async database session
+        title: Task title
+
+    Returns:
+        The created task
+    """
+    task = Task(title=title)
+    db.add(task)
+    await db.commit()
+    invalidate()
+    return task
+
+async def create_tasks(
+    db: AsyncSession,
+    titles: Iterable[str],
+    batch_size: int = 1000,
+    on_batch: Optional[Callable[[int], None]] = None
+) -> int:
+    """Create many tasks in chunked batches.
+
+    See operations.create_tasks.
+
+    Args:
+        db: Async database session
+        titles: Iterable of task titles
+        batch_size: Number of rows per insert and commit
+        on_batch: Optional callback receiving the running committed count
+
+    Returns:
+        Number of tasks created
+
+    Raises:
+        BulkCreateError: If a chunk fails; ``committed`` tells where to resume
+    """
+    if batch_size < 1:
+        raise ValueError("Batch size must be at least 1")
+
+    committed = 0
+    titles = iter(titles)
+    while True:
+        try:
+            rows = [
+                {"title": validate_title(title)}
+                for title in islice(titles, batch_size)
+            ]
+            if not rows:
+                break
+            await db.execute(insert(Task), rows)
+            await db.commit()
+            invalidate()
+        except Exception as e:
+            await db.rollback()
+            raise BulkCreateError(
+                f"Batch starting at row {committed} failed: {e}", committed
+            ) from e
+        committed += len(rows)
+        if on_batch is not None:
+            on_batch(committed)
+    return committed
+
+async def get_task(db: AsyncSession, task_id: UUID) -> Optional[Task]:
+    """Get a task by ID.
+
+    Args:
+        db: Async database session
+        task_id: Task UUID
+
+    Returns:
+        Task if found, None otherwise
+    """
+    return await db.scalar(select(Task).where(Task.id == task_id))
+
+async def list_tasks(
+    db: AsyncSession,
+    status: Optional[TaskStatus] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None
+) -> List[Task]:
+    """List tasks in creation order, optionally filtered and paginated.
+
+    Args:
+        db: Async database session
+        status: Optional status filter
+        cursor: Optional cursor; only tasks after it are returned
+        limit: Optional maximum number of tasks
+
+    Returns:
+        List of tasks
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    return (await db.scalars(select_tasks(status, cursor, limit))).all()
+
+async def search_tasks(db: AsyncSession, query: str, limit: int = 20) -> List[Task]:
+    """Find tasks by title words, best match first.
+
+    See operations.search_tasks.
+
+    Args:
+        db: Async database session
+        query: Search words
+        limit: Maximum number of tasks
+
+    Returns:
+        Matching tasks
+    """
+    if not search_expression(query):
+        return []
+    return (await db.scalars(select_search(query, limit))).all()
+
+async def count_tasks(db: AsyncSession, status: Optional[TaskStatus] = None) -> int:
+    """Count tasks from the maintained counters.
+
+    See operations.count_tasks.
+
+    Args:
+        db: Async database session
+        status: Optional status filter
+
+    Returns:
+        Number of tasks
+    """
+    return await db.scalar(select_count(status))
+
+async def _write_one(db: AsyncSession, query, task_id: UUID,
+                     expected_version: Optional[int]):
+    """Run a single-row write statement and commit, or explain the miss."""
+    row = (await db.scalars(query)).one_or_none()
+    if row is None:
+        await db.rollback()
+        exists = (
+            expected_version is not None
+            and await get_task(db, task_id) is not None
+        )
+        raise missing_task_error(task_id, expected_version, exists)
+    await db.commit()
+    invalidate()
+    return row
+
+async def update_task(
+    db: AsyncSession,
+    task_id: UUID,
+    title: Optional[str] = None,
+    status: Optional[TaskStatus] = None,
+    expected_version: Optional[int] = None
+) -> Task:
+    """Update a task in a single round trip.
+
+    Args:
+        db: Async database session
+        task_id: Task UUID
+        title: Optional new title
+        status: Optional new status
+        expected_version: Optional version the task must still have
+
+    Returns:
+        Updated task
+
+    Raises:
+        ValueError: If task not found or the title is invalid
+        VersionConflictError: If the task changed since expected_version
+    """
+    values = update_values(title, status)
+    if not values:
+        task = await db.get(Task, task_id, populate_existing=True)
+        if task is None or expected_version not in (None, task.version):
+            raise missing_task_error(task_id, expected_version, task is not None)
+        return task
+
+    query = update_statement(task_id, values, expected_version)
+    return await _write_one(db, query, task_id, expected_version)
+
+async def toggle_task_status(
+    db: AsyncSession,
+    task_id: UUID,
+    expected_version: Optional[int] = None
+) -> Task:
+    """Atomically flip a task between PENDING and COMPLETED.
+
+    Args:
+        db: Async database session
+        task_id: Task UUID
+        expected_version: Optional version the task must still have
+
+    Returns:
+        Updated task
+
+    Raises:
+        ValueError: If task not found
+        VersionConflictError: If the task changed since expected_version
+    """
+    query = update_statement(task_id, {"status": TOGGLED_STATUS}, expected_version)
+    return await _write_one(db, query, task_id, expected_version)
+
+async def delete_task(
+    db: AsyncSession,
+    task_id: UUID,
+    expected_version: Optional[int] = None
+) -> None:
+    """Delete a task in a single round trip.
+
+    Args:
+        db: Async database session
+        task_id: Task UUID
+        expected_version: Optional version the task must still have
+
+    Raises:
+        ValueError: If task not found
+        VersionConflictError: If the task changed since expected_version
+    """
+    query = delete_statement(task_id, expected_version)
+    await _write_one(db, query, task_id, expected_version)
+
+async def list_changes(db: AsyncSession, since: int = 0, limit: int = 1000,
+                       cursor: Optional[str] = None) -> ChangeSet:
+    """Get what changed in the task list after a change log sequence number.
+
+    See operations.list_changes.
+
+    Args:
+        db: Async database session
+        since: ``seq`` of the previous ChangeSet; 0 for a snapshot
+        limit: Maximum number of tasks
+        cursor: ``cursor`` of the previous snapshot page
+
+    Returns:
+        ChangeSet with the changes, or a snapshot page if reset
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    if cursor is None:
+        rows = [] if since <= 0 else (
+            await db.execute(select_changes(since, limit))
+        ).all()
+        head, horizon = (await db.execute(CHANGE_BOUNDS)).one()
+        if not is_stale(since, head, horizon):
+            return change_set(since, limit, rows)
+        position = None
+    else:
+        head, position = decode_snapshot_cursor(cursor)
+    tasks = (await db.scalars(select_tasks(cursor=position, limit=limit + 1))).all()
+    return snapshot_page(since, head, limit, tasks)
+
+async def acknowledge_changes(db: AsyncSession, consumer: str, seq: int) -> None:
+    """Record that a consumer has applied the changes up to seq.
+
+    See operations.acknowledge_changes.
+
+    Args:
+        db: Async database session
+        consumer: Name the consumer reads the log under
+        seq: ``seq`` of a ChangeSet it has applied
+    """
+    now = datetime.now(timezone.utc)
+    if (await db.execute(acknowledge_statement(consumer, seq, now))).first() is None:
+        await db.rollback()
+        return
+    for statement in compact_statements(now):
+        await db.execute(statement)
+    await db.commit()
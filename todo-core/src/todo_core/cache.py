@@ -0,0 +1,200 @@
+"""In-process cache for task listings.
+
+Every mutation in operations/aio calls invalidate(), which bumps a
+process-wide generation counter. Cached pages remember the generation
+they were loaded at and are ignored once it moves on, so no write ever
+has to know which keys it affects.
+
+Writes by other processes (the CLIs, other API workers) are only seen
+once a long-running process watch()es the database file: every read of
+the generation then first asks DataVersion whether anything committed
+since the last look, and invalidates if so.
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+class DataVersion:
+    """Cheap detector of commits to a database file by any process.
+
+    Reads ``PRAGMA data_version`` on a read-only connection of its own.
+    SQLite changes the value whenever another connection, in this process
+    or any other, commits; in WAL mode reading it is a shared-memory
+    lookup of a few microseconds. Until the file can be opened (it may
+    not exist yet), the modification times and sizes of the database and
+    its WAL file are compared instead.
+
+    Attributes:
+        path: Database file watched
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._last = self.version()
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        try:
+            connection = sqlite3.connect(
+                f"file:{self.path}?mode=ro", uri=True, check_same_thread=False
+            )
+            connection.execute("PRAGMA data_version").fetchone()
+        except sqlite3.Error:
+            return None
+        return connection
+
+    def _file_version(self) -> Tuple:
+        version = []
+        for path in (self.path, f"{self.path}-wal"):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                version.append(None)
+            else:
+                version.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(version)
+
+    def version(self) -> Hashable:
+        """Return a value that differs after every commit to the file."""
+        with self._lock:
+            if self._connection is None:
+                self._connection = self._connect()
+                if self._connection is None:
+                    return self._file_version()
+            return self._connection.execute("PRAGMA data_version").fetchone()[0]
+
+    def changed(self) -> bool:
+        """Whether anything was committed since the previous call."""
+        version = self.version()
+        if version == self._last:
+            return False
+        self._last = version
+        return True
+
+    def close(self) -> None:
+        """Close the detector's connection."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+_generation = 0
+_last_modified = time.time()
+_watched: Optional[DataVersion] = None
+
+def watch(path: Optional[str]) -> None:
+    """Also invalidate on commits by other processes to this database file.
+
+    Args:
+        path: Database file, or None to stop watching
+    """
+    global _watched
+    if _watched is not None:
+        _watched.close()
+    _watched = DataVersion(path) if path is not None else None
+
+def refresh() -> None:
+    """Invalidate if the watched database changed since the last check."""
+    if _watched is not None and _watched.changed():
+        invalidate()
+
+def generation() -> int:
+    """Return the current write generation, after checking the watched file."""
+    refresh()
+    return _generation
+
+def last_modified() -> float:
+    """Return the epoch time of the last write seen by this process."""
+    refresh()
+    return _last_modified
+
+def invalidate() -> None:
+    """Mark every cached listing as stale."""
+    global _generation, _last_modified
+    _generation += 1
+    _last_modified = time.time()
+
+class TaskListCache:
+    """LRU cache of listing results with single-flight loading.
+
+    Concurrent misses for the same key share one load instead of all
+    querying the database. The load runs as a task of its own, so a
+    caller that is cancelled leaves it to the others; a load cancelled by
+    itself is started again by the callers still waiting.
+
+    Attributes:
+        maxsize: Maximum number of cached pages
+        hits: Number of lookups served from the cache
+        misses: Number of lookups that ran a load
+    """
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[int, Any]]" = OrderedDict()
+        self._inflight: Dict[Tuple[Hashable, int], asyncio.Task] = {}
+
+    async def get_or_load(self, key: Hashable,
+                          load: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for key, loading it on a miss.
+
+        Args:
+            key: Cache key, e.g. (status, cursor, limit)
+            load: Coroutine function producing the value
+
+        Returns:
+            Cached or freshly loaded value
+        """
+        current = generation()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == current:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+        flight = (key, current)
+        while True:
+            task = self._inflight.get(flight)
+            if task is None:
+                self.misses += 1
+                task = self._start_load(flight, load)
+            else:
+                self.hits += 1
+            try:
+                return await asyncio.shield(task)
+            except asyncio.CancelledError:
+                if asyncio.current_task().cancelling() or not task.cancelled():
+                    raise
+                # Only the load was cancelled; this caller still wants it
+
+    def _start_load(self, flight: Tuple[Hashable, int],
+                    load: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        task = asyncio.get_running_loop().create_task(load())
+        self._inflight[flight] = task
+        task.add_done_callback(lambda task: self._finish_load(flight, task))
+        return task
+
+    def _finish_load(self, flight: Tuple[Hashable, int], task: asyncio.Task) -> None:
+        if self._inflight.get(flight) is task:
+            del self._inflight[flight]
+        # Retrieving the exception keeps it from being logged as lost;
+        # the callers waiting on the load re-raise it
+        if not task.cancelled() and task.exception() is None:
+            self._store(*flight, task.result())
+
+    def clear(self) -> None:
+        """Drop every cached page."""
+        self._entries.clear()
+
+    def _store(self, key: Hashable, loaded_at: int, value: Any) -> None:
+        self._entries[key] = (loaded_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
@@ -4,39 +4,75 @@ Following Constitutional requirements:
 - Every library must expose CLI interface
 - Support --help, --version, --format flags
 - Use standard Unix exit codes
+
+Scripts call this CLI thousands of times a day, so rich, SQLAlchemy and
+the database are only loaded by the commands that need them.
 """
 
-from typing import Optional
+from __future__ import annotations
+
+from functools import cache
+from itertools import islice
+from typing import IO, TYPE_CHECKING, Iterator, Optional
+import csv
 import json
 import sys
+import time
 from uuid import UUID
 
 import click
-from rich.console import Console
-from rich.table import Table
-from sqlalchemy import create_engine
-from sqlalchemy.orm import Session, sessionmaker
 
 from . import __version__
-from .models import Base, Task, TaskStatus
-from .operations import create_task, get_task, list_tasks, update_task, delete_task
 
-# Create console for rich output
-console = Console()
+if TYPE_CHECKING:
+    from rich.console import Console
+    from sqlalchemy.orm import Session
+
+    from .models import Task, TaskStatus
+
+@cache
+def get_console() -> Console:
+    """Get the console for rich output."""
+    from rich.console import Console
 
-# Database setup
-engine = create_engine("sqlite:///todo.db")
-Base.metadata.create_all(engine)
-SessionLocal = sessionmaker(bind=engine)
+    return Console()
 
-def get_db() -> Session:
-    """Get database session."""
-    db = SessionLocal()
+def get_db(profile: str = "cli") -> Iterator[Session]:
+    """Get database session for the database chosen with --db."""
+    from .db import get_session
+
+    ctx = click.get_current_context(silent=True)
+    db = get_session(ctx.obj if ctx else None, profile)
     try:
         yield db
     finally:
         db.close()
 
+def print_stats() -> None:
+    """Print the --stats query statistics as JSON to stderr."""
+    from .metrics import summary
+
+    click.echo(json.dumps(summary(), indent=2), err=True)
+
+def task_to_dict(task: Task) -> dict:
+    """Convert a task to a JSON-serializable dict.
+
+    Args:
+        task: Task to convert
+
+    Returns:
+        Dict of task fields
+    """
+    return {
+        "id": str(task.id),
+        "number": task.number,
+        "title": task.title,
+        "status": task.status.value,
+        "created_at": task.created_at.isoformat(),
+        "updated_at": task.updated_at.isoformat(),
+        "version": task.version
+    }
+
 def format_task(task: Task, format: str = "json") -> str:
     """Format a task for output.
 
@@ -48,14 +84,10 @@ def format_task(task: Task, format: str = "json") -> str:
         Formatted task string
     """
     if format == "json":
-        return json.dumps({
-            "id": str(task.id),
-            "title": task.title,
-            "status": task.status.value,
-            "created_at": task.created_at.isoformat(),
-            "updated_at": task.updated_at.isoformat()
-        })
+        return json.dumps(task_to_dict(task))
     else:
+        from rich.table import Table
+
         table = Table(show_header=True)
         table.add_column("ID")
         table.add_column("Title")
@@ -84,14 +116,10 @@ def format_task_list(tasks: list[Task], format: str = "json") -> str:
         Formatted task list string
     """
     if format == "json":
-        return json.dumps([{
-            "id": str(task.id),
-            "title": task.title,
-            "status": task.status.value,
-            "created_at": task.created_at.isoformat(),
-            "updated_at": task.updated_at.isoformat()
-        } for task in tasks])
+        return json.dumps([task_to_dict(task) for task in tasks])
     else:
+        from rich.table import Table
+
         table = Table(show_header=True)
         table.add_column("ID")
         table.add_column("Title")
@@ -110,14 +138,49 @@ def format_task_list(tasks: list[Task], format: str = "json") -> str:
 
         return table
 
+def read_titles(source: IO[str], input_format: str = "jsonl") -> Iterator[str]:
+    """Stream task titles from a JSONL or CSV source.
+
+    JSONL lines may be objects with a "title" key or bare JSON strings.
+    CSV input needs a header row with a "title" column.
+
+    Args:
+        source: Text stream to read from
+        input_format: Input format ("jsonl" or "csv")
+
+    Yields:
+        Task titles in input order
+    """
+    if input_format == "csv":
+        for row in csv.DictReader(source):
+            yield row["title"]
+        return
+
+    for line in source:
+        line = line.strip()
+        if not line:
+            continue
+        record = json.loads(line)
+        yield record["title"] if isinstance(record, dict) else record
+
 @click.group()
 @click.version_option(version=__version__, prog_name="todo-core")
-def cli():
+@click.option("--db", "db_path", type=click.Path(dir_okay=False),
+              help="Database file (default: $TODO_DB or todo.db)")
+@click.option("--stats", is_flag=True,
+              help="Print per-operation query statistics to stderr")
+@click.pass_context
+def cli(ctx: click.Context, db_path: Optional[str], stats: bool):
     """Todo core library CLI.
 
     Provides command-line interface for todo-core operations.
     """
-    pass
+    ctx.obj = db_path
+    if stats:
+        from .metrics import enable
+
+        enable()
+        ctx.call_on_close(print_stats)
 
 @cli.command()
 @click.argument("title")
@@ -125,6 +188,8 @@ def cli():
               help="Output format")
 def create(title: str, format: str):
     """Create a new task."""
+    from .operations import create_task
+
     db = next(get_db())
     task = create_task(db, title)
     output = format_task(task, format)
@@ -132,45 +197,183 @@ def create(title: str, format: str):
     if format == "json":
         click.echo(output)
     else:
-        console.print(output)
+        get_console().print(output)
+
+def stream_tasks(db: Session, status: Optional[TaskStatus],
+                 after: Optional[str], limit: Optional[int],
+                 batch_size: int = 1000) -> None:
+    """Write tasks as NDJSON while they are fetched.
+
+    Output is flushed on the first row and then once per fetched batch,
+    so consumers see data immediately and memory stays constant.
+    """
+    from .operations import encode_cursor, iter_tasks
+
+    count = 0
+    last = None
+    has_more = False
+    try:
+        for task in iter_tasks(db, status=status, cursor=after,
+                               limit=limit + 1 if limit else None,
+                               batch_size=batch_size):
+            if count == limit:
+                has_more = True
+                break
+            click.echo(json.dumps(task_to_dict(task)))
+            if count % batch_size == 0:
+                sys.stdout.flush()
+            count += 1
+            last = task
+    except ValueError as e:
+        click.echo(f"Error: {str(e)}", err=True)
+        sys.exit(1)
+
+    if has_more:
+        click.echo(f"Next page: --after {encode_cursor(last)}", err=True)
 
 @cli.command()
 @click.option("--status", type=click.Choice(["PENDING", "COMPLETED"]),
               help="Filter by status")
-@click.option("--format", type=click.Choice(["json", "table"]), default="json",
-              help="Output format")
-def list(status: Optional[str], format: str):
+@click.option("--limit", type=click.IntRange(min=1),
+              help="Maximum number of tasks to show")
+@click.option("--after", help="Cursor of the page to continue from")
+@click.option("--format", type=click.Choice(["json", "table", "ndjson"]),
+              default="json",
+              help="Output format (ndjson streams one task per line)")
+def list(status: Optional[str], limit: Optional[int], after: Optional[str],
+         format: str):
     """List all tasks."""
+    from .models import TaskStatus
+    from .operations import encode_cursor, list_tasks
+
     db = next(get_db())
     task_status = TaskStatus(status) if status else None
-    tasks = list_tasks(db, status=task_status)
+    if format == "ndjson":
+        stream_tasks(db, task_status, after, limit)
+        return
+
+    try:
+        tasks = list_tasks(db, status=task_status, cursor=after,
+                           limit=limit + 1 if limit else None)
+    except ValueError as e:
+        click.echo(f"Error: {str(e)}", err=True)
+        sys.exit(1)
+
+    has_more = limit is not None and len(tasks) > limit
+    tasks = tasks[:limit]
     output = format_task_list(tasks, format)
 
     if format == "json":
         click.echo(output)
     else:
-        console.print(output)
+        get_console().print(output)
+    if has_more:
+        click.echo(f"Next page: --after {encode_cursor(tasks[-1])}", err=True)
+
+@cli.command()
+@click.argument("query", nargs=-1, required=True)
+@click.option("--limit", type=click.IntRange(min=1), default=20,
+              help="Maximum number of tasks to show")
+@click.option("--format", type=click.Choice(["json", "table"]), default="json",
+              help="Output format")
+def search(query: tuple[str, ...], limit: int, format: str):
+    """Search task titles, best match first."""
+    from .operations import search_tasks
+
+    db = next(get_db())
+    output = format_task_list(search_tasks(db, " ".join(query), limit), format)
+    if format == "json":
+        click.echo(output)
+    else:
+        get_console().print(output)
+
+@cli.command(name="rebuild-search-index")
+def rebuild_search_index_command():
+    """Rebuild the full-text search index from the tasks table."""
+    from .operations import rebuild_search_index
+
+    db = next(get_db())
+    rebuild_search_index(db)
+    click.echo("Search index rebuilt")
+
+@cli.command(name="check-counts")
+@click.option("--dry-run", is_flag=True, help="Report drift without repairing it")
+def check_counts(dry_run: bool):
+    """Recount tasks per status and repair drifted counters."""
+    from .operations import check_task_counts
+
+    db = next(get_db())
+    drift = check_task_counts(db, repair=not dry_run)
+    click.echo(json.dumps({
+        status.value: {"stored": stored, "actual": actual}
+        for status, (stored, actual) in drift.items()
+    }))
+    if drift and dry_run:
+        sys.exit(1)
+
+@cli.command(name="compact-changes")
+@click.option("--expiry-days", type=click.IntRange(min=0), default=30,
+              help="Forget consumers not seen for this many days")
+def compact_changes_command(expiry_days: int):
+    """Trim change log entries every known consumer has acknowledged."""
+    from datetime import timedelta
+
+    from .operations import compact_changes
+
+    db = next(get_db())
+    deleted = compact_changes(db, timedelta(days=expiry_days))
+    click.echo(json.dumps({"deleted": deleted}))
 
 @cli.command()
 @click.argument("task_id")
 @click.option("--title", help="New task title")
 @click.option("--status", type=click.Choice(["PENDING", "COMPLETED"]),
               help="New task status")
+@click.option("--expected-version", type=int,
+              help="Fail if the task no longer has this version")
 @click.option("--format", type=click.Choice(["json", "table"]), default="json",
               help="Output format")
 def update(task_id: str, title: Optional[str], status: Optional[str],
-          format: str):
+           expected_version: Optional[int], format: str):
     """Update a task."""
+    from .models import TaskStatus
+    from .operations import update_task
+
     try:
         db = next(get_db())
         task_status = TaskStatus(status) if status else None
-        task = update_task(db, UUID(task_id), title=title, status=task_status)
+        task = update_task(db, UUID(task_id), title=title, status=task_status,
+                           expected_version=expected_version)
+        output = format_task(task, format)
+
+        if format == "json":
+            click.echo(output)
+        else:
+            get_console().print(output)
+    except ValueError as e:
+        click.echo(f"Error: {str(e)}", err=True)
+        sys.exit(1)
+
+@cli.command()
+@click.argument("task_id")
+@click.option("--expected-version", type=int,
+              help="Fail if the task no longer has this version")
+@click.option("--format", type=click.Choice(["json", "table"]), default="json",
+              help="Output format")
+def toggle(task_id: str, expected_version: Optional[int], format: str):
+    """Flip a task between PENDING and COMPLETED."""
+    from .operations import toggle_task_status
+
+    try:
+        db = next(get_db())
+        task = toggle_task_status(db, UUID(task_id),
+                                  expected_version=expected_version)
         output = format_task(task, format)
 
         if format == "json":
             click.echo(output)
         else:
-            console.print(output)
+            get_console().print(output)
     except ValueError as e:
         click.echo(f"Error: {str(e)}", err=True)
         sys.exit(1)
@@ -179,6 +382,8 @@ def update(task_id: str, title: Optional[str], status: Optional[str],
 @click.argument("task_id")
 def delete(task_id: str):
     """Delete a task."""
+    from .operations import delete_task
+
     try:
         db = next(get_db())
         delete_task(db, UUID(task_id))
@@ -187,5 +392,94 @@ def delete(task_id: str):
         click.echo(f"Error: {str(e)}", err=True)
         sys.exit(1)
 
+@cli.command(name="import")
+@click.argument("source", type=click.File("r"), default="-")
+@click.option("--input-format", type=click.Choice(["jsonl", "csv"]),
+              default="jsonl", help="Input format")
+@click.option("--batch-size", type=click.IntRange(min=1), default=1000,
+              help="Rows per insert and commit")
+@click.option("--skip", type=click.IntRange(min=0), default=0,
+              help="Skip the first N input rows (resume a failed import)")
+@click.option("--format", type=click.Choice(["json", "table"]), default="json",
+              help="Output format")
+def import_tasks(source: IO[str], input_format: str, batch_size: int, skip: int,
+                 format: str):
+    """Bulk import tasks from a JSONL or CSV file (or stdin)."""
+    from .operations import BulkCreateError, create_tasks
+
+    db = next(get_db("bulk-load"))
+    titles = islice(read_titles(source, input_format), skip, None)
+    start = time.perf_counter()
+
+    def report(committed: int) -> None:
+        elapsed = time.perf_counter() - start
+        rate = committed / elapsed if elapsed else 0.0
+        click.echo(f"{committed} rows committed ({rate:.0f} rows/sec)", err=True)
+
+    try:
+        imported = create_tasks(db, titles, batch_size=batch_size,
+                                on_batch=report)
+    except BulkCreateError as e:
+        click.echo(f"Error: {str(e)}", err=True)
+        click.echo(f"Resume with --skip {skip + e.committed}", err=True)
+        sys.exit(1)
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        "imported": imported,
+        "skipped": skip,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(imported / elapsed, 1) if elapsed else 0.0
+    }
+    if format == "json":
+        click.echo(json.dumps(summary))
+    else:
+        from rich.table import Table
+
+        table = Table(show_header=True)
+        for key in summary:
+            table.add_column(key.replace("_", " ").capitalize())
+        table.add_row(*(str(value) for value in summary.values()))
+        get_console().print(table)
+
+@cli.command(name="convert-storage")
+@click.argument("storage", type=click.Choice(["text", "compact"]))
+@click.pass_context
+def convert_storage_command(ctx: click.Context, storage: str):
+    """Rewrite the database in the text or compact storage mode."""
+    from .db import convert_storage
+
+    try:
+        copied = convert_storage(ctx.obj, storage)
+    except ValueError as e:
+        click.echo(f"Error: {str(e)}", err=True)
+        sys.exit(1)
+    click.echo(json.dumps({"storage": storage, "tasks": copied}))
+
+@cli.command()
+@click.option("--count", type=click.IntRange(min=0), required=True,
+              help="Number of tasks to create")
+@click.option("--seed", "seed_value", type=int, default=0,
+              help="Random seed; the same seed gives the same tasks")
+@click.option("--completed-ratio", type=click.FloatRange(0, 1), default=0.3,
+              help="Share of tasks created as COMPLETED")
+@click.option("--batch-size", type=click.IntRange(min=1), default=5000,
+              help="Rows per insert and commit")
+def seed(count: int, seed_value: int, completed_ratio: float, batch_size: int):
+    """Fill the database with deterministic synthetic tasks."""
+    from .seed import seed_tasks
+
+    db = next(get_db("bulk-load"))
+    start = time.perf_counter()
+    created = seed_tasks(db, count, seed_value, completed_ratio, batch_size)
+    click.echo(json.dumps({
+        "seeded": created,
+        "seconds": round(time.perf_counter() - start, 3)
+    }))
+
+def main():
+    """Entry point for the CLI."""
+    cli()
+
 if __name__ == "__main__":
-    cli()
\ No newline at end of file
+    main()
\ No newline at end of file
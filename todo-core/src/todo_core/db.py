@@ -0,0 +1,337 @@
+"""Database engine and session setup.
+
+All entry points (todo, todo-core, todo-api) get their engine from here.
+The database location comes from an explicit path (e.g. a --db option),
+the TODO_DB environment variable, or defaults to ``todo.db``.
+
+Engines are tuned with named SQLite profiles applied to every new
+connection:
+- "cli": short-lived processes, modest cache
+- "server": long-running API workers with concurrent readers and writers
+- "bulk-load": imports that trade durability of the last commits for speed
+
+Tasks are stored in "text" mode unless the database was created in (or
+converted to) "compact" mode, see storage.py. Compact files carry
+COMPACT_APPLICATION_ID in their header, so the mode is detected when an
+engine first connects; new databases follow TODO_STORAGE.
+
+The engine is created on first use and the schema is only (re)built when
+the version stored in the database file differs from SCHEMA_VERSION, so
+CLI invocations that never touch the database stay fast and the ones that
+do skip DDL and reflection.
+"""
+
+import os
+from functools import cache
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import create_engine, delete, event, insert, inspect, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.schema import CreateColumn
+
+from .models import (
+    CHANGE_LOG_DDL, COUNTER_DDL, REBUILD_SEARCH_INDEX, RECOUNT_DDL,
+    SCHEMA_VERSION, SEARCH_INDEX_DDL, Base, Task, change_consumers, task_changes
+)
+from .storage import STORAGE_MODES, is_compact, use_compact_storage
+
+DATABASE_PATH_ENV = "TODO_DB"
+DEFAULT_DATABASE_PATH = "todo.db"
+STORAGE_ENV = "TODO_STORAGE"
+# "todo" in ASCII, stored in the header of compact databases
+COMPACT_APPLICATION_ID = 0x746F646F
+
+PROFILES = {
+    "cli": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "cache_size": -8_000,
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    },
+    "server": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 10_000,
+        "cache_size": -64_000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    },
+    "bulk-load": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "busy_timeout": 30_000,
+        "cache_size": -256_000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    },
+}
+
+def database_path(path: Optional[str] = None) -> str:
+    """Resolve the database file location.
+
+    Args:
+        path: Explicit path, taking precedence over the environment
+
+    Returns:
+        Path to the SQLite database file
+    """
+    return path or os.environ.get(DATABASE_PATH_ENV) or DEFAULT_DATABASE_PATH
+
+def apply_profile(engine: Engine, profile: str) -> None:
+    """Apply a profile's pragmas to every connection the engine opens.
+
+    Args:
+        engine: Sync engine (use ``AsyncEngine.sync_engine`` for async ones)
+        profile: Name of a profile in PROFILES
+
+    Raises:
+        ValueError: If the profile is unknown
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown database profile: {profile}")
+    pragmas = PROFILES[profile]
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+
+def apply_storage(engine: Engine, storage: Optional[str] = None) -> None:
+    """Pick the engine's storage mode when it first connects.
+
+    Existing databases keep the mode they were created in; databases
+    without a tasks table yet use the requested mode.
+
+    Args:
+        engine: Sync engine (use ``AsyncEngine.sync_engine`` for async ones)
+        storage: Mode for new databases, defaulting to TODO_STORAGE or "text"
+
+    Raises:
+        ValueError: If the storage mode is unknown
+    """
+    storage = storage or os.environ.get(STORAGE_ENV) or "text"
+    if storage not in STORAGE_MODES:
+        raise ValueError(f"Unknown storage mode: {storage}")
+
+    @event.listens_for(engine, "connect", once=True)
+    def detect_storage(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA application_id")
+        application_id = cursor.fetchone()[0]
+        cursor.execute(
+            "SELECT count(*) FROM sqlite_master WHERE type = 'table' AND name = 'tasks'"
+        )
+        is_new = cursor.fetchone()[0] == 0
+        cursor.close()
+        if (application_id == COMPACT_APPLICATION_ID
+                or (is_new and storage == "compact")):
+            use_compact_storage(engine.dialect)
+
+def make_engine(profile: str = "cli", path: Optional[str] = None,
+                storage: Optional[str] = None) -> Engine:
+    """Create a tuned sync engine.
+
+    Args:
+        profile: Name of a profile in PROFILES
+        path: Optional database path (see database_path)
+        storage: Optional storage mode for new databases (see apply_storage)
+
+    Returns:
+        Engine with the profile's pragmas applied
+    """
+    engine = create_engine(f"sqlite:///{database_path(path)}")
+    apply_profile(engine, profile)
+    apply_storage(engine, storage)
+    return engine
+
+def make_async_engine(profile: str = "server", path: Optional[str] = None,
+                      storage: Optional[str] = None):
+    """Create a tuned async engine on the aiosqlite driver.
+
+    Needs the ``todo-core[async]`` extra.
+
+    Args:
+        profile: Name of a profile in PROFILES
+        path: Optional database path (see database_path)
+        storage: Optional storage mode for new databases (see apply_storage)
+
+    Returns:
+        AsyncEngine with the profile's pragmas applied
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{database_path(path)}")
+    apply_profile(engine.sync_engine, profile)
+    apply_storage(engine.sync_engine, storage)
+    return engine
+
+def ensure_schema(conn: Connection) -> None:
+    """Create missing tables, columns and indexes unless the schema is current.
+
+    The schema version is kept in SQLite's ``user_version`` header field,
+    so checking it costs a single pragma read. Upgrades also rebuild the
+    full-text search index and the task counters from the tasks table;
+    the change log starts empty, with writes from then on.
+
+    Args:
+        conn: Connection to set up, ideally inside a transaction
+    """
+    version = conn.exec_driver_sql("PRAGMA user_version").scalar()
+    if version == SCHEMA_VERSION:
+        return
+
+    Base.metadata.create_all(conn)
+    # create_all skips columns and indexes of tables that already exist
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                spec = CreateColumn(column).compile(dialect=conn.dialect)
+                conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {spec}")
+    number_tasks(conn)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+    for statement in (*SEARCH_INDEX_DDL, REBUILD_SEARCH_INDEX,
+                      *COUNTER_DDL, *RECOUNT_DDL, *CHANGE_LOG_DDL):
+        conn.exec_driver_sql(statement)
+    if is_compact(conn.dialect):
+        conn.exec_driver_sql(f"PRAGMA application_id = {COMPACT_APPLICATION_ID}")
+    conn.exec_driver_sql(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+def number_tasks(conn: Connection) -> None:
+    """Number tasks created before short numbers existed, oldest first.
+
+    Args:
+        conn: Connection inside the schema upgrade transaction
+    """
+    conn.exec_driver_sql(
+        "UPDATE tasks SET number = numbered.number FROM ("
+        " SELECT id, (SELECT coalesce(max(number), 0) FROM tasks)"
+        "  + row_number() OVER (ORDER BY created_at, id) AS number"
+        " FROM tasks WHERE number IS NULL"
+        ") AS numbered WHERE tasks.id = numbered.id"
+    )
+
+def convert_storage(path: Optional[str], storage: str,
+                    batch_size: int = 5000) -> int:
+    """Rewrite a database file in another storage mode.
+
+    Rows are copied into a new file next to the database, which then
+    replaces it, so an interrupted conversion leaves the original intact.
+    Nothing else may use the database while it is converted.
+
+    Args:
+        path: Optional database path (see database_path)
+        storage: Target storage mode
+        batch_size: Rows per insert
+
+    Returns:
+        Number of tasks copied
+
+    Raises:
+        ValueError: If the storage mode is unknown
+    """
+    if storage not in STORAGE_MODES:
+        raise ValueError(f"Unknown storage mode: {storage}")
+    source_path = Path(database_path(path))
+    target_path = source_path.with_name(f"{source_path.name}.{storage}")
+    for leftover in ("", "-wal", "-shm"):
+        Path(f"{target_path}{leftover}").unlink(missing_ok=True)
+
+    source = make_engine("bulk-load", str(source_path))
+    target = make_engine("bulk-load", str(target_path), storage=storage)
+    copied = 0
+    try:
+        with source.begin() as conn:
+            ensure_schema(conn)
+        with source.connect() as reader, target.begin() as writer:
+            ensure_schema(writer)
+            rows = reader.execution_options(yield_per=batch_size).execute(
+                select(Task.__table__)
+            )
+            for batch in rows.mappings().partitions():
+                writer.execute(insert(Task.__table__), [dict(row) for row in batch])
+                copied += len(batch)
+            copy_change_log(reader, writer, batch_size)
+        for engine in (source, target):
+            with engine.connect() as conn:
+                # Fold the WAL into the main file before swapping files
+                conn.exec_driver_sql("PRAGMA synchronous = FULL")
+                conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        source.dispose()
+        target.dispose()
+    os.replace(target_path, source_path)
+    return copied
+
+def copy_change_log(reader: Connection, writer: Connection,
+                    batch_size: int = 5000) -> None:
+    """Copy the change log and its consumers into a converted database.
+
+    The insert triggers logged every copied task again; those entries are
+    replaced by the original ones, and the sequence continues where the
+    source's did, so consumers keep their place.
+
+    Args:
+        reader: Connection to the source database
+        writer: Connection inside the target's copy transaction
+        batch_size: Rows per insert
+    """
+    writer.execute(delete(task_changes))
+    for table in (task_changes, change_consumers):
+        rows = reader.execution_options(yield_per=batch_size).execute(select(table))
+        for batch in rows.mappings().partitions():
+            writer.execute(insert(table), [dict(row) for row in batch])
+    head = reader.exec_driver_sql(
+        "SELECT seq FROM sqlite_sequence WHERE name = 'task_changes'"
+    ).scalar()
+    writer.exec_driver_sql("DELETE FROM sqlite_sequence WHERE name = 'task_changes'")
+    writer.exec_driver_sql(
+        "INSERT INTO sqlite_sequence(name, seq) VALUES ('task_changes', ?)",
+        (head or 0,)
+    )
+
+@cache
+def _shared_engine(path: str, profile: str) -> Engine:
+    engine = make_engine(profile, path)
+    with engine.begin() as conn:
+        ensure_schema(conn)
+    return engine
+
+@cache
+def _shared_sessionmaker(path: str, profile: str) -> sessionmaker:
+    # Operations return fully loaded rows (RETURNING), so there is nothing
+    # to refresh after a commit
+    return sessionmaker(bind=_shared_engine(path, profile), expire_on_commit=False)
+
+def get_engine(path: Optional[str] = None, profile: str = "cli") -> Engine:
+    """Get the process-wide engine, creating it and its schema on first use.
+
+    Args:
+        path: Optional database path (see database_path)
+        profile: Name of a profile in PROFILES
+
+    Returns:
+        Shared engine for this database and profile
+    """
+    return _shared_engine(database_path(path), profile)
+
+def get_session(path: Optional[str] = None, profile: str = "cli") -> Session:
+    """Open a new session on the shared engine.
+
+    Args:
+        path: Optional database path (see database_path)
+        profile: Name of a profile in PROFILES
+
+    Returns:
+        New session
+    """
+    return _shared_sessionmaker(database_path(path), profile)()
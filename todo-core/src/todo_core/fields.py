@@ -0,0 +1,60 @@
+"""Field values shared by the models and the capture journal.
+
+Only the standard library is imported here, so `todo add --quick` can
+validate titles and choose task ids without loading SQLAlchemy.
+"""
+
+import os
+import threading
+import time
+from uuid import UUID
+
+def validate_title(title: str) -> str:
+    """Validate a task title.
+
+    Args:
+        title: Task title (required, max 200 chars)
+
+    Returns:
+        The validated title
+
+    Raises:
+        ValueError: If title is None or exceeds 200 chars
+    """
+    if not title:
+        raise ValueError("Task title is required")
+    if len(title) > 200:
+        raise ValueError("Task title cannot exceed 200 characters")
+    return title
+
+_uuid7_lock = threading.Lock()
+_uuid7_last = (0, 0)
+
+def uuid7() -> UUID:
+    """Generate a time-ordered UUID (RFC 9562 version 7).
+
+    The first 48 bits are the Unix time in milliseconds and the next 12
+    a counter, so ids generated by one process always increase and new
+    rows are appended to the end of the primary key index. They share
+    the 128-bit format of uuid4, which older rows keep using.
+
+    Returns:
+        New UUID
+    """
+    global _uuid7_last
+    with _uuid7_lock:
+        millis = time.time_ns() // 1_000_000
+        last_millis, counter = _uuid7_last
+        if millis <= last_millis:
+            # Same millisecond or clock went back: count on from the last id
+            millis, counter = last_millis, counter + 1
+            if counter > 0xFFF:
+                millis, counter = millis + 1, 0
+        else:
+            counter = 0
+        _uuid7_last = (millis, counter)
+
+    random_bits = int.from_bytes(os.urandom(8)) & 0x3FFF_FFFF_FFFF_FFFF
+    return UUID(int=(
+        millis << 80 | 0x7 << 76 | counter << 64 | 0b10 << 62 | random_bits
+    ))
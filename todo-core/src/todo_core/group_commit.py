@@ -0,0 +1,228 @@
+"""Group-commit writer for concurrent async mutations.
+
+Web requests that each commit their own write queue up on SQLite's
+single write lock, and every commit pays for its own journal writes
+(and fsync, depending on the synchronous pragma). GroupCommitWriter
+instead queues mutations from concurrent requests and applies them in
+one background task: up to ``max_batch`` mutations, collected for at
+most ``max_delay`` seconds, share one transaction and one commit.
+
+Each caller's future is resolved with its own result or error, and only
+after the batch has committed. Batches commit with synchronous=FULL,
+since in WAL mode NORMAL may lose the last commits on power failure, so
+a mutation that returned successfully is durable; one fsync per batch
+is what makes that affordable. Connections keep the setting once the
+writer has used them.
+
+Mutations that fail the way the operations do (task not found, version
+conflict, invalid title) write nothing and don't affect the rest of the
+batch. Any other error rolls the batch back; the mutation that raised it
+fails and the others are applied again in a new transaction.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from .aio import get_task
+from .cache import invalidate
+from .models import Task
+from .operations import (
+    TOGGLED_STATUS, delete_statement, missing_task_error, update_statement
+)
+
+Mutation = Callable[[AsyncSession], Awaitable[Any]]
+
+async def write_one(db: AsyncSession, query, task_id: UUID,
+                    expected_version: Optional[int]):
+    """Run a single-row write statement without committing, or explain the miss."""
+    row = (await db.scalars(query)).one_or_none()
+    if row is None:
+        exists = (
+            expected_version is not None
+            and await get_task(db, task_id) is not None
+        )
+        raise missing_task_error(task_id, expected_version, exists)
+    return row
+
+class GroupCommitWriter:
+    """Applies queued mutations in batches sharing one commit.
+
+    Attributes:
+        max_batch: Most mutations per transaction
+        max_delay: Seconds to wait for more mutations after the first one
+        batches: Number of committed batches
+        mutations: Number of successful mutations committed
+    """
+
+    def __init__(self, session_factory: async_sessionmaker,
+                 max_batch: int = 64, max_delay: float = 0.002) -> None:
+        if max_batch < 1:
+            raise ValueError("Batch size must be at least 1")
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.batches = 0
+        self.mutations = 0
+        self._session_factory = session_factory
+        self._queue: "asyncio.Queue[Optional[Tuple[Mutation, asyncio.Future]]]" = (
+            asyncio.Queue()
+        )
+        self._task: Optional[asyncio.Task] = None
+        self._started = False
+
+    def start(self) -> None:
+        """Start the background writer on the running event loop."""
+        self._started = True
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self) -> None:
+        """Apply everything queued so far, then stop the writer."""
+        self._started = False
+        if self._task is not None:
+            self._queue.put_nowait(None)
+            await self._task
+            self._task = None
+
+    async def submit(self, mutation: Mutation) -> Any:
+        """Queue a mutation and wait until its batch has committed.
+
+        Args:
+            mutation: Coroutine function applying the change to a session
+                without committing it
+
+        Returns:
+            Whatever the mutation returned
+        """
+        if not self._started:
+            raise RuntimeError("Group-commit writer is not running")
+        if self._task is None:
+            # The background task died on an unexpected error; restart it
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((mutation, future))
+        return await future
+
+    async def create_task(self, title: str) -> Task:
+        """Create a new task, see aio.create_task."""
+        async def mutation(db: AsyncSession) -> Task:
+            task = Task(title=title)
+            db.add(task)
+            await db.flush()
+            return task
+        return await self.submit(mutation)
+
+    async def toggle_task_status(self, task_id: UUID,
+                                 expected_version: Optional[int] = None) -> Task:
+        """Flip a task between PENDING and COMPLETED, see aio.toggle_task_status."""
+        query = update_statement(task_id, {"status": TOGGLED_STATUS}, expected_version)
+        return await self.submit(
+            lambda db: write_one(db, query, task_id, expected_version)
+        )
+
+    async def delete_task(self, task_id: UUID,
+                          expected_version: Optional[int] = None) -> None:
+        """Delete a task, see aio.delete_task."""
+        query = delete_statement(task_id, expected_version)
+        await self.submit(
+            lambda db: write_one(db, query, task_id, expected_version)
+        )
+
+    async def _run(self) -> None:
+        batch: List[Tuple[Mutation, asyncio.Future]] = []
+        try:
+            await self._collect(batch)
+        except Exception as e:
+            # E.g. the session failed to open or close: fail the waiting
+            # callers instead of leaving them hanging, and let the next
+            # submit start over
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if item is not None:
+                    batch.append(item)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            self._task = None
+
+    async def _collect(self, batch: List[Tuple[Mutation, asyncio.Future]]) -> None:
+        """Collect and write batches until closed, filling batch in place."""
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            batch.clear()
+            item = await self._queue.get()
+            if item is None:
+                return
+            batch.append(item)
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except TimeoutError:
+                        break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self.write_batch(batch)
+        batch.clear()
+
+    async def write_batch(self, batch: List[Tuple[Mutation, asyncio.Future]]) -> None:
+        """Apply a batch in one transaction and resolve its futures."""
+        # Callers that gave up before their turn are skipped
+        pending = [(mutation, future) for mutation, future in batch
+                   if not future.done()]
+        while pending:
+            outcomes = []
+            failed = None
+            async with self._session_factory(expire_on_commit=False) as db:
+                # Before the driver's BEGIN, which only precedes writes
+                await db.execute(text("PRAGMA synchronous = FULL"))
+                try:
+                    for index, (mutation, future) in enumerate(pending):
+                        failed = index
+                        try:
+                            outcomes.append((future, await mutation(db), None))
+                        except ValueError as e:
+                            outcomes.append((future, None, e))
+                    failed = None
+                    await db.commit()
+                except Exception as e:
+                    await db.rollback()
+                    if failed is None:
+                        # The commit itself failed; nothing was written
+                        for _, future in pending:
+                            if not future.done():
+                                future.set_exception(e)
+                        return
+                    _, future = pending.pop(failed)
+                    if not future.done():
+                        future.set_exception(e)
+                    continue
+
+            self.batches += 1
+            written = sum(error is None for _, _, error in outcomes)
+            self.mutations += written
+            if written:
+                invalidate()
+            for future, result, error in outcomes:
+                if future.done():
+                    continue
+                if error is None:
+                    future.set_result(result)
+                else:
+                    future.set_exception(error)
+            return
@@ -0,0 +1,144 @@
+"""Append-only journal for quickly captured tasks.
+
+`todo add --quick` appends the task as one JSON line to a journal next to
+the database instead of opening SQLite, so a capture costs one write()
+without a transaction, an fsync or waiting for the write lock. The next
+command that opens the database, or `todo merge`, folds the journal into
+tasks in bulk (see operations.merge_journal).
+
+Entries carry the task id and creation time chosen at capture, so a merge
+is idempotent: entries a crashed merge already inserted are skipped when
+the journal is merged again. A merge first renames the journal aside, so
+tasks captured while it runs go to a new journal and are merged next time.
+
+Merges of a journal run one at a time under a lock file. Appends hold a
+shared flock on the journal and a merge waits for an exclusive one after
+renaming it; both check after locking that the file they opened is still
+the one at its path, so an append racing a merge is never lost.
+
+Only the standard library is imported here, so capturing stays fast.
+"""
+
+import fcntl
+import json
+import os
+from datetime import datetime, timezone
+from typing import Iterator, Optional, Tuple
+
+from .fields import uuid7, validate_title
+
+# Journal of a database file, next to its -wal and -shm files
+JOURNAL_SUFFIX = "-capture"
+# A journal renamed aside by a merge that may not have finished
+MERGING_SUFFIX = ".merging"
+# Held while merging; kept, since removing it would race other merges
+LOCK_SUFFIX = ".lock"
+
+def journal_path(db_path: str) -> str:
+    """Capture journal of a database file."""
+    return db_path + JOURNAL_SUFFIX
+
+def open_locked(path: str, flags: int, operation: int) -> Optional[int]:
+    """Open and flock a journal file, retrying if it was renamed meanwhile.
+
+    Args:
+        path: Journal file
+        flags: os.open flags; with O_CREAT the file is created as needed
+        operation: fcntl.LOCK_SH or fcntl.LOCK_EX
+
+    Returns:
+        Locked file descriptor, or None if the file doesn't exist
+    """
+    while True:
+        try:
+            fd = os.open(path, flags, 0o600)
+        except FileNotFoundError:
+            return None
+        try:
+            fcntl.flock(fd, operation)
+            opened = os.fstat(fd)
+            current = os.stat(path)
+            if (opened.st_dev, opened.st_ino) == (current.st_dev, current.st_ino):
+                return fd
+        except FileNotFoundError:
+            pass
+        except BaseException:
+            os.close(fd)
+            raise
+        # A merge renamed or removed the file before we got the lock
+        os.close(fd)
+        if not flags & os.O_CREAT:
+            return None
+
+def capture(path: str, title: str) -> dict:
+    """Append a task to the journal.
+
+    Args:
+        path: Journal file, see journal_path
+        title: Task title
+
+    Returns:
+        The journal entry, holding the task's id, title and created_at
+
+    Raises:
+        ValueError: If the title is invalid
+    """
+    entry = {
+        "id": str(uuid7()),
+        "title": validate_title(title),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+    line = (json.dumps(entry, ensure_ascii=False) + "\n").encode()
+    fd = open_locked(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, fcntl.LOCK_SH)
+    try:
+        # One write, so concurrent appends never interleave within a line
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+    return entry
+
+def lock_merges(path: str) -> int:
+    """Wait until no other process merges the journal and lock it.
+
+    Returns:
+        File descriptor holding the lock; closing it releases the lock
+    """
+    fd = os.open(path + LOCK_SUFFIX, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+    except BaseException:
+        os.close(fd)
+        raise
+    return fd
+
+def claim(path: str) -> Optional[str]:
+    """Rename the journal aside for merging, holding lock_merges.
+
+    Returns:
+        The journal to merge, or None if nothing was captured. A journal
+        left by an unfinished merge is returned first.
+    """
+    merging = path + MERGING_SUFFIX
+    if os.path.exists(merging):
+        return merging
+    try:
+        os.rename(path, merging)
+    except FileNotFoundError:
+        return None
+    return merging
+
+def read_entries(fd: int) -> Iterator[Tuple[str, str, str]]:
+    """Read the (id, title, created_at) of every complete journal entry.
+
+    A last line without a newline is an append cut short by a crash and
+    is skipped like other lines that don't hold a valid entry.
+    """
+    with os.fdopen(os.dup(fd), "rb") as journal:
+        for line in journal:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                entry = json.loads(line)
+                yield entry["id"], entry["title"], entry["created_at"]
+            except (ValueError, KeyError, TypeError):
+                continue
@@ -0,0 +1,287 @@
+"""Per-operation database metrics.
+
+enable() attaches SQLAlchemy event listeners to every Engine, Session
+and Task load in the process; disable() removes them again. While they
+are off nothing is attached, so no query pays for metrics it does not
+collect.
+
+Each statement and commit is tagged with the outermost public function
+of todo_core.operations, todo_core.aio or todo_core.group_commit on the
+call stack, found by walking frames (and, for async sessions, the frames
+of the event loop greenlet that awaits them). Anything else is tagged
+"other". ORM executions carry their tag in their execution options, so
+rows an async caller loads after other operations ran meanwhile are
+still credited to the operation whose query returned them.
+
+Collected per operation:
+- statements run and their latency histogram (lock waits included)
+- task rows returned by queries (and by writes using RETURNING)
+- rows changed by writes without RETURNING, as the driver reports them
+- commit latency histogram, flush excluded
+"""
+
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from .models import Task
+
+METRICS_ENV = "TODO_METRICS"
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+OPERATION_MODULES = ("todo_core.operations", "todo_core.aio", "todo_core.group_commit")
+
+class Histogram:
+    """Latency histogram with fixed buckets.
+
+    Attributes:
+        counts: Observations per bucket, the last one being +Inf
+        total: Sum of all observations in seconds
+    """
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+
+    @property
+    def count(self) -> int:
+        """Number of observations."""
+        return sum(self.counts)
+
+    def observe(self, seconds: float) -> None:
+        """Record one observation."""
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+
+class OperationMetrics:
+    """Everything recorded for one operation.
+
+    Attributes:
+        statements: Statement latency histogram
+        commits: Commit latency histogram
+        rows_returned: Task rows loaded by queries
+        rows_changed: Rows inserted, updated or deleted
+    """
+
+    def __init__(self) -> None:
+        self.statements = Histogram()
+        self.commits = Histogram()
+        self.rows_returned = 0
+        self.rows_changed = 0
+
+class Registry:
+    """Thread-safe metrics per operation name."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._operations: Dict[str, OperationMetrics] = {}
+
+    def _get(self, operation: str) -> OperationMetrics:
+        metrics = self._operations.get(operation)
+        if metrics is None:
+            metrics = self._operations[operation] = OperationMetrics()
+        return metrics
+
+    def observe_statement(self, operation: str, seconds: float,
+                          rows_changed: int = 0) -> None:
+        """Record one executed statement."""
+        with self._lock:
+            metrics = self._get(operation)
+            metrics.statements.observe(seconds)
+            metrics.rows_changed += rows_changed
+
+    def observe_commit(self, operation: str, seconds: float) -> None:
+        """Record one commit."""
+        with self._lock:
+            self._get(operation).commits.observe(seconds)
+
+    def add_rows(self, operation: str, rows: int) -> None:
+        """Count task rows returned to an operation."""
+        with self._lock:
+            self._get(operation).rows_returned += rows
+
+    def reset(self) -> None:
+        """Forget everything recorded so far."""
+        with self._lock:
+            self._operations.clear()
+
+    def summary(self) -> Dict[str, dict]:
+        """Return totals per operation, with latencies in milliseconds."""
+        with self._lock:
+            return {
+                name: {
+                    "statements": m.statements.count,
+                    "statement_ms": round(m.statements.total * 1000, 3),
+                    "rows_returned": m.rows_returned,
+                    "rows_changed": m.rows_changed,
+                    "commits": m.commits.count,
+                    "commit_ms": round(m.commits.total * 1000, 3),
+                }
+                for name, m in sorted(self._operations.items())
+            }
+
+    def render_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        with self._lock:
+            operations = sorted(self._operations.items())
+            lines: List[str] = []
+
+            def histogram(name: str, help: str, attr: str) -> None:
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} histogram")
+                for operation, m in operations:
+                    h = getattr(m, attr)
+                    label = f'operation="{operation}"'
+                    cumulative = 0
+                    for bound, count in zip((*BUCKETS, "+Inf"), h.counts):
+                        cumulative += count
+                        lines.append(
+                            f'{name}_bucket{{{label},le="{bound}"}} {cumulative}'
+                        )
+                    lines.append(f"{name}_sum{{{label}}} {h.total}")
+                    lines.append(f"{name}_count{{{label}}} {cumulative}")
+
+            def counter(name: str, help: str, attr: str) -> None:
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} counter")
+                for operation, m in operations:
+                    lines.append(
+                        f'{name}{{operation="{operation}"}} {getattr(m, attr)}'
+                    )
+
+            histogram("todo_db_statement_seconds",
+                      "SQL statement latency per operation.", "statements")
+            histogram("todo_db_commit_seconds",
+                      "Commit latency per operation.", "commits")
+            counter("todo_db_rows_returned_total",
+                    "Task rows returned by queries per operation.", "rows_returned")
+            counter("todo_db_rows_changed_total",
+                    "Rows inserted, updated or deleted per operation.", "rows_changed")
+            return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+def calling_operation() -> str:
+    """Name the outermost operations/aio function on the call stack."""
+    name = "other"
+    frame = sys._getframe(1)
+    current = None
+    while True:
+        while frame is not None:
+            if (frame.f_globals.get("__name__") in OPERATION_MODULES
+                    and not frame.f_code.co_name.startswith("_")):
+                name = frame.f_code.co_name
+            frame = frame.f_back
+        # Async sessions run their statements in a child greenlet; the
+        # coroutine that awaited them is suspended in its parent
+        if "greenlet" not in sys.modules:
+            return name
+        import greenlet
+
+        current = (current or greenlet.getcurrent()).parent
+        if current is None:
+            return name
+        frame = current.gr_frame
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context,
+                           executemany):
+    # Kept on the statement's execution context rather than the pooled
+    # connection, so a statement that raises leaves nothing behind
+    context.metrics_start = (calling_operation(), time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context,
+                          executemany):
+    operation, start = context.metrics_start
+    changed = cursor.rowcount if context.isinsert or context.isupdate \
+        or context.isdelete else 0
+    registry.observe_statement(
+        operation, time.perf_counter() - start, max(changed, 0)
+    )
+
+def _do_orm_execute(orm_execute_state):
+    # Rows may be loaded long after their statement ran, e.g. once an
+    # async caller resumes, so the operation travels with the execution
+    orm_execute_state.update_execution_options(
+        metrics_operation=calling_operation()
+    )
+
+def _on_load(target, context, *args):
+    if context is None:
+        # Refreshed by a write's RETURNING, while the write still runs
+        operation = calling_operation()
+    else:
+        operation = context.execution_options.get("metrics_operation", "other")
+    registry.add_rows(operation, 1)
+
+def _before_commit(session):
+    session.info["metrics_commit"] = (calling_operation(), time.perf_counter())
+
+def _after_flush_postexec(session, flush_context):
+    # Flushed statements are timed on their own; start the commit after them
+    if "metrics_commit" in session.info:
+        operation, _ = session.info["metrics_commit"]
+        session.info["metrics_commit"] = (operation, time.perf_counter())
+
+def _after_commit(session):
+    started = session.info.pop("metrics_commit", None)
+    if started is not None:
+        operation, start = started
+        registry.observe_commit(operation, time.perf_counter() - start)
+
+_LISTENERS = (
+    (Engine, "before_cursor_execute", _before_cursor_execute),
+    (Engine, "after_cursor_execute", _after_cursor_execute),
+    (Session, "do_orm_execute", _do_orm_execute),
+    (Task, "load", _on_load),
+    (Task, "refresh", _on_load),
+    (Session, "before_commit", _before_commit),
+    (Session, "after_flush_postexec", _after_flush_postexec),
+    (Session, "after_commit", _after_commit),
+)
+
+def enabled() -> bool:
+    """Check whether the metrics listeners are attached."""
+    return event.contains(Engine, "before_cursor_execute", _before_cursor_execute)
+
+def enable() -> None:
+    """Attach the metrics listeners to every engine and session."""
+    if not enabled():
+        for target, name, listener in _LISTENERS:
+            event.listen(target, name, listener)
+
+def disable() -> None:
+    """Detach the metrics listeners; recorded values are kept."""
+    if enabled():
+        for target, name, listener in _LISTENERS:
+            event.remove(target, name, listener)
+
+def enable_from_env() -> bool:
+    """Enable metrics when $TODO_METRICS is set to a true value.
+
+    Returns:
+        Whether metrics are enabled
+    """
+    if os.environ.get(METRICS_ENV, "").lower() in ("1", "true", "yes", "on"):
+        enable()
+    return enabled()
+
+def render_prometheus() -> str:
+    """Render the process-wide metrics as Prometheus text."""
+    return registry.render_prometheus()
+
+def summary() -> Dict[str, dict]:
+    """Return the process-wide totals per operation."""
+    return registry.summary()
+
+def reset() -> None:
+    """Forget the process-wide metrics."""
+    registry.reset()
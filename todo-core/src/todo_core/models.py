@@ -7,19 +7,59 @@ Following Constitutional requirements:
 - Using SQLAlchemy directly without wrappers
 """
 
+import weakref
 from datetime import datetime, timezone
 from enum import Enum
 from typing import Optional
-from uuid import UUID, uuid4
+from uuid import UUID
 
-from sqlalchemy import String, DateTime, Enum as SQLEnum
+from sqlalchemy import (
+    DDL, Column, Integer, String, Index, Table, event, literal_column
+)
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
+from .fields import uuid7, validate_title
+from .storage import CompactDateTime, CompactEnum, CompactUUID
+
+# Bump whenever tables or indexes change so existing databases are upgraded
+SCHEMA_VERSION = 8
+
 class TaskStatus(str, Enum):
     """Task completion status."""
     PENDING = "PENDING"
     COMPLETED = "COMPLETED"
 
+_next_numbers: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+def next_number(context) -> int:
+    """Column default giving new tasks the next short number.
+
+    The highest number is read once per INSERT statement and the rows of
+    an executemany count on from it, so batches neither repeat the lookup
+    nor hand out the same number twice. The transaction takes the write
+    lock before that read, so concurrent writers can't both see the same
+    highest number.
+
+    Args:
+        context: SQLAlchemy execution context of the INSERT
+
+    Returns:
+        Number for the row being inserted
+    """
+    number = _next_numbers.get(context)
+    if number is None:
+        # A write statement makes the driver BEGIN and SQLite take the
+        # write lock, which the INSERT would take right after anyway
+        context.connection.exec_driver_sql(
+            "UPDATE tasks SET number = number WHERE number = 0"
+        )
+        highest = context.connection.exec_driver_sql(
+            "SELECT max(number) FROM tasks"
+        ).scalar()
+        number = (highest or 0) + 1
+    _next_numbers[context] = number + 1
+    return number
+
 class Base(DeclarativeBase):
     """Base class for all models."""
     pass
@@ -33,25 +73,43 @@ class Task(Base):
     - Essential fields only (YAGNI principle)
     """
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Keyset pagination walks tasks in (created_at, id) order
+        Index("ix_tasks_created_at_id", "created_at", "id"),
+        # Status filters seek on status and keep the same ordering
+        Index("ix_tasks_status_created_at_id", "status", "created_at", "id"),
+        # Short numbers resolve with one index seek
+        Index("ix_tasks_number", "number", unique=True),
+    )
 
-    id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
+    id: Mapped[UUID] = mapped_column(CompactUUID, primary_key=True, default=uuid7)
+    # Short id for the todo CLI, kept for the task's lifetime. Nullable only
+    # because SQLite cannot add a NOT NULL column to existing tables.
+    number: Mapped[int] = mapped_column(nullable=True, default=next_number)
     title: Mapped[str] = mapped_column(String(200), nullable=False)
     status: Mapped[TaskStatus] = mapped_column(
-        SQLEnum(TaskStatus),
+        CompactEnum(TaskStatus),
         nullable=False,
         default=TaskStatus.PENDING
     )
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True),
+        CompactDateTime,
         nullable=False,
         default=lambda: datetime.now(timezone.utc)
     )
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True),
+        CompactDateTime,
         nullable=False,
         default=lambda: datetime.now(timezone.utc),
         onupdate=lambda: datetime.now(timezone.utc)
     )
+    # Bumped by every UPDATE, for optimistic concurrency checks
+    version: Mapped[int] = mapped_column(
+        nullable=False,
+        default=1,
+        server_default="1",
+        onupdate=literal_column("version + 1")
+    )
 
     def __init__(self, title: str, status: Optional[TaskStatus] = None) -> None:
         """Create a new task.
@@ -63,12 +121,108 @@ class Task(Base):
         Raises:
             ValueError: If title is None or exceeds 200 chars
         """
-        if not title:
-            raise ValueError("Task title is required")
-        if len(title) > 200:
-            raise ValueError("Task title cannot exceed 200 characters")
-
         super().__init__(
-            title=title,
+            title=validate_title(title),
             status=status or TaskStatus.PENDING
-        )
\ No newline at end of file
+        )
+
+# Full-text index over titles. It is an external-content FTS5 table keyed
+# by the task number (SQLite's own rowid may change on VACUUM), so titles
+# are stored once and the triggers keep the index in step with tasks.
+SEARCH_INDEX_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5("
+    "title, content='tasks', content_rowid='number', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3 4')",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts(rowid, title) VALUES (new.number, new.title); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title) "
+    "VALUES ('delete', old.number, old.title); END",
+    # Status toggles do not touch the index
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF number, title "
+    "ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title) "
+    "VALUES ('delete', old.number, old.title); "
+    "INSERT INTO tasks_fts(rowid, title) VALUES (new.number, new.title); END",
+)
+REBUILD_SEARCH_INDEX = "INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')"
+
+for statement in SEARCH_INDEX_DDL:
+    event.listen(Task.__table__, "after_create", DDL(statement))
+event.listen(Task.__table__, "before_drop", DDL("DROP TABLE IF EXISTS tasks_fts"))
+
+# Number of tasks per status, kept by triggers in the same transaction as
+# every write so counting never touches the tasks table
+task_counts = Table(
+    "task_counts",
+    Base.metadata,
+    Column("status", CompactEnum(TaskStatus), primary_key=True),
+    Column("count", Integer, nullable=False),
+)
+
+COUNTER_DDL = (
+    "CREATE TRIGGER IF NOT EXISTS task_counts_insert AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO task_counts(status, count) VALUES (new.status, 1) "
+    "ON CONFLICT(status) DO UPDATE SET count = count + 1; END",
+    "CREATE TRIGGER IF NOT EXISTS task_counts_delete AFTER DELETE ON tasks BEGIN "
+    "UPDATE task_counts SET count = count - 1 WHERE status = old.status; END",
+    "CREATE TRIGGER IF NOT EXISTS task_counts_update AFTER UPDATE OF status ON tasks "
+    "WHEN old.status IS NOT new.status BEGIN "
+    "UPDATE task_counts SET count = count - 1 WHERE status = old.status; "
+    "INSERT INTO task_counts(status, count) VALUES (new.status, 1) "
+    "ON CONFLICT(status) DO UPDATE SET count = count + 1; END",
+)
+RECOUNT_DDL = (
+    "DELETE FROM task_counts",
+    "INSERT INTO task_counts(status, count) "
+    "SELECT status, count(*) FROM tasks GROUP BY status",
+)
+
+# After all tables exist, since the triggers join tasks and task_counts
+for statement in COUNTER_DDL:
+    event.listen(Base.metadata, "after_create", DDL(statement))
+
+# Append-only change log, one entry per written task row, kept by triggers
+# in the same transaction as the write. AUTOINCREMENT keeps sequence
+# numbers increasing even after compaction deletes the newest entries.
+# Entries name the task and the operation: the task's current row, or its
+# absence for a deleted task, is the change.
+task_changes = Table(
+    "task_changes",
+    Base.metadata,
+    Column("seq", Integer, primary_key=True),
+    Column("task_id", CompactUUID, nullable=False),
+    # "insert", "update" or "delete"; entries from before it was recorded
+    # count as updates
+    Column("op", String(6), nullable=False, server_default="update"),
+    # Finds an entry's successors for the same task, so deltas skip
+    # superseded entries without grouping the log
+    Index("ix_task_changes_task_id_seq", "task_id", "seq"),
+    sqlite_autoincrement=True,
+)
+
+# Readers of the change log and the last sequence number each has
+# acknowledged; compaction keeps every entry one of them still needs
+change_consumers = Table(
+    "change_consumers",
+    Base.metadata,
+    Column("name", String(100), primary_key=True),
+    Column("seq", Integer, nullable=False),
+    Column("seen_at", CompactDateTime, nullable=False),
+)
+
+CHANGE_LOG_DDL = (
+    # Triggers of older schema versions don't record the operation
+    "DROP TRIGGER IF EXISTS task_changes_insert",
+    "DROP TRIGGER IF EXISTS task_changes_update",
+    "DROP TRIGGER IF EXISTS task_changes_delete",
+    "CREATE TRIGGER task_changes_insert AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO task_changes(task_id, op) VALUES (new.id, 'insert'); END",
+    "CREATE TRIGGER task_changes_update AFTER UPDATE ON tasks BEGIN "
+    "INSERT INTO task_changes(task_id, op) VALUES (new.id, 'update'); END",
+    "CREATE TRIGGER task_changes_delete AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO task_changes(task_id, op) VALUES (old.id, 'delete'); END",
+)
+
+for statement in CHANGE_LOG_DDL:
+    event.listen(Base.metadata, "after_create", DDL(statement))
@@ -6,12 +6,44 @@ Following Constitutional requirements:
 - Real database operations (no mocking)
 """
 
-from typing import List, Optional
+import fcntl
+import os
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as Base64Error
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import (
+    Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+)
 from uuid import UUID
 
+from sqlalchemy import (
+    ColumnElement, Delete, Insert, Select, Update, case, column, delete, func,
+    insert, literal, or_, select, table, text, tuple_, update
+)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
-from .models import Task, TaskStatus
+from .cache import invalidate
+from .journal import MERGING_SUFFIX, claim, lock_merges, open_locked, read_entries
+from .models import (
+    REBUILD_SEARCH_INDEX, RECOUNT_DDL, Task, TaskStatus, change_consumers,
+    task_changes, task_counts, validate_title
+)
+
+class VersionConflictError(ValueError):
+    """Raised when a task changed since the version a caller expected."""
+
+class BulkCreateError(ValueError):
+    """Raised when a chunk of a bulk insert fails.
+
+    Attributes:
+        committed: Number of rows committed before the failing chunk
+    """
+
+    def __init__(self, message: str, committed: int) -> None:
+        super().__init__(message)
+        self.committed = committed
 
 def create_task(db: Session, title: str) -> Task:
     """Create a new task.
@@ -26,8 +58,127 @@ def create_task(db: Session, title: str) -> Task:
     task = Task(title=title)
     db.add(task)
     db.commit()
+    invalidate()
     return task
 
+def create_tasks(
+    db: Session,
+    titles: Iterable[str],
+    batch_size: int = 1000,
+    on_batch: Optional[Callable[[int], None]] = None
+) -> int:
+    """Create many tasks in chunked batches.
+
+    Titles are consumed lazily and validated like ``Task.__init__``. Each
+    chunk is inserted with a single executemany and committed on its own,
+    so a failure only rolls back the current chunk.
+
+    Args:
+        db: Database session
+        titles: Iterable of task titles
+        batch_size: Number of rows per insert and commit
+        on_batch: Optional callback receiving the running committed count
+
+    Returns:
+        Number of tasks created
+
+    Raises:
+        BulkCreateError: If a chunk fails; ``committed`` tells where to resume
+    """
+    if batch_size < 1:
+        raise ValueError("Batch size must be at least 1")
+
+    committed = 0
+    titles = iter(titles)
+    while True:
+        try:
+            rows = [
+                {"title": validate_title(title)}
+                for title in islice(titles, batch_size)
+            ]
+            if not rows:
+                break
+            db.execute(insert(Task), rows)
+            db.commit()
+            invalidate()
+        except Exception as e:
+            db.rollback()
+            raise BulkCreateError(
+                f"Batch starting at row {committed} failed: {e}", committed
+            ) from e
+        committed += len(rows)
+        if on_batch is not None:
+            on_batch(committed)
+    return committed
+
+def merge_claimed(db: Session, merging: str, batch_size: int) -> int:
+    """Insert the tasks of a journal renamed aside by claim and remove it."""
+    # Wait for appends that opened the journal before it was renamed
+    fd = open_locked(merging, os.O_RDONLY, fcntl.LOCK_EX)
+    try:
+        rows = []
+        for task_id, title, created_at in read_entries(fd):
+            try:
+                rows.append({
+                    "id": UUID(task_id),
+                    "title": validate_title(title),
+                    "created_at": datetime.fromisoformat(created_at),
+                })
+            except (ValueError, TypeError, AttributeError):
+                continue
+        query = sqlite_insert(Task.__table__).on_conflict_do_nothing(
+            index_elements=["id"]
+        )
+        merged = 0
+        try:
+            for start in range(0, len(rows), batch_size):
+                merged += db.execute(query, rows[start:start + batch_size]).rowcount
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        if merged:
+            invalidate()
+        os.unlink(merging)
+    finally:
+        os.close(fd)
+    return merged
+
+def merge_journal(db: Session, path: str, batch_size: int = 1000) -> int:
+    """Insert the tasks captured in a journal and remove it.
+
+    All entries of a journal are inserted in one transaction, keeping the
+    id and creation time chosen at capture, and the journal is only
+    removed once that has committed. Entries already in tasks, because a
+    merge was interrupted after its commit, are skipped, as are invalid
+    ones. A journal left by an interrupted merge is merged first.
+
+    Args:
+        db: Database session
+        path: Journal file, see journal.journal_path
+        batch_size: Number of rows per insert
+
+    Returns:
+        Number of tasks inserted
+    """
+    if batch_size < 1:
+        raise ValueError("Batch size must be at least 1")
+
+    if not os.path.exists(path) and not os.path.exists(path + MERGING_SUFFIX):
+        return 0
+    merged = 0
+    lock = lock_merges(path)
+    try:
+        # At most the leftover of an interrupted merge and the current journal
+        for _ in range(2):
+            merging = claim(path)
+            if merging is None:
+                break
+            merged += merge_claimed(db, merging, batch_size)
+    finally:
+        os.close(lock)
+    return merged
+
 def get_task(db: Session, task_id: UUID) -> Optional[Task]:
     """Get a task by ID.
 
@@ -40,66 +191,763 @@ def get_task(db: Session, task_id: UUID) -> Optional[Task]:
     """
     return db.query(Task).filter(Task.id == task_id).first()
 
-def list_tasks(db: Session, status: Optional[TaskStatus] = None) -> List[Task]:
-    """List all tasks, optionally filtered by status.
+def encode_cursor(task: Task) -> str:
+    """Encode a task's position as an opaque pagination cursor.
+
+    Args:
+        task: Last task of the current page
+
+    Returns:
+        URL-safe cursor string
+    """
+    raw = f"{task.created_at.isoformat()}|{task.id.hex}"
+    return urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Decode a pagination cursor.
+
+    Args:
+        cursor: Cursor produced by encode_cursor
+
+    Returns:
+        (created_at, id) of the task the cursor points after
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        created_at, task_id = urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), UUID(task_id)
+    except (Base64Error, UnicodeDecodeError, ValueError):
+        raise ValueError(f"Invalid cursor: {cursor}") from None
+
+def select_tasks(
+    status: Optional[TaskStatus] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None
+) -> Select:
+    """Build the keyset-paginated task listing statement.
+
+    Shared by the sync and async listing operations.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    query = select(Task)
+    if status is not None:
+        query = query.where(Task.status == status)
+    if cursor is not None:
+        created_at, task_id = decode_cursor(cursor)
+        # Row-value comparison lets SQLite seek the index to the cursor
+        query = query.where(
+            tuple_(Task.created_at, Task.id)
+            > tuple_(created_at, task_id,
+                     types=[Task.created_at.type, Task.id.type])
+        )
+    query = query.order_by(Task.created_at, Task.id)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+def list_tasks(
+    db: Session,
+    status: Optional[TaskStatus] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None
+) -> List[Task]:
+    """List tasks in creation order, optionally filtered and paginated.
+
+    Pagination is keyset based on (created_at, id), so fetching a deep
+    page costs the same as fetching the first one.
 
     Args:
         db: Database session
         status: Optional status filter
+        cursor: Optional cursor; only tasks after it are returned
+        limit: Optional maximum number of tasks
 
     Returns:
         List of tasks
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    return db.scalars(select_tasks(status, cursor, limit)).all()
+
+def iter_tasks(
+    db: Session,
+    status: Optional[TaskStatus] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    batch_size: int = 1000
+) -> Iterator[Task]:
+    """Stream tasks in creation order without loading them all.
+
+    Rows are fetched from the cursor ``batch_size`` at a time, so memory
+    stays constant however many tasks are listed.
+
+    Args:
+        db: Database session
+        status: Optional status filter
+        cursor: Optional cursor; only tasks after it are returned
+        limit: Optional maximum number of tasks
+        batch_size: Number of rows hydrated per fetch
+
+    Yields:
+        Tasks in (created_at, id) order
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    query = select_tasks(status, cursor, limit)
+    yield from db.scalars(query.execution_options(yield_per=batch_size))
+
+# The FTS5 table from models.SEARCH_INDEX_DDL; its same-named hidden
+# column is the left operand of MATCH
+tasks_fts = table("tasks_fts", column("rowid"), column("rank"), column("tasks_fts"))
+
+def search_expression(query: str) -> str:
+    """Turn user input into an FTS5 query for search-as-you-type.
+
+    Every word must match; the last one may still be being typed, so it
+    matches as a prefix. Words are quoted, so FTS5 operators and
+    punctuation in the input are searched for literally instead of
+    failing to parse.
+
+    Args:
+        query: Words typed by the user
+
+    Returns:
+        FTS5 query, empty if the input has no words
+    """
+    phrases = ['"' + word.replace('"', '""') + '"' for word in query.split()]
+    if phrases:
+        phrases[-1] += "*"
+    return " ".join(phrases)
+
+# Only the newest matches are ranked, so broad words in large tables cost
+# a bounded amount of bm25 scoring
+SEARCH_CANDIDATES = 1000
+
+def select_search(query: str, limit: int = 20) -> Select:
+    """Build the ranked full-text search statement.
+
+    Shared by the sync and async search operations. FTS5 walks the
+    matches newest first and stops after SEARCH_CANDIDATES; those are
+    ranked by bm25 and joined to tasks through ix_tasks_number.
+    """
+    candidates = (
+        select(tasks_fts.c.rowid, tasks_fts.c.rank)
+        .where(tasks_fts.c.tasks_fts.op("MATCH")(search_expression(query)))
+        .order_by(tasks_fts.c.rowid.desc())
+        .limit(SEARCH_CANDIDATES)
+        .subquery()
+    )
+    return (
+        select(Task)
+        .join(candidates, candidates.c.rowid == Task.number)
+        .order_by(candidates.c.rank)
+        .limit(limit)
+    )
+
+def search_tasks(db: Session, query: str, limit: int = 20) -> List[Task]:
+    """Find tasks whose title contains the query's words.
+
+    Results are ranked by relevance among the SEARCH_CANDIDATES most
+    recent matches.
+
+    Args:
+        db: Database session
+        query: Search words, the last one a prefix: "buy mil" matches "Buy milk"
+        limit: Maximum number of tasks
+
+    Returns:
+        Matching tasks, best match first
+    """
+    if not search_expression(query):
+        return []
+    return db.scalars(select_search(query, limit)).all()
+
+def rebuild_search_index(db: Session) -> None:
+    """Rebuild the full-text search index from the tasks table.
+
+    Args:
+        db: Database session
     """
-    query = db.query(Task)
+    db.execute(text(REBUILD_SEARCH_INDEX))
+    db.commit()
+
+def select_count(status: Optional[TaskStatus] = None) -> Select:
+    """Build the statement reading the maintained task counters.
+
+    Shared by the sync and async count operations.
+    """
+    query = select(func.coalesce(func.sum(task_counts.c.count), 0))
     if status is not None:
-        query = query.filter(Task.status == status)
-    return query.all()
+        query = query.where(task_counts.c.status == status)
+    return query
+
+def count_tasks(db: Session, status: Optional[TaskStatus] = None) -> int:
+    """Count tasks without touching the tasks table.
+
+    Args:
+        db: Database session
+        status: Optional status filter
+
+    Returns:
+        Number of tasks
+    """
+    return db.scalar(select_count(status))
+
+def check_task_counts(
+    db: Session,
+    repair: bool = True
+) -> Dict[TaskStatus, Tuple[int, int]]:
+    """Recount tasks per status and compare with the maintained counters.
+
+    The recount scans the status index. It runs after the transaction has
+    taken the write lock, so no write can commit between the comparison
+    and the repair, which recounts in the same transaction.
+
+    Args:
+        db: Database session
+        repair: Whether to overwrite drifted counters with the recount
+
+    Returns:
+        (stored, actual) counts of every status that drifted
+    """
+    # A write statement makes the driver BEGIN and SQLite take the write
+    # lock; plain SELECTs would each read their own snapshot
+    db.execute(text("UPDATE task_counts SET count = count WHERE 0"))
+    stored = dict(db.execute(select(task_counts.c.status, task_counts.c.count)).all())
+    actual = dict(db.execute(
+        select(Task.status, func.count()).group_by(Task.status)
+    ).all())
+    drift = {
+        status: (stored.get(status, 0), actual.get(status, 0))
+        for status in TaskStatus
+        if stored.get(status, 0) != actual.get(status, 0)
+    }
+    if drift and repair:
+        for statement in RECOUNT_DDL:
+            db.execute(text(statement))
+        db.commit()
+    else:
+        db.rollback()
+    return drift
+
+def update_statement(
+    task_id: UUID,
+    values: dict,
+    expected_version: Optional[int] = None
+) -> Update:
+    """Build a single-row ``UPDATE ... RETURNING`` statement.
+
+    Shared by the sync and async operations. ``updated_at`` and ``version``
+    are bumped by their column onupdate defaults.
+
+    Args:
+        task_id: Task UUID
+        values: Column values to set
+        expected_version: Only match if the row still has this version
+    """
+    # "fetch" syncs the identity map from RETURNING instead of evaluating
+    # the criteria against (possibly expired) in-memory objects
+    query = (
+        update(Task)
+        .where(Task.id == task_id)
+        .values(**values)
+        .returning(Task)
+        .execution_options(synchronize_session="fetch")
+    )
+    if expected_version is not None:
+        query = query.where(Task.version == expected_version)
+    return query
+
+def delete_statement(
+    task_id: UUID,
+    expected_version: Optional[int] = None
+) -> Delete:
+    """Build a single-row ``DELETE ... RETURNING`` statement.
+
+    Args:
+        task_id: Task UUID
+        expected_version: Only match if the row still has this version
+    """
+    query = (
+        delete(Task)
+        .where(Task.id == task_id)
+        .returning(Task.id)
+        .execution_options(synchronize_session="fetch")
+    )
+    if expected_version is not None:
+        query = query.where(Task.version == expected_version)
+    return query
+
+def update_values(title: Optional[str], status: Optional[TaskStatus]) -> dict:
+    """Collect and validate the columns an update sets."""
+    values = {}
+    if title is not None:
+        values["title"] = validate_title(title)
+    if status is not None:
+        values["status"] = status
+    return values
+
+# Flips PENDING <-> COMPLETED inside the UPDATE itself
+TOGGLED_STATUS = case(
+    (Task.status == TaskStatus.PENDING,
+     literal(TaskStatus.COMPLETED, Task.status.type)),
+    else_=literal(TaskStatus.PENDING, Task.status.type)
+)
+
+def missing_task_error(
+    task_id: UUID,
+    expected_version: Optional[int],
+    exists: bool
+) -> ValueError:
+    """Explain why a single-row write matched nothing."""
+    if exists:
+        return VersionConflictError(
+            f"Task {task_id} was modified since version {expected_version}"
+        )
+    return ValueError(f"Task {task_id} not found")
+
+def _write_one(db: Session, query, task_id: UUID,
+               expected_version: Optional[int]):
+    """Run a single-row write statement and commit, or explain the miss."""
+    row = db.scalars(query).one_or_none()
+    if row is None:
+        db.rollback()
+        exists = expected_version is not None and get_task(db, task_id) is not None
+        raise missing_task_error(task_id, expected_version, exists)
+    db.commit()
+    invalidate()
+    return row
 
 def update_task(
     db: Session,
     task_id: UUID,
     title: Optional[str] = None,
-    status: Optional[TaskStatus] = None
+    status: Optional[TaskStatus] = None,
+    expected_version: Optional[int] = None
 ) -> Task:
-    """Update a task.
+    """Update a task in a single round trip.
 
     Args:
         db: Database session
         task_id: Task UUID
         title: Optional new title
         status: Optional new status
+        expected_version: Optional version the task must still have
 
     Returns:
         Updated task
 
     Raises:
-        ValueError: If task not found
+        ValueError: If task not found or the title is invalid
+        VersionConflictError: If the task changed since expected_version
     """
-    task = get_task(db, task_id)
-    if task is None:
-        raise ValueError(f"Task {task_id} not found")
+    values = update_values(title, status)
+    if not values:
+        # Nothing to write, but the version must still be checked, against
+        # the row rather than a possibly stale object in the session
+        task = db.get(Task, task_id, populate_existing=True)
+        if task is None or expected_version not in (None, task.version):
+            raise missing_task_error(task_id, expected_version, task is not None)
+        return task
 
-    if title is not None:
-        task.title = title
-    if status is not None:
-        task.status = status
+    query = update_statement(task_id, values, expected_version)
+    return _write_one(db, query, task_id, expected_version)
 
-    db.commit()
-    return task
+def toggle_task_status(
+    db: Session,
+    task_id: UUID,
+    expected_version: Optional[int] = None
+) -> Task:
+    """Atomically flip a task between PENDING and COMPLETED.
+
+    The new status is computed by SQL in the same UPDATE, so concurrent
+    toggles cannot read a stale status.
+
+    Args:
+        db: Database session
+        task_id: Task UUID
+        expected_version: Optional version the task must still have
+
+    Returns:
+        Updated task
 
-def delete_task(db: Session, task_id: UUID) -> None:
-    """Delete a task.
+    Raises:
+        ValueError: If task not found
+        VersionConflictError: If the task changed since expected_version
+    """
+    query = update_statement(task_id, {"status": TOGGLED_STATUS}, expected_version)
+    return _write_one(db, query, task_id, expected_version)
+
+def delete_task(
+    db: Session,
+    task_id: UUID,
+    expected_version: Optional[int] = None
+) -> None:
+    """Delete a task in a single round trip.
 
     Args:
         db: Database session
         task_id: Task UUID
+        expected_version: Optional version the task must still have
 
     Raises:
         ValueError: If task not found
+        VersionConflictError: If the task changed since expected_version
     """
-    task = get_task(db, task_id)
-    if task is None:
-        raise ValueError(f"Task {task_id} not found")
+    query = delete_statement(task_id, expected_version)
+    _write_one(db, query, task_id, expected_version)
+
+def numbers_criteria(ranges: Iterable[Tuple[int, int]]) -> ColumnElement[bool]:
+    """Match tasks whose short number is in any of the inclusive ranges."""
+    return or_(*(
+        Task.number == first if first == last else Task.number.between(first, last)
+        for first, last in ranges
+    ))
+
+def merge_ranges(ranges: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Sort inclusive number ranges and merge overlapping or adjacent ones."""
+    merged: List[Tuple[int, int]] = []
+    for first, last in sorted(ranges):
+        if merged and first <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], last))
+        else:
+            merged.append((first, last))
+    return merged
 
-    db.delete(task)
-    db.commit()
\ No newline at end of file
+def missing_numbers(ranges: List[Tuple[int, int]], found: Set[int]) -> Iterator[int]:
+    """Lazily yield the numbers in merged ranges that have no task."""
+    for first, last in ranges:
+        for number in range(first, last + 1):
+            if number not in found:
+                yield number
+
+def _write_numbered(db: Session, query, ranges: List[Tuple[int, int]]) -> List[Task]:
+    """Run a multi-row write by number and commit, unless a number is missing."""
+    tasks = sorted(db.scalars(query).all(), key=lambda task: task.number)
+    # Numbers are unique, so the ranges are complete when the counts match;
+    # only then is the range walked, and only up to what the error shows
+    ranges = merge_ranges(ranges)
+    missing = sum(last - first + 1 for first, last in ranges) - len(tasks)
+    if missing:
+        db.rollback()
+        shown = islice(
+            missing_numbers(ranges, {task.number for task in tasks}), 10
+        )
+        noun = "Task" if missing == 1 else "Tasks"
+        raise ValueError(
+            f"{noun} not found: {', '.join(map(str, shown))}"
+            f"{'...' if missing > 10 else ''}"
+        )
+    if isinstance(query, Delete):
+        # Keep deleted rows readable once the commit expires the session
+        for task in tasks:
+            db.expunge(task)
+    db.commit()
+    invalidate()
+    return tasks
+
+def update_numbered_tasks(
+    db: Session,
+    ranges: Iterable[Tuple[int, int]],
+    status: TaskStatus
+) -> List[Task]:
+    """Set the status of tasks by short number in one statement.
+
+    Either every task in the ranges is updated or, if any number has no
+    task, none is.
+
+    Args:
+        db: Database session
+        ranges: Inclusive (first, last) number ranges; (n, n) for one task
+        status: New status
+
+    Returns:
+        Updated tasks ordered by number
+
+    Raises:
+        ValueError: If no range is given or a number has no task
+    """
+    ranges = list(ranges)
+    if not ranges:
+        raise ValueError("No task numbers given")
+    query = (
+        update(Task)
+        .where(numbers_criteria(ranges))
+        .values(status=status)
+        .returning(Task)
+        .execution_options(synchronize_session="fetch")
+    )
+    return _write_numbered(db, query, ranges)
+
+def delete_numbered_tasks(
+    db: Session,
+    ranges: Iterable[Tuple[int, int]]
+) -> List[Task]:
+    """Delete tasks by short number in one statement.
+
+    Either every task in the ranges is deleted or, if any number has no
+    task, none is.
+
+    Args:
+        db: Database session
+        ranges: Inclusive (first, last) number ranges; (n, n) for one task
+
+    Returns:
+        Deleted tasks ordered by number
+
+    Raises:
+        ValueError: If no range is given or a number has no task
+    """
+    ranges = list(ranges)
+    if not ranges:
+        raise ValueError("No task numbers given")
+    query = (
+        delete(Task)
+        .where(numbers_criteria(ranges))
+        .returning(Task)
+        .execution_options(synchronize_session="fetch")
+    )
+    return _write_numbered(db, query, ranges)
+
+class ChangeSet:
+    """Task changes after a change log sequence number.
+
+    Attributes:
+        changes: (task id, task) pairs in log order; the task is None once
+            it has been deleted
+        seq: Sequence number to ask for changes after next time
+        more: Whether changes after seq were left out to respect the limit
+        reset: Whether changes is a page of a snapshot of every task
+            instead, because the log no longer reaches back to the
+            requested number
+        cursor: Where the next page of a snapshot starts, while more
+        created: Ids of the changed tasks that were inserted after the
+            requested number
+    """
+
+    def __init__(self, changes: List[Tuple[UUID, Optional[Task]]], seq: int,
+                 more: bool = False, reset: bool = False,
+                 cursor: Optional[str] = None,
+                 created: Optional[Set[UUID]] = None) -> None:
+        self.changes = changes
+        self.seq = seq
+        self.more = more
+        self.reset = reset
+        self.cursor = cursor
+        self.created = created or set()
+
+# Consumers that neither acknowledged anything nor were seen for this long
+# no longer hold back compaction; they get a snapshot if they come back
+CONSUMER_EXPIRY = timedelta(days=30)
+# An acknowledgement that doesn't move a consumer forward only refreshes
+# its last-seen time this often, so idle polling doesn't write
+CONSUMER_REFRESH = timedelta(hours=1)
+
+# Newest sequence number written (AUTOINCREMENT keeps it after compaction)
+# and the newest one compacted away, below the oldest entry left
+CHANGE_BOUNDS = text(
+    "SELECT coalesce((SELECT seq FROM sqlite_sequence "
+    "WHERE name = 'task_changes'), 0) AS head, "
+    "(SELECT min(seq) - 1 FROM task_changes) AS horizon"
+)
+
+def select_changes(since: int, limit: int) -> Select:
+    """Build the statement reading the latest change per task after since.
+
+    Shared by the sync and async change operations. The log is read in
+    sequence order, skipping entries that a later entry for the same task
+    supersedes, so nothing is grouped or sorted. Tasks are joined in the
+    same statement, so a deleted task comes back without a row, and
+    whether a task was inserted after since is looked up the same way.
+    One row more than the limit is read to tell whether more changes
+    follow.
+    """
+    later = task_changes.alias("later")
+    superseded = (
+        select(later.c.seq)
+        .where(later.c.task_id == task_changes.c.task_id,
+               later.c.seq > task_changes.c.seq)
+        .exists()
+    )
+    inserted = task_changes.alias("inserted")
+    created = (
+        select(inserted.c.seq)
+        .where(inserted.c.task_id == task_changes.c.task_id,
+               inserted.c.seq > since, inserted.c.op == "insert")
+        .exists()
+    )
+    return (
+        select(task_changes.c.seq, task_changes.c.task_id,
+               created.label("created"), Task)
+        .outerjoin(Task, Task.id == task_changes.c.task_id)
+        .where(task_changes.c.seq > since, ~superseded)
+        .order_by(task_changes.c.seq)
+        .limit(limit + 1)
+    )
+
+def is_stale(since: int, head: int, horizon: Optional[int]) -> bool:
+    """Whether a delta since this number can't be served from the log.
+
+    Zero asks for a snapshot, and numbers from before the last compaction
+    or after the newest entry (another database) can't be continued.
+    """
+    return since <= 0 or since > head or since < (head if horizon is None else horizon)
+
+def change_set(since: int, limit: int, rows: Sequence) -> ChangeSet:
+    """Build a ChangeSet from (seq, task id, created, task) select_changes rows."""
+    more = len(rows) > limit
+    rows = rows[:limit]
+    return ChangeSet(
+        [(task_id, task) for _, task_id, _, task in rows],
+        rows[-1][0] if rows else since,
+        more,
+        created={task_id for _, task_id, created, _ in rows if created}
+    )
+
+def encode_snapshot_cursor(head: int, task: Task) -> str:
+    """Encode where the next snapshot page starts, and the head it ends at."""
+    return f"{head}.{encode_cursor(task)}"
+
+def decode_snapshot_cursor(cursor: str) -> Tuple[int, str]:
+    """Decode a snapshot cursor into its head and task listing cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    head, _, position = cursor.partition(".")
+    if not head.isdigit():
+        raise ValueError(f"Invalid cursor: {cursor}")
+    decode_cursor(position)
+    return int(head), position
+
+def snapshot_page(since: int, head: int, limit: int,
+                  tasks: Sequence[Task]) -> ChangeSet:
+    """Turn a snapshot page read one task past the limit into a ChangeSet.
+
+    Until the last page, seq stays at since and the cursor carries the
+    head read before the first page; the last page reports that head, so
+    the delta after it has every write made while the pages were read.
+    """
+    if len(tasks) <= limit:
+        return ChangeSet([(task.id, task) for task in tasks], head, reset=True)
+    tasks = tasks[:limit]
+    return ChangeSet(
+        [(task.id, task) for task in tasks], since, more=True, reset=True,
+        cursor=encode_snapshot_cursor(head, tasks[-1])
+    )
+
+def list_changes(db: Session, since: int = 0, limit: int = 1000,
+                 cursor: Optional[str] = None) -> ChangeSet:
+    """Get what changed in the task list after a change log sequence number.
+
+    Every write to tasks appends its rows to the change log in the same
+    transaction. Each changed task is reported once, as it is now, so
+    applying a ChangeSet to a mirror of the tasks brings it up to date.
+
+    A snapshot comes in pages of the creation order listing: ask again
+    with the same since and the returned cursor while there is more. The
+    mirror is replaced by the pages of the snapshot, from the first one.
+
+    Args:
+        db: Database session
+        since: ``seq`` of the previous ChangeSet; 0 for a snapshot
+        limit: Maximum number of tasks
+        cursor: ``cursor`` of the previous snapshot page
+
+    Returns:
+        ChangeSet with the changes, or a snapshot page if reset
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    if cursor is None:
+        rows = [] if since <= 0 else db.execute(select_changes(since, limit)).all()
+        # Read after the delta: had compaction trimmed past since by now,
+        # the delta could have missed entries
+        head, horizon = db.execute(CHANGE_BOUNDS).one()
+        if not is_stale(since, head, horizon):
+            return change_set(since, limit, rows)
+        position = None
+    else:
+        head, position = decode_snapshot_cursor(cursor)
+    tasks = db.scalars(select_tasks(cursor=position, limit=limit + 1)).all()
+    return snapshot_page(since, head, limit, tasks)
+
+def acknowledge_statement(consumer: str, seq: int, now: datetime) -> Insert:
+    """Build the upsert recording what a consumer has applied.
+
+    Returns a row only when something was written: the consumer is new,
+    moved forward, or hasn't been seen for CONSUMER_REFRESH.
+    """
+    query = sqlite_insert(change_consumers).values(name=consumer, seq=seq, seen_at=now)
+    return query.on_conflict_do_update(
+        index_elements=[change_consumers.c.name],
+        set_={
+            "seq": func.max(change_consumers.c.seq, query.excluded.seq),
+            "seen_at": query.excluded.seen_at,
+        },
+        where=or_(
+            query.excluded.seq > change_consumers.c.seq,
+            change_consumers.c.seen_at < now - CONSUMER_REFRESH,
+        ),
+    ).returning(change_consumers.c.seq)
+
+def compact_statements(now: datetime,
+                       expiry: timedelta = CONSUMER_EXPIRY) -> Tuple[Delete, Delete]:
+    """Build the statements forgetting expired consumers and trimming the log.
+
+    Entries up to the lowest acknowledged number are deleted; without any
+    consumer left, every entry is.
+    """
+    oldest_needed = func.coalesce(
+        select(func.min(change_consumers.c.seq)).scalar_subquery(),
+        select(func.max(task_changes.c.seq)).scalar_subquery()
+    )
+    return (
+        delete(change_consumers).where(change_consumers.c.seen_at < now - expiry),
+        delete(task_changes).where(task_changes.c.seq <= oldest_needed),
+    )
+
+def compact_changes(db: Session, expiry: timedelta = CONSUMER_EXPIRY) -> int:
+    """Trim change log entries that every known consumer has acknowledged.
+
+    Consumers not seen for ``expiry`` are forgotten first. Readers that
+    never named themselves don't hold entries back; if the log was
+    trimmed past their position they get a snapshot instead.
+
+    Args:
+        db: Database session
+        expiry: How long an idle consumer keeps its entries
+
+    Returns:
+        Number of log entries deleted
+    """
+    forget, trim = compact_statements(datetime.now(timezone.utc), expiry)
+    db.execute(forget)
+    deleted = db.execute(trim).rowcount
+    db.commit()
+    return deleted
+
+def acknowledge_changes(db: Session, consumer: str, seq: int) -> None:
+    """Record that a consumer has applied the changes up to seq.
+
+    Compacts the log whenever an acknowledgement moves a consumer.
+
+    Args:
+        db: Database session
+        consumer: Name the consumer reads the log under
+        seq: ``seq`` of a ChangeSet it has applied
+    """
+    now = datetime.now(timezone.utc)
+    if db.execute(acknowledge_statement(consumer, seq, now)).first() is None:
+        db.rollback()
+        return
+    for statement in compact_statements(now):
+        db.execute(statement)
+    db.commit()
@@ -0,0 +1,79 @@
+"""Deterministic synthetic tasks for benchmarks and demos.
+
+The same count and seed always produce the same titles and statuses in
+the same order, so benchmark databases are comparable between runs.
+Ids and timestamps are still generated at insert time.
+"""
+
+import random
+from itertools import islice
+from typing import Callable, Iterator, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from .cache import invalidate
+from .models import Task, TaskStatus
+
+VERBS = (
+    "Buy", "Call", "Email", "Fix", "Write", "Review", "Plan", "Clean",
+    "Book", "Pay", "Read", "Update", "Schedule", "Cancel", "Prepare", "Water",
+)
+OBJECTS = (
+    "milk", "report", "dentist", "bike", "invoice", "garage", "flight",
+    "plants", "pull request", "slides", "taxes", "newsletter", "backup",
+    "groceries", "budget", "meeting notes", "car insurance", "birthday gift",
+)
+
+def seed_rows(count: int, seed: int = 0,
+              completed_ratio: float = 0.3) -> Iterator[Tuple[str, TaskStatus]]:
+    """Generate deterministic (title, status) pairs.
+
+    Args:
+        count: Number of rows
+        seed: Random seed
+        completed_ratio: Share of rows that are COMPLETED
+
+    Yields:
+        (title, status) pairs
+    """
+    rng = random.Random(seed)
+    for i in range(count):
+        title = f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} #{i + 1}"
+        done = rng.random() < completed_ratio
+        yield title, TaskStatus.COMPLETED if done else TaskStatus.PENDING
+
+def seed_tasks(
+    db: Session,
+    count: int,
+    seed: int = 0,
+    completed_ratio: float = 0.3,
+    batch_size: int = 5000,
+    on_batch: Optional[Callable[[int], None]] = None
+) -> int:
+    """Insert deterministic synthetic tasks in committed batches.
+
+    Args:
+        db: Database session
+        count: Number of tasks
+        seed: Random seed
+        completed_ratio: Share of tasks that are COMPLETED
+        batch_size: Rows per insert and commit
+        on_batch: Optional callback receiving the running committed count
+
+    Returns:
+        Number of tasks created
+    """
+    rows = seed_rows(count, seed, completed_ratio)
+    committed = 0
+    while chunk := [
+        {"title": title, "status": status}
+        for title, status in islice(rows, batch_size)
+    ]:
+        db.execute(insert(Task), chunk)
+        db.commit()
+        invalidate()
+        committed += len(chunk)
+        if on_batch is not None:
+            on_batch(committed)
+    return committed
@@ -0,0 +1,125 @@
+"""Column types with an optional compact on-disk encoding.
+
+By default tasks are stored the way SQLAlchemy stores them on SQLite:
+hex UUID strings, ISO timestamp text and enum names. Databases created in
+compact storage mode instead keep:
+- ids as 16-byte BLOBs
+- timestamps as integer microseconds since the Unix epoch (UTC)
+- status as a small integer code
+
+The mode belongs to the database file (see db.py), so the types ask the
+dialect of the engine they run on which encoding to use. Python code
+sees the same UUID, naive-UTC datetime and TaskStatus values either way.
+"""
+
+import weakref
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from typing import Optional, Type
+from uuid import UUID
+
+from sqlalchemy import DateTime, Integer, LargeBinary, String, Uuid
+from sqlalchemy.engine import Dialect
+from sqlalchemy.types import TypeDecorator
+
+STORAGE_MODES = ("text", "compact")
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+_compact_dialects: "weakref.WeakSet[Dialect]" = weakref.WeakSet()
+
+def use_compact_storage(dialect: Dialect) -> None:
+    """Switch an engine's dialect to the compact encoding.
+
+    Must happen before the engine runs its first statement, since
+    SQLAlchemy memoizes type processors per dialect.
+    """
+    _compact_dialects.add(dialect)
+
+def is_compact(dialect: Dialect) -> bool:
+    """Return whether a dialect uses the compact encoding."""
+    return dialect in _compact_dialects
+
+class CompactUUID(TypeDecorator):
+    """UUID stored as hex text, or as 16 raw bytes in compact mode."""
+    impl = Uuid
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if is_compact(dialect):
+            return dialect.type_descriptor(LargeBinary(16))
+        return dialect.type_descriptor(Uuid())
+
+    def process_bind_param(self, value, dialect):
+        if value is None or not is_compact(dialect):
+            return value
+        return value.bytes if isinstance(value, UUID) else UUID(value).bytes
+
+    def process_result_value(self, value, dialect):
+        if value is None or not is_compact(dialect):
+            return value
+        return UUID(bytes=bytes(value))
+
+class CompactDateTime(TypeDecorator):
+    """UTC timestamp stored as text, or as epoch microseconds in compact mode.
+
+    Naive values are taken as UTC and results are naive UTC, matching what
+    SQLite's text storage returns.
+    """
+    impl = DateTime
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if is_compact(dialect):
+            return dialect.type_descriptor(Integer())
+        return dialect.type_descriptor(DateTime(timezone=True))
+
+    def process_bind_param(self, value, dialect):
+        if value is None or not is_compact(dialect):
+            return value
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return (value - _EPOCH) // _MICROSECOND
+
+    def process_result_value(self, value, dialect):
+        if value is None or not is_compact(dialect):
+            return value
+        return _EPOCH + value * _MICROSECOND
+
+class CompactEnum(TypeDecorator):
+    """Enum stored by member name, or by its position in compact mode.
+
+    Members must only ever be appended, since positions are stored.
+    """
+    impl = String
+    cache_ok = True
+
+    def __init__(self, enum_class: Type[Enum]) -> None:
+        self.enum_class = enum_class
+        self._members = list(enum_class)
+        super().__init__(max(len(member.name) for member in enum_class))
+
+    def load_dialect_impl(self, dialect):
+        if is_compact(dialect):
+            return dialect.type_descriptor(Integer())
+        return dialect.type_descriptor(String(self.impl.length))
+
+    def process_bind_param(self, value, dialect) -> Optional[object]:
+        if value is None:
+            return None
+        member = self.enum_class(value)
+        if is_compact(dialect):
+            return self._members.index(member)
+        return member.name
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if is_compact(dialect):
+            return self._members[value]
+        return self.enum_class[value]
+
+    @property
+    def python_type(self):
+        return self.enum_class
@@ -0,0 +1,116 @@
+"""Unit tests for async task operations."""
+
+import asyncio
+from pathlib import Path
+from uuid import UUID
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from todo_core import aio
+from todo_core.models import TaskStatus
+from todo_core.operations import VersionConflictError, encode_cursor
+
+@pytest.fixture
+def run_async(engine, db_path: Path):
+    """Run a coroutine factory against an async session on the test database."""
+    def run(operation):
+        async def main():
+            async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+            try:
+                session_factory = async_sessionmaker(
+                    async_engine, expire_on_commit=False
+                )
+                async with session_factory() as db:
+                    return await operation(db)
+            finally:
+                await async_engine.dispose()
+        return asyncio.run(main())
+    return run
+
+def test_create_and_get_task(run_async):
+    """Test async creation and lookup."""
+    async def operation(db):
+        task = await aio.create_task(db, "Async task")
+        return task, await aio.get_task(db, task.id)
+
+    task, retrieved = run_async(operation)
+    assert isinstance(task.id, UUID)
+    assert retrieved.title == "Async task"
+    assert retrieved.status == TaskStatus.PENDING
+
+def test_list_tasks_paginated(run_async):
+    """Test async listing follows the same cursors as the sync API."""
+    async def operation(db):
+        await aio.create_tasks(db, (f"Async page {i}" for i in range(3)))
+        everything = await aio.list_tasks(db)
+        first = await aio.list_tasks(db, limit=1)
+        rest = await aio.list_tasks(db, cursor=encode_cursor(first[0]))
+        return everything, first + rest
+
+    everything, pages = run_async(operation)
+    assert [t.id for t in pages] == [t.id for t in everything]
+
+def test_update_and_delete_task(run_async):
+    """Test async update and delete, including missing tasks."""
+    async def operation(db):
+        task = await aio.create_task(db, "Async original")
+        updated = await aio.update_task(db, task.id, status=TaskStatus.COMPLETED)
+        # Writing nothing still checks the version
+        with pytest.raises(VersionConflictError):
+            await aio.update_task(db, task.id, expected_version=1)
+        assert (await aio.update_task(db, task.id, expected_version=2)).version == 2
+        await aio.delete_task(db, task.id)
+        return updated, await aio.get_task(db, task.id)
+
+    updated, deleted = run_async(operation)
+    assert updated.status == TaskStatus.COMPLETED
+    assert deleted is None
+
+    missing = UUID('00000000-0000-0000-0000-000000000000')
+    with pytest.raises(ValueError):
+        run_async(lambda db: aio.update_task(db, missing, title="New"))
+    with pytest.raises(ValueError):
+        run_async(lambda db: aio.delete_task(db, missing))
+
+def test_toggle_task_status(run_async):
+    """Test async atomic toggle."""
+    async def operation(db):
+        task = await aio.create_task(db, "Async toggle")
+        first = (await aio.toggle_task_status(db, task.id)).status
+        second = (await aio.toggle_task_status(db, task.id)).status
+        return first, second
+
+    assert run_async(operation) == (TaskStatus.COMPLETED, TaskStatus.PENDING)
+
+def test_concurrent_creates_get_distinct_numbers(engine, db_path: Path):
+    """Test concurrent sessions never hand out the same short number."""
+    async def main():
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        try:
+            factory = async_sessionmaker(async_engine, expire_on_commit=False)
+
+            async def create(i):
+                async with factory() as db:
+                    return await aio.create_task(db, f"Concurrent {i}")
+            return await asyncio.gather(*(create(i) for i in range(20)))
+        finally:
+            await async_engine.dispose()
+
+    tasks = asyncio.run(main())
+    assert len({task.number for task in tasks}) == 20
+
+def test_list_changes(run_async):
+    """Test async deltas and acknowledgements."""
+    async def operation(db):
+        task = await aio.create_task(db, "Async change")
+        snapshot = await aio.list_changes(db)
+        await aio.acknowledge_changes(db, "mirror", snapshot.seq)
+        await aio.delete_task(db, task.id)
+        return snapshot, await aio.list_changes(db, snapshot.seq)
+
+    snapshot, delta = run_async(operation)
+    assert snapshot.reset
+    task_id = snapshot.changes[-1][0]
+    assert delta.changes == [(task_id, None)]
+    assert delta.seq == snapshot.seq + 1
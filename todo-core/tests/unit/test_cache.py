@@ -0,0 +1,166 @@
+"""Unit tests for the task listing cache."""
+
+import asyncio
+import sqlite3
+import subprocess
+import sys
+
+from todo_core.cache import DataVersion, TaskListCache, generation, invalidate, watch
+from todo_core.operations import create_task
+
+def counting_loader(calls: list, value="page"):
+    """Build a loader that records how often it runs."""
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return value
+    return load
+
+def test_cache_hit_until_invalidated():
+    """Test that a page is reused until a write bumps the generation."""
+    cache = TaskListCache()
+    calls = []
+
+    async def main():
+        await cache.get_or_load("key", counting_loader(calls))
+        await cache.get_or_load("key", counting_loader(calls))
+        invalidate()
+        await cache.get_or_load("key", counting_loader(calls))
+
+    asyncio.run(main())
+    assert len(calls) == 2
+    assert cache.hits == 1
+
+def test_mutations_invalidate(db_session):
+    """Test that operations bump the generation on every write."""
+    before = generation()
+    create_task(db_session, "Invalidates")
+    assert generation() > before
+
+def test_single_flight():
+    """Test that concurrent misses share one load."""
+    cache = TaskListCache()
+    calls = []
+
+    async def main():
+        load = counting_loader(calls)
+        return await asyncio.gather(*(cache.get_or_load("key", load) for _ in range(10)))
+
+    assert asyncio.run(main()) == ["page"] * 10
+    assert len(calls) == 1
+
+def test_single_flight_shares_errors():
+    """Test that waiters see the loader's error and nothing is cached."""
+    cache = TaskListCache()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def main():
+        return await asyncio.gather(
+            *(cache.get_or_load("key", fail) for _ in range(3)),
+            return_exceptions=True
+        )
+
+    assert all(isinstance(r, ValueError) for r in asyncio.run(main()))
+    assert cache.misses == 1
+
+def test_cancelled_caller_leaves_load_to_waiters():
+    """Test that cancelling the caller that started a load doesn't cancel it."""
+    cache = TaskListCache()
+    calls = []
+
+    async def main():
+        load = counting_loader(calls)
+        leader = asyncio.create_task(cache.get_or_load("key", load))
+        waiter = asyncio.create_task(cache.get_or_load("key", load))
+        await asyncio.sleep(0)
+        leader.cancel()
+        result = await waiter
+        assert leader.cancelled()
+        return result, await cache.get_or_load("key", load)
+
+    assert asyncio.run(main()) == ("page", "page")
+    assert len(calls) == 1
+
+def test_cancelled_load_is_retried():
+    """Test that waiters load again when the shared load itself is cancelled."""
+    cache = TaskListCache()
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        if len(calls) == 1:
+            asyncio.current_task().cancel()
+            await asyncio.sleep(0)
+        return "page"
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_load("key", load) for _ in range(3)))
+
+    assert asyncio.run(main()) == ["page"] * 3
+    assert len(calls) == 2
+
+def test_lru_eviction():
+    """Test that the least recently used page is evicted."""
+    cache = TaskListCache(maxsize=2)
+    calls = []
+
+    async def main():
+        for key in ["a", "b", "a", "c", "a", "b"]:
+            await cache.get_or_load(key, counting_loader(calls, key))
+
+    asyncio.run(main())
+    # a, b, c miss; "b" was evicted by "c" and misses again
+    assert len(calls) == 4
+
+def write_from_other_process(path) -> None:
+    """Commit a row to the database file from a separate process."""
+    subprocess.run([
+        sys.executable, "-c",
+        "import sqlite3, sys; c = sqlite3.connect(sys.argv[1]); "
+        "c.execute('INSERT INTO t VALUES (1)'); c.commit()",
+        str(path)
+    ], check=True)
+
+def test_data_version_sees_other_processes(tmp_path):
+    """Test that commits by another process are detected, reads are not."""
+    path = tmp_path / "watched.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("CREATE TABLE t (x)")
+    detector = DataVersion(str(path))
+    assert not detector.changed()
+
+    write_from_other_process(path)
+    assert detector.changed()
+    assert not detector.changed()
+    detector.close()
+
+def test_data_version_until_file_exists(tmp_path):
+    """Test the file-time fallback before the database is created."""
+    path = tmp_path / "later.db"
+    detector = DataVersion(str(path))
+    assert not detector.changed()
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE t (x)")
+    assert detector.changed()
+    write_from_other_process(path)
+    assert detector.changed()
+    detector.close()
+
+def test_watch_invalidates_on_external_writes(tmp_path):
+    """Test that the generation moves when another process writes."""
+    path = tmp_path / "shared.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE t (x)")
+    watch(str(path))
+    try:
+        before = generation()
+        assert generation() == before
+        write_from_other_process(path)
+        assert generation() == before + 1
+    finally:
+        watch(None)
@@ -6,6 +6,8 @@ These tests MUST fail initially (RED phase)
 
 from click.testing import CliRunner
 import json
+import subprocess
+import sys
 import pytest
 from uuid import UUID
 
@@ -149,4 +151,138 @@ def test_output_format_table(runner, db_session):
     assert "ID" in result.output
     assert "Title" in result.output
     assert "Status" in result.output
-    assert "─" in result.output  # Table border
\ No newline at end of file
+    assert "─" in result.output  # Table border
+
+def test_import_tasks_jsonl(runner, db_session):
+    """Test streaming JSONL import from stdin."""
+    lines = "\n".join(
+        json.dumps({"title": f"Imported {i}"}) for i in range(3)
+    )
+    result = runner.invoke(cli, ["import", "--batch-size", "2"], input=lines)
+    assert result.exit_code == 0
+
+    summary = json.loads(result.stdout)
+    assert summary["imported"] == 3
+    assert "rows_per_sec" in summary
+
+def test_import_tasks_resume(runner, db_session):
+    """Test that a failed import reports where to resume."""
+    lines = 'title\nFirst\n""\nThird\n'
+    result = runner.invoke(
+        cli, ["import", "--input-format", "csv", "--batch-size", "1"],
+        input=lines
+    )
+    assert result.exit_code == 1
+    assert "Resume with --skip 1" in result.output
+
+    result = runner.invoke(
+        cli, ["import", "--input-format", "csv", "--skip", "2"], input=lines
+    )
+    assert result.exit_code == 0
+    assert json.loads(result.stdout)["imported"] == 1
+
+def test_list_tasks_paginated(runner, db_session):
+    """Test listing tasks one page at a time."""
+    for i in range(3):
+        runner.invoke(cli, ["create", f"Page task {i}"])
+
+    result = runner.invoke(cli, ["list", "--limit", "2"])
+    assert result.exit_code == 0
+    assert len(json.loads(result.stdout)) == 2
+    assert "Next page: --after " in result.stderr
+
+    cursor = result.stderr.split("--after ")[1].strip()
+    result = runner.invoke(cli, ["list", "--after", cursor])
+    assert result.exit_code == 0
+    assert len(json.loads(result.stdout)) >= 1
+
+def test_list_tasks_ndjson(runner, db_session):
+    """Test streaming one JSON object per line."""
+    runner.invoke(cli, ["create", "Streamed 1"])
+    runner.invoke(cli, ["create", "Streamed 2"])
+
+    result = runner.invoke(cli, ["list", "--format", "ndjson"])
+    assert result.exit_code == 0
+
+    lines = result.stdout.splitlines()
+    tasks = [json.loads(line) for line in lines]
+    assert len(tasks) >= 2
+    assert tasks[-1]["title"] == "Streamed 2"
+
+def test_list_tasks_ndjson_paginated(runner, tmp_path):
+    """Test that streaming only hints at a next page when one exists."""
+    db = ["--db", str(tmp_path / "stream.db")]
+    for i in range(3):
+        runner.invoke(cli, [*db, "create", f"Streamed {i}"])
+
+    result = runner.invoke(cli, [*db, "list", "--format", "ndjson", "--limit", "2"])
+    assert result.exit_code == 0
+    assert len(result.stdout.splitlines()) == 2
+    assert "Next page: --after " in result.stderr
+
+    cursor = result.stderr.split("--after ")[1].strip()
+    result = runner.invoke(
+        cli, [*db, "list", "--format", "ndjson", "--limit", "1", "--after", cursor]
+    )
+    assert result.exit_code == 0
+    assert json.loads(result.stdout)["title"] == "Streamed 2"
+    assert "Next page" not in result.stderr
+
+def test_cli_import_is_lightweight():
+    """Test that importing the CLI defers SQLAlchemy and rich."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import todo_core.cli"],
+        capture_output=True, text=True, check=True
+    )
+    imported = {line.split("|")[-1].strip() for line in result.stderr.splitlines()}
+    assert "todo_core.cli" in imported
+    assert not any(m.startswith(("sqlalchemy", "rich")) for m in imported)
+
+def test_search_and_rebuild(runner, tmp_path):
+    """Test searching titles and rebuilding the index from the CLI."""
+    db = ["--db", str(tmp_path / "search.db")]
+    runner.invoke(cli, [*db, "create", "Buy oat milk"])
+    runner.invoke(cli, [*db, "create", "Buy bread"])
+
+    result = runner.invoke(cli, [*db, "search", "oat", "mi"])
+    assert result.exit_code == 0
+    assert [task["title"] for task in json.loads(result.output)] == ["Buy oat milk"]
+
+    result = runner.invoke(cli, [*db, "rebuild-search-index"])
+    assert result.exit_code == 0
+    result = runner.invoke(cli, [*db, "search", "buy"])
+    assert len(json.loads(result.output)) == 2
+
+def test_check_counts(runner, tmp_path):
+    """Test the counter consistency check."""
+    result = runner.invoke(cli, ["--db", str(tmp_path / "counts.db"), "check-counts"])
+    assert result.exit_code == 0
+    assert json.loads(result.output) == {}
+
+def test_seed_is_deterministic(runner, tmp_path):
+    """Test that the same seed produces the same tasks."""
+    listings = []
+    for name in ("a.db", "b.db"):
+        db = ["--db", str(tmp_path / name)]
+        result = runner.invoke(cli, [*db, "seed", "--count", "50", "--seed", "7"])
+        assert json.loads(result.output)["seeded"] == 50
+
+        result = runner.invoke(cli, [*db, "list"])
+        listings.append([(t["title"], t["status"]) for t in json.loads(result.output)])
+
+    assert listings[0] == listings[1]
+    assert {status for _, status in listings[0]} == {"PENDING", "COMPLETED"}
+
+def test_stats_option(runner, tmp_path):
+    """Test --stats keeps stdout clean and reports to stderr."""
+    from todo_core import metrics
+
+    db = ["--db", str(tmp_path / "metrics.db")]
+    try:
+        result = runner.invoke(cli, [*db, "--stats", "create", "Measured"])
+    finally:
+        metrics.disable()
+        metrics.reset()
+    assert result.exit_code == 0
+    assert json.loads(result.stdout)["title"] == "Measured"
+    assert json.loads(result.stderr)["create_task"]["commits"] == 1
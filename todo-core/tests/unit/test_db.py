@@ -0,0 +1,216 @@
+"""Unit tests for engine profiles and lazy schema setup."""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import Session
+
+from todo_core.db import (
+    PROFILES, convert_storage, database_path, ensure_schema, get_engine,
+    make_engine
+)
+from todo_core.models import SCHEMA_VERSION, Task, TaskStatus
+from todo_core.operations import (
+    acknowledge_changes, count_tasks, create_tasks, encode_cursor, get_task,
+    list_changes, list_tasks, toggle_task_status
+)
+from todo_core.storage import is_compact
+
+def user_version(engine) -> int:
+    """Read the schema version stored in the database header."""
+    with engine.connect() as conn:
+        return conn.exec_driver_sql("PRAGMA user_version").scalar()
+
+def test_database_path_precedence(monkeypatch):
+    """Test explicit path, then TODO_DB, then the default."""
+    monkeypatch.delenv("TODO_DB", raising=False)
+    assert database_path() == "todo.db"
+
+    monkeypatch.setenv("TODO_DB", "/tmp/env.db")
+    assert database_path() == "/tmp/env.db"
+    assert database_path("/tmp/explicit.db") == "/tmp/explicit.db"
+
+@pytest.mark.parametrize("profile", PROFILES)
+def test_make_engine_applies_profile(tmp_path, profile):
+    """Test that every connection gets the profile's pragmas."""
+    engine = make_engine(profile, str(tmp_path / f"{profile}.db"))
+    expected = PROFILES[profile]
+
+    with engine.connect() as conn:
+        pragma = lambda name: conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+        assert pragma("journal_mode").upper() == expected["journal_mode"]
+        assert pragma("busy_timeout") == expected["busy_timeout"]
+        assert pragma("cache_size") == expected["cache_size"]
+
+def test_make_engine_rejects_unknown_profile(tmp_path):
+    """Test that a typo in the profile name fails loudly."""
+    with pytest.raises(ValueError):
+        make_engine("turbo", str(tmp_path / "turbo.db"))
+
+def test_get_engine_is_shared_and_ready(tmp_path):
+    """Test that the shared engine is reused and has its schema."""
+    path = str(tmp_path / "shared.db")
+    engine = get_engine(path)
+
+    assert get_engine(path) is engine
+    assert "tasks" in inspect(engine).get_table_names()
+    assert user_version(engine) == SCHEMA_VERSION
+
+def test_ensure_schema_upgrades_missing_indexes(tmp_path):
+    """Test that tables created before an index was declared gain it."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        Task.__table__.create(conn)
+        for index in Task.__table__.indexes:
+            index.drop(conn)
+
+    with engine.begin() as conn:
+        ensure_schema(conn)
+
+    names = {index["name"] for index in inspect(engine).get_indexes("tasks")}
+    assert names == {index.name for index in Task.__table__.indexes}
+
+def test_ensure_schema_skips_current_version(tmp_path):
+    """Test that no DDL runs when the stored version matches."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'current.db'}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    with engine.begin() as conn:
+        ensure_schema(conn)
+
+    assert inspect(engine).get_table_names() == []
+
+def test_ensure_schema_adds_missing_columns(tmp_path):
+    """Test that databases from before the version column are upgraded."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'v1.db'}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE tasks (id CHAR(32) PRIMARY KEY, title VARCHAR(200) NOT NULL, "
+            "status VARCHAR(9) NOT NULL, created_at DATETIME NOT NULL, "
+            "updated_at DATETIME NOT NULL)"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO tasks VALUES ('00000000000000000000000000000001', 'Old', "
+            "'PENDING', '2024-01-01 00:00:00', '2024-01-01 00:00:00')"
+        )
+        conn.exec_driver_sql("PRAGMA user_version = 1")
+
+    with engine.begin() as conn:
+        ensure_schema(conn)
+
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("SELECT version FROM tasks").scalar() == 1
+
+def open_engine(path, storage=None):
+    """Open an engine on a database file and make sure it has its schema."""
+    engine = make_engine("cli", str(path), storage=storage)
+    with engine.begin() as conn:
+        ensure_schema(conn)
+    return engine
+
+def column_types(engine) -> tuple:
+    """Return SQLite's storage classes of the first task's encoded columns."""
+    with engine.connect() as conn:
+        return tuple(conn.exec_driver_sql(
+            "SELECT typeof(id), typeof(status), typeof(created_at) FROM tasks"
+        ).first())
+
+def test_compact_storage_round_trip(tmp_path):
+    """Test that compact databases store binary values behind the same API."""
+    engine = open_engine(tmp_path / "compact.db", storage="compact")
+    with Session(engine) as db:
+        create_tasks(db, [f"Task {i}" for i in range(5)])
+        first, *rest = list_tasks(db)
+        toggled = toggle_task_status(db, first.id)
+
+        assert isinstance(first.id, type(toggled.id))
+        assert isinstance(first.created_at, datetime)
+        assert toggled.status == TaskStatus.COMPLETED
+        assert get_task(db, first.id).title == "Task 0"
+        assert list_tasks(db, status=TaskStatus.COMPLETED) == [first]
+        assert list_tasks(db, cursor=encode_cursor(rest[1])) == rest[2:]
+        assert count_tasks(db, TaskStatus.COMPLETED) == 1
+
+    assert column_types(engine) == ("blob", "integer", "integer")
+
+def test_storage_mode_follows_the_file(tmp_path, monkeypatch):
+    """Test that a database keeps its mode whatever new ones would use."""
+    open_engine(tmp_path / "compact.db", storage="compact").dispose()
+    open_engine(tmp_path / "text.db").dispose()
+
+    monkeypatch.setenv("TODO_STORAGE", "compact")
+    assert not is_compact(open_engine(tmp_path / "text.db").dialect)
+    monkeypatch.setenv("TODO_STORAGE", "text")
+    assert is_compact(open_engine(tmp_path / "compact.db").dialect)
+
+def test_make_engine_rejects_unknown_storage(tmp_path):
+    """Test that a typo in the storage mode fails loudly."""
+    with pytest.raises(ValueError):
+        make_engine("cli", str(tmp_path / "tiny.db"), storage="tiny")
+
+def test_convert_storage_keeps_tasks(tmp_path):
+    """Test converting a text database to compact and back."""
+    path = tmp_path / "convert.db"
+    engine = open_engine(path)
+    with Session(engine) as db:
+        create_tasks(db, ["One", "Two", "Three"])
+        before = [(t.id, t.title, t.status, t.created_at) for t in list_tasks(db)]
+    engine.dispose()
+
+    for storage, types in (("compact", "blob"), ("text", "text")):
+        assert convert_storage(str(path), storage) == 3
+        engine = open_engine(path)
+        with Session(engine) as db:
+            after = [(t.id, t.title, t.status, t.created_at) for t in list_tasks(db)]
+        assert after == before
+        assert column_types(engine)[0] == types
+        engine.dispose()
+
+def test_convert_storage_keeps_change_log(tmp_path):
+    """Test that consumers continue from the same place after a conversion."""
+    path = tmp_path / "changes.db"
+    engine = open_engine(path)
+    with Session(engine) as db:
+        create_tasks(db, ["One", "Two"])
+        seq = list_changes(db).seq
+        acknowledge_changes(db, "mirror", seq)
+        create_tasks(db, ["Three"])
+    engine.dispose()
+
+    convert_storage(str(path), "compact")
+    engine = open_engine(path)
+    with Session(engine) as db:
+        delta = list_changes(db, seq)
+        assert [task.title for _, task in delta.changes] == ["Three"]
+        create_tasks(db, ["Four"])
+        assert list_changes(db, delta.seq).seq == delta.seq + 1
+    engine.dispose()
+
+def test_ensure_schema_numbers_existing_tasks(tmp_path):
+    """Test that tasks from before short numbers get them in creation order."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'v2.db'}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE tasks (id CHAR(32) PRIMARY KEY, title VARCHAR(200) NOT NULL, "
+            "status VARCHAR(9) NOT NULL, created_at DATETIME NOT NULL, "
+            "updated_at DATETIME NOT NULL, version INTEGER DEFAULT 1 NOT NULL)"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO tasks VALUES "
+            "('00000000000000000000000000000002', 'Newer', 'PENDING', "
+            "'2024-01-02 00:00:00', '2024-01-02 00:00:00', 1), "
+            "('00000000000000000000000000000001', 'Older', 'PENDING', "
+            "'2024-01-01 00:00:00', '2024-01-01 00:00:00', 1)"
+        )
+        conn.exec_driver_sql("PRAGMA user_version = 2")
+
+    with engine.begin() as conn:
+        ensure_schema(conn)
+
+    with Session(engine) as db:
+        assert [(t.number, t.title) for t in list_tasks(db)] == [(1, "Older"), (2, "Newer")]
+        assert create_tasks(db, ["Newest"]) == 1
+        assert list_tasks(db)[-1].number == 3
+        assert count_tasks(db, TaskStatus.PENDING) == 3
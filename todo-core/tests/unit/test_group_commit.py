@@ -0,0 +1,150 @@
+"""Unit tests for the group-commit writer."""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event, func, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from todo_core.group_commit import GroupCommitWriter
+from todo_core.models import Task, TaskStatus
+from todo_core.operations import VersionConflictError
+
+@pytest.fixture
+def run_writer(engine, db_path: Path):
+    """Run a coroutine factory against a started writer on the test database."""
+    def run(operation, **options):
+        async def main():
+            async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+            commits = []
+            event.listen(async_engine.sync_engine, "commit",
+                         lambda conn: commits.append(1))
+            # Like the server profile, which the writer has to override
+            event.listen(
+                async_engine.sync_engine, "connect",
+                lambda conn, record: conn.execute("PRAGMA synchronous = NORMAL")
+            )
+            writer = GroupCommitWriter(async_sessionmaker(async_engine), **options)
+            writer.start()
+            try:
+                return await operation(writer), len(commits)
+            finally:
+                await writer.close()
+                await async_engine.dispose()
+        return asyncio.run(main())
+    return run
+
+def test_concurrent_creates_share_a_commit(run_writer, db_session):
+    """Test concurrent mutations are committed together."""
+    before = db_session.scalar(select(func.count()).select_from(Task))
+
+    async def operation(writer):
+        return await asyncio.gather(
+            *(writer.create_task(f"Grouped {i}") for i in range(20))
+        )
+
+    tasks, commits = run_writer(operation, max_batch=64, max_delay=0.05)
+    assert [task.title for task in tasks] == [f"Grouped {i}" for i in range(20)]
+    assert len({task.number for task in tasks}) == 20
+    assert commits == 1
+    assert db_session.scalar(select(func.count()).select_from(Task)) == before + 20
+
+def test_max_batch(run_writer):
+    """Test batches are split at max_batch mutations."""
+    async def operation(writer):
+        await asyncio.gather(*(writer.create_task("Split") for _ in range(10)))
+        return writer.batches
+
+    batches, commits = run_writer(operation, max_batch=4, max_delay=0.05)
+    assert batches == 3
+    assert commits == 3
+
+def test_errors_are_per_mutation(run_writer, db_session):
+    """Test a failing mutation doesn't affect the rest of its batch."""
+    async def operation(writer):
+        task = await writer.create_task("Target")
+        return task, await asyncio.gather(
+            writer.toggle_task_status(task.id),
+            writer.toggle_task_status(task.id, expected_version=task.version),
+            writer.create_task(""),
+            writer.delete_task(task.id),
+            writer.delete_task(task.id),
+            return_exceptions=True
+        )
+
+    (task, results), _ = run_writer(operation, max_delay=0.05)
+    toggled, conflict, invalid, deleted, missing = results
+    assert toggled.status == TaskStatus.COMPLETED
+    assert isinstance(conflict, VersionConflictError)
+    assert isinstance(invalid, ValueError)
+    assert deleted is None
+    assert isinstance(missing, ValueError) and "not found" in str(missing)
+    assert db_session.get(Task, task.id) is None
+
+def test_database_error_retries_the_others(run_writer):
+    """Test an unexpected error fails only its own mutation."""
+    async def broken(db):
+        raise RuntimeError("boom")
+
+    async def operation(writer):
+        return await asyncio.gather(
+            writer.create_task("Before"),
+            writer.submit(broken),
+            writer.create_task("After"),
+            return_exceptions=True
+        )
+
+    (before, error, after), commits = run_writer(operation, max_delay=0.05)
+    assert before.title == "Before" and after.title == "After"
+    assert isinstance(error, RuntimeError)
+    assert commits == 1
+
+def test_batches_commit_with_full_sync(run_writer):
+    """Test that a batch only resolves after a fully synced commit."""
+    async def synchronous(db):
+        return (await db.execute(text("PRAGMA synchronous"))).scalar()
+
+    async def operation(writer):
+        return await writer.submit(synchronous)
+
+    level, _ = run_writer(operation)
+    assert level == 2  # FULL
+
+def test_writer_recovers_from_failures(engine, db_path: Path):
+    """Test that an error outside the batch transaction fails only that batch."""
+    async def main():
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        factory = async_sessionmaker(async_engine)
+        opened = []
+
+        def flaky_factory(**options):
+            opened.append(1)
+            if len(opened) == 1:
+                raise RuntimeError("No session")
+            return factory(**options)
+
+        writer = GroupCommitWriter(flaky_factory, max_delay=0.05)
+        writer.start()
+        try:
+            failed = await asyncio.wait_for(asyncio.gather(
+                writer.create_task("Lost"), writer.create_task("Lost too"),
+                return_exceptions=True
+            ), 5)
+            task = await asyncio.wait_for(writer.create_task("Restarted"), 5)
+            return failed, task
+        finally:
+            await writer.close()
+            await async_engine.dispose()
+
+    failed, task = asyncio.run(main())
+    assert [str(error) for error in failed] == ["No session"] * 2
+    assert task.title == "Restarted"
+
+def test_submit_requires_start():
+    """Test mutations are rejected before the writer is started."""
+    async def main():
+        writer = GroupCommitWriter(async_sessionmaker())
+        with pytest.raises(RuntimeError):
+            await writer.create_task("Never")
+    asyncio.run(main())
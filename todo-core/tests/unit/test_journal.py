@@ -0,0 +1,98 @@
+"""Unit tests for the quick-capture journal and merging it."""
+
+import os
+import shutil
+import subprocess
+import sys
+import threading
+from uuid import UUID
+
+import pytest
+
+from todo_core.journal import MERGING_SUFFIX, capture, journal_path
+from todo_core.models import Task, TaskStatus
+from todo_core.operations import count_tasks, get_task, merge_journal
+
+def test_capture_imports_no_sqlalchemy():
+    """Test that capturing a task doesn't load SQLAlchemy."""
+    result = subprocess.run(
+        [sys.executable, "-c",
+         "import sys, todo_core.journal; print('sqlalchemy' in sys.modules)"],
+        capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "False"
+
+def test_capture_validates_title(tmp_path):
+    """Test that invalid titles are refused before anything is written."""
+    path = journal_path(str(tmp_path / "todo.db"))
+    with pytest.raises(ValueError, match="required"):
+        capture(path, "")
+    with pytest.raises(ValueError, match="200"):
+        capture(path, "x" * 201)
+    assert not os.path.exists(path)
+
+def test_merge_journal(db_session, tmp_path):
+    """Test that captured tasks are inserted with their capture id and time."""
+    path = journal_path(str(tmp_path / "todo.db"))
+    assert merge_journal(db_session, path) == 0
+
+    pending = count_tasks(db_session, TaskStatus.PENDING)
+    entries = [capture(path, f"Captured {i}") for i in range(3)]
+    assert merge_journal(db_session, path) == 3
+    assert not os.path.exists(path)
+    assert count_tasks(db_session, TaskStatus.PENDING) == pending + 3
+
+    task = get_task(db_session, UUID(entries[0]["id"]))
+    assert task.title == "Captured 0"
+    assert task.status == TaskStatus.PENDING
+    assert task.number is not None
+    assert task.created_at.isoformat() == entries[0]["created_at"][:-len("+00:00")]
+
+def test_merge_journal_is_idempotent(db_session, tmp_path):
+    """Test that a journal left by an interrupted merge isn't inserted twice."""
+    path = journal_path(str(tmp_path / "todo.db"))
+    first = capture(path, "Merged before the crash")
+    shutil.copy(path, tmp_path / "copy")
+    assert merge_journal(db_session, path) == 1
+
+    # Crash after the commit, before the journal was removed
+    shutil.copy(tmp_path / "copy", path + MERGING_SUFFIX)
+    later = capture(path, "Captured after the crash")
+    with open(path, "a") as journal:
+        journal.write('{"id": "not json\n{"id": "cut short')
+
+    assert merge_journal(db_session, path) == 1
+    assert not os.path.exists(path)
+    assert not os.path.exists(path + MERGING_SUFFIX)
+    titles = db_session.query(Task.title).filter(
+        Task.id.in_([UUID(first["id"]), UUID(later["id"])])
+    ).all()
+    assert sorted(title for title, in titles) == [
+        "Captured after the crash", "Merged before the crash"
+    ]
+
+def test_merge_while_capturing(db_session, tmp_path):
+    """Test that tasks captured during merges are all merged once."""
+    path = journal_path(str(tmp_path / "todo.db"))
+    ids = []
+
+    def capture_many(prefix):
+        for i in range(200):
+            ids.append(capture(path, f"{prefix} {i}")["id"])
+
+    threads = [threading.Thread(target=capture_many, args=(f"Writer {n}",))
+               for n in range(3)]
+    for thread in threads:
+        thread.start()
+    merged = 0
+    while any(thread.is_alive() for thread in threads):
+        merged += merge_journal(db_session, path)
+    for thread in threads:
+        thread.join()
+    merged += merge_journal(db_session, path)
+
+    assert merged == 600
+    found = db_session.query(Task.id).filter(
+        Task.id.in_([UUID(task_id) for task_id in ids])
+    ).count()
+    assert found == 600
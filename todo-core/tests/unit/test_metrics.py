@@ -0,0 +1,122 @@
+"""Unit tests for per-operation database metrics."""
+
+import asyncio
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from todo_core import aio, metrics
+from todo_core.operations import create_task, list_tasks, update_task
+
+@pytest.fixture
+def recording():
+    """Enable metrics for one test, starting from an empty registry."""
+    metrics.reset()
+    metrics.enable()
+    try:
+        yield
+    finally:
+        metrics.disable()
+        metrics.reset()
+
+def test_disabled_by_default():
+    """Test that nothing is attached or recorded unless enabled."""
+    assert not metrics.enabled()
+    assert metrics.summary() == {}
+
+def test_operations_are_tagged(recording, db_session):
+    """Test statements, rows and commits recorded per calling operation."""
+    task = create_task(db_session, "Measured")
+    update_task(db_session, task.id, title="Measured again")
+    list_tasks(db_session, limit=10)
+    db_session.execute(text("SELECT 1"))
+
+    summary = metrics.summary()
+    assert summary["create_task"]["statements"] >= 1
+    assert summary["create_task"]["commits"] == 1
+    assert summary["create_task"]["rows_changed"] == 1
+    # get_task inside update_task is attributed to the outer operation
+    assert "get_task" not in summary
+    assert summary["update_task"]["commits"] == 1
+    assert summary["list_tasks"]["rows_returned"] >= 1
+    assert summary["list_tasks"]["commits"] == 0
+    assert summary["other"]["statements"] >= 1
+
+def test_async_operations_are_tagged(recording, engine, db_path: Path):
+    """Test that aio operations are tagged across the greenlet boundary."""
+    async def main():
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        try:
+            factory = async_sessionmaker(async_engine, expire_on_commit=False)
+            async with factory() as db:
+                await aio.create_task(db, "Async measured")
+                await aio.list_tasks(db, limit=5)
+        finally:
+            await async_engine.dispose()
+    asyncio.run(main())
+
+    summary = metrics.summary()
+    assert summary["create_task"]["commits"] == 1
+    assert summary["list_tasks"]["rows_returned"] >= 1
+
+def test_concurrent_async_rows(recording, engine, db_path: Path):
+    """Test that rows are credited to the operation that loaded them."""
+    async def main():
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        try:
+            factory = async_sessionmaker(async_engine, expire_on_commit=False)
+            async with factory() as db:
+                await aio.create_tasks(db, (f"Row {i}" for i in range(20)))
+
+            async def run(operation, *args):
+                async with factory() as db:
+                    return await operation(db, *args)
+
+            loaded = 0
+            for _ in range(10):
+                tasks, *_ = await asyncio.gather(
+                    run(aio.list_tasks), run(aio.count_tasks),
+                    run(aio.get_task, uuid4()), run(aio.count_tasks)
+                )
+                loaded += len(tasks)
+            return loaded
+        finally:
+            await async_engine.dispose()
+    loaded = asyncio.run(main())
+
+    summary = metrics.summary()
+    assert summary["list_tasks"]["rows_returned"] == loaded
+    assert summary["count_tasks"]["rows_returned"] == 0
+    assert summary["get_task"]["rows_returned"] == 0
+
+def test_failed_statements_leave_no_state(recording, db_session):
+    """Test that statements that raise keep nothing on the connection."""
+    for _ in range(3):
+        with pytest.raises(OperationalError):
+            db_session.execute(text("SELECT * FROM missing_table"))
+        db_session.rollback()
+    connection = db_session.connection()
+    db_session.execute(text("SELECT 1"))
+    assert not [key for key in connection.info if key.startswith("metrics")]
+    assert metrics.summary()["other"]["statements"] >= 1
+
+def test_disable_stops_recording(recording, db_session):
+    """Test that disabled listeners record nothing further."""
+    metrics.disable()
+    list_tasks(db_session)
+    assert metrics.summary() == {}
+
+def test_render_prometheus(recording, db_session):
+    """Test the Prometheus text exposition."""
+    list_tasks(db_session)
+
+    body = metrics.render_prometheus()
+    assert "# TYPE todo_db_statement_seconds histogram" in body
+    assert 'todo_db_statement_seconds_bucket{operation="list_tasks",le="+Inf"} 1' in body
+    assert 'todo_db_statement_seconds_count{operation="list_tasks"} 1' in body
+    assert "# TYPE todo_db_rows_returned_total counter" in body
+    assert body.endswith("\n")
@@ -6,9 +6,9 @@ These tests MUST fail initially (RED phase)
 
 import pytest
 from datetime import datetime, timezone
-from uuid import UUID
+from uuid import UUID, uuid4
 
-from todo_core.models import Task, TaskStatus
+from todo_core.models import Task, TaskStatus, uuid7
 
 def test_task_creation(db_session):
     """Test that a task can be created with required fields."""
@@ -73,4 +73,25 @@ def test_task_status_transition(db_session):
     assert task.status == TaskStatus.COMPLETED
 
     task.status = TaskStatus.PENDING
-    assert task.status == TaskStatus.PENDING
\ No newline at end of file
+    assert task.status == TaskStatus.PENDING
+
+def test_uuid7_is_time_ordered():
+    """Test that generated ids are version 7 and strictly increasing."""
+    ids = [uuid7() for _ in range(10_000)]
+
+    assert all(task_id.version == 7 for task_id in ids)
+    assert ids == sorted(set(ids))
+
+def test_task_ids_sort_by_creation(db_session):
+    """Test that new tasks get time-ordered ids next to uuid4 rows."""
+    legacy = Task(title="Legacy")
+    legacy.id = uuid4()
+    first, second = Task(title="First"), Task(title="Second")
+    db_session.add_all([legacy, first])
+    db_session.flush()
+    db_session.add(second)
+    db_session.commit()
+
+    assert first.id.version == 7
+    assert first.id < second.id
+    assert db_session.get(Task, legacy.id) is legacy
@@ -4,12 +4,22 @@ Following Constitutional requirement: Test-First Development
 These tests MUST fail initially (RED phase)
 """
 
+import sqlite3
+
 import pytest
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from uuid import UUID
 
+from sqlalchemy import event, text
+
 from todo_core.models import Task, TaskStatus
-from todo_core.operations import create_task, get_task, list_tasks, update_task, delete_task
+from todo_core.operations import (
+    BulkCreateError, VersionConflictError, acknowledge_changes,
+    check_task_counts, compact_changes, count_tasks, create_task, create_tasks,
+    delete_numbered_tasks, encode_cursor, get_task, iter_tasks, list_changes,
+    list_tasks, rebuild_search_index, search_tasks, toggle_task_status,
+    update_numbered_tasks, update_task, delete_task
+)
 
 def test_create_task(db_session):
     """Test task creation operation."""
@@ -106,4 +116,296 @@ def test_delete_task(db_session):
 def test_delete_nonexistent_task(db_session):
     """Test that deleting a nonexistent task raises an error."""
     with pytest.raises(ValueError):
-        delete_task(db_session, UUID('00000000-0000-0000-0000-000000000000'))
\ No newline at end of file
+        delete_task(db_session, UUID('00000000-0000-0000-0000-000000000000'))
+
+def test_create_tasks_in_batches(db_session):
+    """Test bulk creation commits one chunk at a time."""
+    before = db_session.query(Task).count()
+    progress = []
+
+    created = create_tasks(
+        db_session,
+        (f"Bulk {i}" for i in range(5)),
+        batch_size=2,
+        on_batch=progress.append
+    )
+
+    assert created == 5
+    assert progress == [2, 4, 5]
+    assert db_session.query(Task).count() == before + 5
+    task = db_session.query(Task).filter_by(title="Bulk 4").one()
+    assert isinstance(task.id, UUID)
+    assert task.status == TaskStatus.PENDING
+
+def test_create_tasks_failed_chunk(db_session):
+    """Test that a failing chunk is rolled back and reports progress."""
+    before = db_session.query(Task).count()
+
+    with pytest.raises(BulkCreateError) as exc_info:
+        create_tasks(db_session, ["Ok 1", "Ok 2", "Ok 3", ""], batch_size=2)
+
+    assert exc_info.value.committed == 2
+    assert db_session.query(Task).count() == before + 2
+
+def test_list_tasks_keyset_pagination(db_session):
+    """Test walking all tasks page by page with cursors."""
+    create_tasks(db_session, (f"Paged {i}" for i in range(5)))
+    expected = [t.id for t in list_tasks(db_session)]
+
+    seen = []
+    cursor = None
+    while page := list_tasks(db_session, cursor=cursor, limit=2):
+        seen.extend(t.id for t in page)
+        cursor = encode_cursor(page[-1])
+
+    assert seen == expected
+
+def test_list_tasks_invalid_cursor(db_session):
+    """Test that a malformed cursor raises an error."""
+    with pytest.raises(ValueError):
+        list_tasks(db_session, cursor="not-a-cursor")
+
+def test_iter_tasks_streams_in_order(db_session):
+    """Test that streaming yields the same tasks as listing."""
+    create_tasks(db_session, (f"Stream {i}" for i in range(5)))
+
+    streamed = iter_tasks(db_session, batch_size=2)
+    assert not isinstance(streamed, list)
+    assert [t.id for t in streamed] == [t.id for t in list_tasks(db_session)]
+
+def test_toggle_task_status_single_statement(db_session):
+    """Test that a toggle is one UPDATE that flips the status in SQL."""
+    task_id = create_task(db_session, "Toggle me").id
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        toggled = toggle_task_status(db_session, task_id)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert toggled.status == TaskStatus.COMPLETED
+    assert toggled.version == 2
+    assert len(statements) == 1
+    assert statements[0].startswith("UPDATE tasks")
+    assert "RETURNING" in statements[0]
+
+    assert toggle_task_status(db_session, task_id).status == TaskStatus.PENDING
+
+def test_update_task_version_conflict(db_session):
+    """Test optimistic concurrency on update and delete."""
+    task = create_task(db_session, "Versioned")
+    update_task(db_session, task.id, title="First writer", expected_version=1)
+
+    with pytest.raises(VersionConflictError):
+        update_task(db_session, task.id, title="Second writer", expected_version=1)
+    with pytest.raises(VersionConflictError):
+        delete_task(db_session, task.id, expected_version=1)
+
+    assert get_task(db_session, task.id).title == "First writer"
+    # Writing nothing still checks the version
+    with pytest.raises(VersionConflictError):
+        update_task(db_session, task.id, expected_version=1)
+    assert update_task(db_session, task.id, expected_version=2).version == 2
+    delete_task(db_session, task.id, expected_version=2)
+    with pytest.raises(ValueError, match="not found"):
+        update_task(db_session, task.id, expected_version=2)
+    assert get_task(db_session, task.id) is None
+
+def test_toggle_nonexistent_task(db_session):
+    """Test that toggling a nonexistent task raises an error."""
+    with pytest.raises(ValueError):
+        toggle_task_status(db_session, UUID('00000000-0000-0000-0000-000000000000'))
+
+def test_tasks_get_increasing_numbers(db_session):
+    """Test that single and bulk inserts hand out consecutive numbers."""
+    first = create_task(db_session, "Numbered")
+    create_tasks(db_session, ["Numbered 1", "Numbered 2"])
+    last = create_task(db_session, "Numbered 3")
+
+    numbers = [task.number for task in list_tasks(db_session)[-4:]]
+    assert numbers == list(range(first.number, last.number + 1))
+
+def test_numbered_writes_are_all_or_nothing(db_session):
+    """Test batch writes by number and that a missing number aborts them."""
+    create_tasks(db_session, ["Batch 1", "Batch 2", "Batch 3"])
+    first, second, third = list_tasks(db_session)[-3:]
+
+    done = update_numbered_tasks(
+        db_session, [(first.number, second.number)], TaskStatus.COMPLETED
+    )
+    assert [task.id for task in done] == [first.id, second.id]
+    assert all(task.status == TaskStatus.COMPLETED for task in done)
+
+    # The failed delete expires the ORM objects it matched
+    third_id, third_number = third.id, third.number
+    with pytest.raises(ValueError, match=str(third_number + 1000)):
+        delete_numbered_tasks(
+            db_session, [(third_number, third_number), (third_number + 1000,) * 2]
+        )
+    assert get_task(db_session, third_id) is not None
+
+    # Huge and overlapping ranges are counted, not expanded
+    shown = rf"Tasks not found: {third_number + 1}, .*\.\.\.$"
+    with pytest.raises(ValueError, match=shown):
+        delete_numbered_tasks(db_session, [(third_number, 10**12), (3, 10**11)])
+    assert get_task(db_session, third_id) is not None
+
+    removed = delete_numbered_tasks(
+        db_session, [(third_number, third_number), (third_number, third_number)]
+    )
+    assert [task.title for task in removed] == ["Batch 3"]
+    assert get_task(db_session, third_id) is None
+
+def test_search_tasks_follows_writes(db_session):
+    """Test that search sees inserts, title updates and deletes."""
+    create_tasks(db_session, ["Water the fernery", "Repot ferns", "Fern-free task"])
+    titles = lambda query: [task.title for task in search_tasks(db_session, query)]
+
+    assert set(titles("fern")) == {"Water the fernery", "Repot ferns", "Fern-free task"}
+    assert titles("repot fer") == ["Repot ferns"]
+
+    repot = search_tasks(db_session, "repot")[0]
+    update_task(db_session, repot.id, title="Repot cacti")
+    assert titles("repot") == ["Repot cacti"]
+
+    delete_task(db_session, search_tasks(db_session, "fernery")[0].id)
+    assert titles("fernery") == []
+
+    rebuild_search_index(db_session)
+    assert titles("fern") == ["Fern-free task"]
+
+def test_search_tasks_treats_input_literally(db_session):
+    """Test that FTS5 syntax in the query cannot make it fail."""
+    assert search_tasks(db_session, '" OR NEAR( -') == []
+    assert search_tasks(db_session, "   ") == []
+
+def test_count_tasks_follows_writes(db_session):
+    """Test that the counters track creates, toggles and deletes."""
+    pending = count_tasks(db_session, TaskStatus.PENDING)
+    completed = count_tasks(db_session, TaskStatus.COMPLETED)
+
+    task = create_task(db_session, "Counted")
+    create_tasks(db_session, ["Counted 1", "Counted 2"])
+    toggle_task_status(db_session, task.id)
+    assert count_tasks(db_session, TaskStatus.PENDING) == pending + 2
+    assert count_tasks(db_session, TaskStatus.COMPLETED) == completed + 1
+
+    delete_task(db_session, task.id)
+    assert count_tasks(db_session, TaskStatus.COMPLETED) == completed
+    assert count_tasks(db_session) == pending + completed + 2
+
+def test_check_task_counts_repairs_drift(db_session):
+    """Test that drifted counters are reported and recomputed."""
+    assert check_task_counts(db_session) == {}
+    actual = count_tasks(db_session, TaskStatus.PENDING)
+    db_session.execute(text("UPDATE task_counts SET count = count + 5"))
+    db_session.commit()
+
+    assert check_task_counts(db_session, repair=False)[TaskStatus.PENDING] == (actual + 5, actual)
+    assert check_task_counts(db_session)[TaskStatus.PENDING] == (actual + 5, actual)
+    assert count_tasks(db_session, TaskStatus.PENDING) == actual
+    assert check_task_counts(db_session) == {}
+
+def test_check_task_counts_holds_write_lock(db_session, db_path):
+    """Test that no write can commit between the recount and the repair."""
+    create_task(db_session, "Counted")
+    db_session.execute(text("UPDATE task_counts SET count = count + 1"))
+    db_session.commit()
+    blocked = []
+
+    def write_during_recount(conn, cursor, statement, *args):
+        if statement.startswith("SELECT") and "GROUP BY" in statement:
+            other = sqlite3.connect(db_path, timeout=0)
+            try:
+                other.execute("DELETE FROM tasks WHERE 0")
+                other.commit()
+            except sqlite3.OperationalError as e:
+                blocked.append(str(e))
+            finally:
+                other.close()
+
+    event.listen(db_session.bind, "before_cursor_execute", write_during_recount)
+    try:
+        assert check_task_counts(db_session)
+    finally:
+        event.remove(db_session.bind, "before_cursor_execute", write_during_recount)
+    assert blocked == ["database is locked"]
+    assert check_task_counts(db_session) == {}
+
+def test_list_changes_reports_latest_state(db_session):
+    """Test that deltas hold each changed task once, deletes as tombstones."""
+    kept = create_task(db_session, "Kept")
+    gone = create_task(db_session, "Gone")
+    snapshot = list_changes(db_session)
+    assert snapshot.reset
+    assert [task.title for _, task in snapshot.changes][-2:] == ["Kept", "Gone"]
+
+    toggle_task_status(db_session, kept.id)
+    update_task(db_session, kept.id, title="Kept twice")
+    delete_task(db_session, gone.id)
+    create_tasks(db_session, ["New 1", "New 2"])
+
+    first = list_changes(db_session, snapshot.seq, limit=2)
+    assert not first.reset and first.more
+    assert [(task_id, task and task.title) for task_id, task in first.changes] == [
+        (kept.id, "Kept twice"), (gone.id, None)
+    ]
+    assert not first.created
+    rest = list_changes(db_session, first.seq, limit=2)
+    assert not rest.more
+    assert [task.title for _, task in rest.changes] == ["New 1", "New 2"]
+    assert rest.created == {task_id for task_id, _ in rest.changes}
+    assert list_changes(db_session, rest.seq).changes == []
+
+def test_list_changes_pages_snapshots(db_session):
+    """Test that snapshots come in pages ending at the head they started at."""
+    tasks = [create_task(db_session, f"Paged {i}") for i in range(3)]
+    total = count_tasks(db_session)
+    pages = [list_changes(db_session, limit=2)]
+    toggle_task_status(db_session, pages[0].changes[0][0])
+    while pages[-1].more:
+        pages.append(list_changes(db_session, cursor=pages[-1].cursor, limit=2))
+    create_task(db_session, "After the snapshot")
+
+    assert all(page.reset for page in pages) and len(pages) == (total + 1) // 2
+    assert [page.seq for page in pages[:-1]] == [0] * (len(pages) - 1)
+    assert pages[-1].cursor is None
+    paged = [task_id for page in pages for task_id, _ in page.changes]
+    assert len(paged) == len(set(paged)) == total
+    assert paged[-3:] == [task.id for task in tasks]
+
+    delta = list_changes(db_session, pages[-1].seq)
+    assert not delta.reset
+    assert [task.title for _, task in delta.changes] == [
+        pages[0].changes[0][1].title, "After the snapshot"
+    ]
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        list_changes(db_session, cursor="12")
+
+def test_compaction_keeps_what_consumers_need(db_session):
+    """Test that entries are trimmed only once every consumer acknowledged them."""
+    # Start without consumers left over from other tests
+    compact_changes(db_session, expiry=timedelta(0))
+    task = create_task(db_session, "Mirrored")
+    head = list_changes(db_session).seq
+    acknowledge_changes(db_session, "fast", head)
+    acknowledge_changes(db_session, "slow", head)
+    for _ in range(3):
+        toggle_task_status(db_session, task.id)
+
+    acknowledge_changes(db_session, "fast", head + 3)
+    assert list_changes(db_session, head).changes[0][1].status == TaskStatus.COMPLETED
+
+    acknowledge_changes(db_session, "slow", head + 1)
+    # Trimmed past the stale position, so it gets a snapshot
+    assert list_changes(db_session, head).reset
+    assert not list_changes(db_session, head + 1).reset
+
+    assert compact_changes(db_session, expiry=timedelta(0)) == 2
+    assert list_changes(db_session, head + 3).changes == []
+    assert list_changes(db_session, head + 1).reset
@@ -0,0 +1,153 @@
+"""Query plan regression tests for task operations.
+
+Every statement issued by todo_core.operations is captured while running
+against a large seeded table and checked with EXPLAIN QUERY PLAN, so a
+query that falls back to a full table scan or a temp sort fails here.
+"""
+
+import tempfile
+from pathlib import Path
+from typing import Callable, Generator
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from todo_core.journal import capture, journal_path
+from todo_core.models import Base, TaskStatus
+from todo_core.operations import (
+    acknowledge_changes, check_task_counts, compact_changes, count_tasks,
+    create_task, create_tasks, delete_numbered_tasks, encode_cursor, get_task,
+    iter_tasks, list_changes, list_tasks, merge_journal, search_tasks,
+    toggle_task_status, update_numbered_tasks, update_task, delete_task
+)
+
+SEED_ROWS = 20_000
+
+@pytest.fixture(scope="module")
+def seeded_engine(tmp_path_factory: pytest.TempPathFactory) -> Generator[Engine, None, None]:
+    """Create a database seeded with many tasks of both statuses."""
+    db_path: Path = tmp_path_factory.mktemp("plans") / "plans.db"
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        create_tasks(db, (f"Seed {i}" for i in range(SEED_ROWS)), batch_size=5000)
+        for task in list_tasks(db, limit=SEED_ROWS // 10):
+            task.status = TaskStatus.COMPLETED
+        db.commit()
+    try:
+        yield engine
+    finally:
+        engine.dispose()
+
+def capture_statements(engine: Engine, operation: Callable[[Session], object]) -> list:
+    """Run an operation and return the (statement, parameters) it issued."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        # One parameter set is enough to plan an executemany statement
+        statements.append((statement, parameters[0] if executemany else parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        with Session(engine) as db:
+            operation(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return statements
+
+def query_plan(engine: Engine, statement: str, parameters: tuple) -> list[str]:
+    """Return the EXPLAIN QUERY PLAN details for a statement."""
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return [row[-1] for row in rows]
+
+def first_task_id(db: Session):
+    """Return the id of the oldest task."""
+    return list_tasks(db, limit=1)[0].id
+
+def page_cursor(db: Session) -> str:
+    """Return a cursor pointing into the middle of the table."""
+    return encode_cursor(list_tasks(db, limit=SEED_ROWS // 2)[-1])
+
+def captured_journal() -> str:
+    """Return a journal holding a few captured tasks."""
+    path = journal_path(str(Path(tempfile.mkdtemp()) / "plans.db"))
+    for i in range(3):
+        capture(path, f"Captured {i}")
+    return path
+
+def snapshot_cursor(db: Session) -> str:
+    """Return the cursor of a snapshot's second page."""
+    return list_changes(db, limit=SEED_ROWS // 2).cursor
+
+OPERATIONS = {
+    "create_task": lambda db: create_task(db, "Planned"),
+    "create_tasks": lambda db: create_tasks(db, ["Planned 1", "Planned 2"]),
+    "get_task": lambda db: get_task(db, first_task_id(db)),
+    "list_tasks": lambda db: list_tasks(db),
+    "list_tasks_by_status": lambda db: list_tasks(db, status=TaskStatus.PENDING),
+    "list_tasks_page": lambda db: list_tasks(db, cursor=page_cursor(db), limit=50),
+    "list_tasks_status_page": lambda db: list_tasks(
+        db, status=TaskStatus.COMPLETED, cursor=page_cursor(db), limit=50
+    ),
+    "iter_tasks_by_status": lambda db: sum(
+        1 for _ in iter_tasks(db, status=TaskStatus.COMPLETED)
+    ),
+    "update_task": lambda db: update_task(
+        db, first_task_id(db), status=TaskStatus.COMPLETED
+    ),
+    "toggle_task_status": lambda db: toggle_task_status(db, first_task_id(db)),
+    "delete_task": lambda db: delete_task(db, create_task(db, "Doomed").id),
+    "update_numbered_tasks": lambda db: update_numbered_tasks(
+        db, [(3, 3), (100, 150)], TaskStatus.COMPLETED
+    ),
+    "delete_numbered_tasks": lambda db: delete_numbered_tasks(
+        db, [(create_task(db, "Doomed").number,) * 2]
+    ),
+    "search_tasks": lambda db: search_tasks(db, "seed 12"),
+    "count_tasks": lambda db: count_tasks(db),
+    "count_tasks_by_status": lambda db: count_tasks(db, TaskStatus.COMPLETED),
+    "check_task_counts": lambda db: check_task_counts(db),
+    "merge_journal": lambda db: merge_journal(db, captured_journal()),
+    "list_changes": lambda db: list_changes(db, SEED_ROWS, limit=50),
+    "list_changes_snapshot": lambda db: list_changes(db, limit=50),
+    "list_changes_snapshot_page": lambda db: list_changes(
+        db, cursor=snapshot_cursor(db), limit=50
+    ),
+    "acknowledge_changes": lambda db: acknowledge_changes(db, "plans", SEED_ROWS),
+    "compact_changes": lambda db: compact_changes(db),
+}
+
+# Operations that rank a bounded set of candidate rows in a subquery
+# (operations.SEARCH_CANDIDATES), which may be scanned and sorted
+BOUNDED_SORTS = {"search_tasks"}
+# Tables holding a row per status, change log consumer or autoincrement
+# table, scanned whole, and the single row of a SELECT without FROM
+SMALL_SCANS = (
+    "SCAN task_counts", "SCAN change_consumers", "SCAN sqlite_sequence",
+    "SCAN CONSTANT ROW",
+)
+
+@pytest.mark.parametrize("name", OPERATIONS)
+def test_operation_avoids_full_scan(seeded_engine, name):
+    """Test that no statement of an operation scans or sorts the table."""
+    statements = capture_statements(seeded_engine, OPERATIONS[name])
+    assert statements
+
+    for statement, parameters in statements:
+        for detail in query_plan(seeded_engine, statement, parameters):
+            if name in BOUNDED_SORTS and (
+                detail.startswith("SCAN anon_") or "TEMP B-TREE" in detail
+            ):
+                continue
+            if detail.startswith(SMALL_SCANS):
+                continue
+            # Walking an index is only fine for unfiltered, ordered listings;
+            # FTS5 reports its index lookups as virtual table scans
+            if detail.startswith("SCAN") and "VIRTUAL TABLE INDEX" not in detail:
+                assert "USING" in detail and "WHERE" not in statement, (
+                    f"{name} full scan: {detail}\n{statement}"
+                )
+            assert "TEMP B-TREE" not in detail, f"{name} sorts: {detail}\n{statement}"